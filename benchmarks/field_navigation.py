@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Work synthetic fields end to end in simulated time and report the throughput of the field navigation.
+
+For every combination of the given rows, beds, row lengths and crop distances a field is created,
+crops and weeds are added to the simulated detector and the field navigation works the field with the selected implement.
+The results can be written to a JSON file and compared with a baseline to catch throughput regressions.
+
+The scenarios are run as a pytest session with the fixtures of RoSys (like our tests),
+so they get simulated time, a fresh runtime each and the "spawn" start method RoSys insists on.
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+import rosys
+from rosys.geometry import Point, Point3d
+from rosys.testing import forward, helpers
+
+from field_friend import localization
+from field_friend.automations import Field
+from field_friend.automations.navigation.field_navigation import State
+from field_friend.localization import GeoPoint
+from field_friend.system import System
+
+ROBOT_GEO_START_POSITION = GeoPoint(lat=51.98333489813455, long=7.434242465994318)
+FIELD_FIRST_ROW_START = GeoPoint(lat=51.98333789813455, long=7.434242765994318)
+
+parser = argparse.ArgumentParser(description='Benchmark working whole fields with the field navigation.')
+parser.add_argument('--robot', default='rb34', help='robot id of the simulated configuration (default: rb34)')
+parser.add_argument('--implement', default='Weed Screw',
+                    help='name of the implement, e.g. "Weed Screw", "Tornado" or "Recorder" (default: Weed Screw)')
+parser.add_argument('--continuous', action='store_true', help='let the robot creep while the implement works')
+parser.add_argument('--rows', type=int, nargs='+', default=[2], help='rows per bed')
+parser.add_argument('--beds', type=int, nargs='+', default=[1], help='number of beds')
+parser.add_argument('--length', type=float, nargs='+', default=[5.0], help='row length in meters')
+parser.add_argument('--crop-distance', type=float, nargs='+', default=[0.2], help='distance between crops in meters')
+parser.add_argument('--weeds-per-crop', type=float, default=1.0, help='average number of weeds around each crop')
+parser.add_argument('--row-spacing', type=float, default=0.45)
+parser.add_argument('--bed-spacing', type=float, default=0.9)
+parser.add_argument('--seed', type=int, default=0, help='seed for the weed positions')
+parser.add_argument('--timeout', type=float, default=3600.0, help='maximum simulated time per field in seconds')
+parser.add_argument('--output', type=Path, help='write the results to this JSON file')
+parser.add_argument('--baseline', type=Path, help='JSON file of an earlier run to compare the area rate with')
+parser.add_argument('--tolerance', type=float, default=0.05, help='allowed relative loss of ha/h against the baseline')
+
+
+class Benchmark:
+    """Pytest plugin which runs ``test_scenario`` for every scenario and collects the results."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.results: list[dict[str, Any]] = []
+
+    def pytest_generate_tests(self, metafunc: pytest.Metafunc) -> None:
+        if 'scenario' in metafunc.fixturenames:
+            metafunc.parametrize('scenario', list(itertools.product(
+                self.args.rows, self.args.beds, self.args.length, self.args.crop_distance)))
+
+    @pytest.fixture
+    def benchmark(self) -> 'Benchmark':
+        return self
+
+
+def populate(system: System, field: Field, crop_distance: float, weeds_per_crop: float,
+             rng: random.Random) -> tuple[int, int]:
+    """Add crops along all rows and weeds around them to the simulated detector."""
+    assert isinstance(system.detector, rosys.vision.DetectorSimulation)
+    crops = weeds = 0
+    for row in field.rows:
+        start, end = row.points[0].cartesian(), row.points[-1].cartesian()
+        yaw = start.direction(end)
+        for i in range(1, int(start.distance(end) / crop_distance)):
+            crop = start.polar(i * crop_distance, yaw)
+            system.detector.simulated_objects.append(
+                rosys.vision.SimulatedObject(category_name='maize', position=Point3d(x=crop.x, y=crop.y, z=0)))
+            crops += 1
+            count = int(weeds_per_crop) + (rng.random() < weeds_per_crop % 1)
+            for _ in range(count):
+                weed = crop.polar(rng.uniform(-crop_distance, crop_distance) / 2, yaw) \
+                    .polar(rng.uniform(-0.1, 0.1), yaw + math.pi / 2)
+                system.detector.simulated_objects.append(
+                    rosys.vision.SimulatedObject(category_name='weed', position=Point3d(x=weed.x, y=weed.y, z=0)))
+                weeds += 1
+    return crops, weeds
+
+
+async def work_field(args: argparse.Namespace,
+                     rows: int, beds: int, length: float, crop_distance: float) -> dict[str, Any]:
+    """Create a system with a synthetic field (like the ``system`` test fixture) and work it."""
+    System.version = args.robot
+    localization.reference.update(ROBOT_GEO_START_POSITION)
+    system = System()
+    assert isinstance(system.detector, rosys.vision.DetectorSimulation)
+    system.detector.detection_delay = 0.1
+    helpers.odometer = system.odometer
+    helpers.driver = system.driver
+    helpers.automator = system.automator
+    await forward(4)  # NOTE: wait for the simulated GNSS device
+
+    field = Field(id='benchmark', name='Benchmark',
+                  first_row_start=FIELD_FIRST_ROW_START,
+                  first_row_end=FIELD_FIRST_ROW_START.shifted(Point(x=length, y=0)),
+                  row_spacing=args.row_spacing, row_count=rows, bed_count=beds, bed_spacing=args.bed_spacing,
+                  row_support_points=[])
+    system.field_provider.create_field(field)
+    system.field_provider.select_field(field.id)
+    crops, weeds = populate(system, field, crop_distance, args.weeds_per_crop, random.Random(args.seed))
+    if args.implement not in system.implements:
+        raise ValueError(f'robot {args.robot} has no implement "{args.implement}" '
+                         f'(available: {", ".join(system.implements)})')
+    system.current_navigation = system.field_navigation
+    system.current_implement = system.implements[args.implement]
+    system.field_navigation.continuous = args.continuous
+
+    stops = punches = 0
+    distance = 0.0
+    last_point = system.odometer.prediction.point
+
+    def count_stop(_) -> None:
+        nonlocal stops
+        stops += 1
+
+    def measure_distance() -> None:
+        nonlocal distance, last_point
+        distance += system.odometer.prediction.point.distance(last_point)
+        last_point = system.odometer.prediction.point
+
+    punch = system.puncher.punch
+
+    async def count_punch(*a, **kw) -> None:
+        nonlocal punches
+        punches += 1
+        await punch(*a, **kw)
+
+    system.motion_state_estimator.STOPPED.register(count_stop)
+    system.odometer.PREDICTION_UPDATED.register(measure_distance)
+    system.puncher.punch = count_punch  # type: ignore[method-assign]
+
+    start_time = rosys.time()
+    cpu_time = time.process_time()
+    wall_time = time.perf_counter()
+    system.automator.start()
+    await forward(until=lambda: system.automator.is_running)
+    try:
+        await forward(until=lambda: system.automator.is_stopped, timeout=args.timeout)
+    except TimeoutError:
+        system.automator.stop(because='benchmark timeout')
+    field_time = rosys.time() - start_time
+    cpu_time = time.process_time() - cpu_time
+    wall_time = time.perf_counter() - wall_time
+
+    row_length = sum(a.cartesian().distance(b.cartesian())
+                     for row in field.rows for a, b in itertools.pairwise(row.points))
+    area = row_length * args.row_spacing
+    remaining_weeds = sum(1 for o in system.detector.simulated_objects if o.category_name == 'weed')
+    return {
+        'implement': system.current_implement.name,
+        'rows': rows,
+        'beds': beds,
+        'length': length,
+        'crop_distance': crop_distance,
+        'crops': crops,
+        'weeds': weeds,
+        'completed': system.field_navigation._state == State.FIELD_COMPLETED,  # pylint: disable=protected-access
+        'field_time': field_time,
+        'cpu_time': cpu_time,
+        'wall_time': wall_time,
+        'speedup': field_time / wall_time if wall_time else None,
+        'distance': distance,
+        'stops_per_meter': stops / distance if distance else None,
+        'punches': punches,
+        'punches_per_minute': punches / field_time * 60 if field_time else None,
+        'weeds_removed': weeds - remaining_weeds,
+        'area': area,
+        'ha_per_hour': area / 10_000 / (field_time / 3600) if field_time else None,
+    }
+
+
+async def test_scenario(benchmark: Benchmark, scenario: tuple[int, int, float, float], rosys_integration) -> None:
+    benchmark.results.append(await work_field(benchmark.args, *scenario))
+
+
+def key(result: dict[str, Any]) -> tuple:
+    return result['rows'], result['beds'], result['length'], result['crop_distance']
+
+
+def main() -> int:
+    args = parser.parse_args()
+    benchmark = Benchmark(args)
+    exit_code = pytest.main([__file__, '--quiet', '--no-header', '--disable-warnings',
+                             '-o', 'asyncio_mode=auto', '-o', 'log_cli=false'], plugins=[benchmark])
+    if exit_code != pytest.ExitCode.OK:
+        return exit_code
+    results = sorted(benchmark.results, key=key)
+    for result in results:
+        print(f'{result["rows"]:3d} rows x {result["beds"]:2d} beds x {result["length"]:5.1f} m, '
+              f'crops every {result["crop_distance"]:.2f} m: '
+              f'{result["field_time"]:8.1f} s field time, {result["cpu_time"]:7.1f} s CPU, '
+              f'{result["stops_per_meter"] or 0:5.2f} stops/m, {result["punches_per_minute"] or 0:5.1f} punches/min, '
+              f'{result["ha_per_hour"] or 0:.4f} ha/h{"" if result["completed"] else " (not completed)"}')
+
+    report = {
+        'robot': args.robot,
+        'implement': args.implement,
+        'continuous': args.continuous,
+        'weeds_per_crop': args.weeds_per_crop,
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        baseline = {key(r): r for r in json.loads(args.baseline.read_text())['results']}
+        regressions = [r for r in results
+                       if key(r) in baseline and baseline[key(r)]['ha_per_hour'] and
+                       (not r['ha_per_hour'] or r['ha_per_hour'] < baseline[key(r)]['ha_per_hour'] * (1 - args.tolerance))]
+        for r in regressions:
+            print(f'REGRESSION {key(r)}: {r["ha_per_hour"] or 0:.4f} ha/h instead of {baseline[key(r)]["ha_per_hour"]:.4f} ha/h')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Measure how long it takes to create and edit fields with many rows."""
+import argparse
+import time
+
+from rosys.geometry import Point
+
+from field_friend import localization
+from field_friend.automations.field import Field, RowSupportPoint
+from field_friend.localization import GeoPoint
+
+parser = argparse.ArgumentParser(description='Benchmark the row generation of fields.')
+parser.add_argument('--rows', type=int, default=100, help='rows per bed')
+parser.add_argument('--beds', type=int, default=12, help='number of beds')
+parser.add_argument('--support-points', type=int, default=50, help='number of row support points')
+parser.add_argument('--repetitions', type=int, default=10)
+args = parser.parse_args()
+
+start_point = GeoPoint(lat=51.98333789813455, long=7.434242765994318)
+localization.reference.update(start_point)
+total_rows = args.rows * args.beds
+support_points = [RowSupportPoint.from_geopoint(start_point.shifted(Point(x=0, y=-0.46 * i)), i)
+                  for i in range(0, total_rows, max(total_rows // max(args.support_points, 1), 1))]
+
+
+def measure(name: str, action) -> None:
+    start = time.perf_counter()
+    for _ in range(args.repetitions):
+        action()
+    duration = (time.perf_counter() - start) / args.repetitions
+    print(f'{name:<28} {duration * 1000:8.2f} ms')
+
+
+def create() -> Field:
+    return Field(id='benchmark', name='Benchmark',
+                 first_row_start=start_point, first_row_end=start_point.shifted(Point(x=200, y=0)),
+                 row_spacing=0.45, row_count=args.rows, bed_count=args.beds, bed_spacing=0.9,
+                 row_support_points=list(support_points))
+
+
+print(f'{total_rows} rows in {args.beds} beds with {len(support_points)} support points')
+measure('create field', create)
+field = create()
+
+
+def move_last_support_point() -> None:
+    last = field.row_support_points[-1]
+    field.row_support_points[-1] = RowSupportPoint(lat=last.lat, long=last.long + 1e-7, row_index=last.row_index)
+    field.refresh()
+
+
+def move_first_support_point() -> None:
+    first = field.row_support_points[0]
+    field.row_support_points[0] = RowSupportPoint(lat=first.lat, long=first.long + 1e-7, row_index=first.row_index)
+    field.refresh()
+
+
+def rename() -> None:
+    field.name = 'Renamed'
+    field.refresh()
+
+
+measure('move last support point', move_last_support_point)
+measure('move first support point', move_first_support_point)
+measure('rename (no regeneration)', rename)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Compare the NMEA fast path of ``NmeaDecoder`` with parsing every sentence with pynmea2."""
+import argparse
+import gzip
+import time
+from pathlib import Path
+
+import pynmea2
+
+from field_friend.localization.gnss_recorder import read_recording
+from field_friend.localization.nmea import NmeaDecoder, checksum
+
+SAMPLE_EPOCH = (
+    'GPGGA,{time},5158.98954,N,00726.05272,E,4,24,0.6,52.123,M,47.251,M,1.0,0000',
+    'GNGNS,{time},5158.98954,N,00726.05272,E,RRRR,24,0.6,52.123,47.251,1.0,0000,V',
+    'GPHDT,123.45,T',
+)
+
+parser = argparse.ArgumentParser(description='Benchmark the NMEA parser.')
+parser.add_argument('--recording', type=Path, help='recording of GnssRecorder (*.nmea.gz) or raw receiver stream')
+parser.add_argument('--epochs', type=int, default=10_000, help='number of sample epochs if no recording is given')
+parser.add_argument('--chunk-size', type=int, default=64, help='bytes per feed call, similar to serial reads')
+args = parser.parse_args()
+
+
+def sample_stream(epochs: int) -> bytes:
+    lines = []
+    for i in range(epochs):
+        seconds = 36000 + i / 10
+        time_of_day = f'{int(seconds // 3600):02d}{int(seconds % 3600 // 60):02d}{seconds % 60:05.2f}'
+        for template in SAMPLE_EPOCH:
+            body = template.format(time=time_of_day).encode()
+            lines.append(b'$%s*%02X\r\n' % (body, checksum(body)))
+    return b''.join(lines)
+
+
+if args.recording and args.recording.name.endswith('.nmea.gz'):
+    stream = b''.join(data for _, data in read_recording([args.recording]))
+elif args.recording:
+    opener = gzip.open if args.recording.suffix == '.gz' else open
+    with opener(args.recording, 'rb') as f:
+        stream = f.read()
+else:
+    stream = sample_stream(args.epochs)
+sentences = stream.splitlines()
+print(f'{len(sentences)} sentences, {len(stream) / 1024:.0f} KiB')
+
+start = time.perf_counter()
+records = len(NmeaDecoder().feed(stream))
+fast = time.perf_counter() - start
+print(f'NmeaDecoder: {fast * 1e6 / len(sentences):6.2f} µs per sentence ({records} epochs)')
+
+start = time.perf_counter()
+decoder = NmeaDecoder()
+for i in range(0, len(stream), args.chunk_size):
+    decoder.feed(stream[i:i + args.chunk_size])
+chunked = time.perf_counter() - start
+print(f'  chunked:   {chunked * 1e6 / len(sentences):6.2f} µs per sentence ({args.chunk_size} bytes per feed)')
+
+start = time.perf_counter()
+for sentence in sentences:
+    try:
+        msg = pynmea2.parse(sentence.decode())
+    except pynmea2.ParseError:
+        continue
+    if msg.sentence_type == 'GNS':
+        _ = msg.timestamp, msg.latitude, msg.longitude, msg.mode_indicator
+    elif msg.sentence_type == 'GGA':
+        _ = msg.gps_qual, msg.altitude, msg.geo_sep
+    elif msg.sentence_type == 'HDT':
+        _ = msg.heading
+baseline = time.perf_counter() - start
+print(f'pynmea2:     {baseline * 1e6 / len(sentences):6.2f} µs per sentence')
+print(f'speedup:     {baseline / fast:.1f}x')
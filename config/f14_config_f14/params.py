@@ -4,5 +4,6 @@ configuration = {
     'pitch': 0.033,
     'wheel_distance': 0.47,
     'antenna_offset': 0.205,
+    'gnss_protocol': 'nmea',
     'tool': 'mower',
 }
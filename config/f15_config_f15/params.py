@@ -4,6 +4,7 @@ configuration = {
     'pitch': 0.033,
     'wheel_distance': 0.47,
     'antenna_offset': 0.205,
+    'gnss_protocol': 'nmea',
     'work_x': -0.06933333,
     'work_y': 0.0094166667,
     'drill_radius': 0.025,
@@ -7,4 +7,5 @@ configuration = {
     'drill_radius': 0.025,
     'tool': 'none',
     'antenna_offset': 0.205,
+    'gnss_protocol': 'nmea',
 }
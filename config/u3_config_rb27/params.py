@@ -9,4 +9,5 @@ configuration = {
     'chop_radius': 0.07,
     'tool': 'dual_mechanism',
     'antenna_offset': 0.195,
+    'gnss_protocol': 'nmea',
 }
@@ -6,5 +6,6 @@ configuration = {
     'work_x': 0.093,
     'drill_radius': 0.025,
     'antenna_offset': 0.205,
+    'gnss_protocol': 'nmea',
     'tool': 'weed_screw',
 }
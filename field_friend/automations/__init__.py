@@ -5,6 +5,7 @@ from .field import Field, Row, RowSupportPoint
 from .field_provider import FieldProvider
 from .implements.implement import Implement
 from .kpi_provider import KpiProvider
+from .motion_state_estimator import MotionState, MotionStateEstimator
 from .path_provider import Path, PathProvider
 from .plant import Plant
 from .plant_locator import PlantLocator
@@ -18,6 +19,8 @@ __all__ = [
     'FieldProvider',
     'Implement',
     'KpiProvider',
+    'MotionState',
+    'MotionStateEstimator',
     'Path',
     'PathProvider',
     'PlantLocator',
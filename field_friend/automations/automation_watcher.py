@@ -9,7 +9,9 @@ from rosys.geometry import Pose
 from shapely.geometry import Point as ShapelyPoint
 from shapely.geometry import Polygon as ShapelyPolygon
 
+from .. import localization
 from ..localization import GeoPoint
+from ..localization.geo_point import cartesian_array
 
 if TYPE_CHECKING:
     from ..system import System
@@ -35,6 +37,7 @@ class AutomationWatcher:
         self.incidence_pose: Pose = Pose()
         self.resume_delay: float = DEFAULT_RESUME_DELAY
         self.field_polygon: ShapelyPolygon | None = None
+        self._field_boundaries: list[GeoPoint] = []
         self.kpi_provider = system.kpi_provider
 
         self.bumper_watch_active: bool = False
@@ -52,6 +55,7 @@ class AutomationWatcher:
         self.gnss.RTK_FIX_LOST.register(lambda: self.pause('GNSS RTK fix lost'))
 
         self.steerer.STEERING_STARTED.register(lambda: self.pause('steering started'))
+        localization.reference.REFERENCE_CHANGED.register(self._handle_reference_changed)
         # self.field_friend.estop.ESTOP_TRIGGERED.register(lambda: self.stop('emergency stop triggered'))
 
     def pause(self, reason: str) -> None:
@@ -89,7 +93,7 @@ class AutomationWatcher:
         bumper_condition = True
         if self.field_friend.bumper is not None and self.bumper_watch_active:
             bumper_condition = not bool(self.field_friend.bumper.active_bumpers)
-        gnss_condition = (self.gnss.current is not None and ('R' in self.gnss.current.mode or self.gnss.current.mode == 'SSSS')) \
+        gnss_condition = (self.gnss.current is not None and self.gnss.current.has_rtk_fix) \
             if self.gnss_watch_active else True
 
         # Enable automator only if all relevant conditions are True
@@ -114,12 +118,18 @@ class AutomationWatcher:
                 self.resume_delay = DEFAULT_RESUME_DELAY
 
     def start_field_watch(self, field_boundaries: list[GeoPoint]) -> None:
-        self.field_polygon = ShapelyPolygon([point.cartesian().tuple for point in field_boundaries])
+        self._field_boundaries = field_boundaries
+        self.field_polygon = ShapelyPolygon(cartesian_array(field_boundaries))
         self.field_watch_active = True
 
     def stop_field_watch(self) -> None:
         self.field_watch_active = False
         self.field_polygon = None
+        self._field_boundaries = []
+
+    def _handle_reference_changed(self, _) -> None:
+        if self.field_polygon is not None:
+            self.field_polygon = ShapelyPolygon(cartesian_array(self._field_boundaries))
 
     def check_field_bounds(self) -> None:
         if not self.field_watch_active or not self.field_polygon:
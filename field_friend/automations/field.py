@@ -1,31 +1,55 @@
+import hashlib
+import json
+import logging
 import math
+from collections.abc import Mapping
 from dataclasses import dataclass
 from typing import Any, Self
 
+import numpy as np
 import rosys
 import shapely
 from rosys.geometry import Point
-from shapely import offset_curve
 from shapely.geometry import LineString, Polygon
 
 from .. import localization
 from ..localization import GeoPoint, GeoPointCollection
+from ..localization.geo_point import cartesian_array, reference_projection
+from ..localization.projection import LocalProjection
 
 
-@dataclass(slots=True, kw_only=True)
 class Row(GeoPointCollection):
-    reverse: bool = False
+    __slots__ = ('reverse',)
+
+    def __init__(self, *,
+                 id: str,  # pylint: disable=redefined-builtin
+                 name: str,
+                 points: list[GeoPoint] | None = None,
+                 lat_long: np.ndarray | None = None,
+                 reverse: bool = False) -> None:
+        super().__init__(id=id, name=name, points=points, lat_long=lat_long)
+        self.reverse = reverse
+
+    def __eq__(self, other: object) -> bool:
+        equal = GeoPointCollection.__eq__(self, other)
+        if equal is NotImplemented or not equal:
+            return equal
+        assert isinstance(other, Row)
+        return self.reverse == other.reverse
+
+    __hash__ = None  # type: ignore[assignment]
 
     def reversed(self):
         return Row(
             id=self.id,
             name=self.name,
-            points=list(reversed(self.points)),
+            lat_long=self.lat_long[::-1],
         )
 
     def line_segment(self) -> rosys.geometry.LineSegment:
-        return rosys.geometry.LineSegment(point1=self.points[0].cartesian(),
-                                          point2=self.points[-1].cartesian())
+        cartesian = self.cartesian_array()
+        return rosys.geometry.LineSegment(point1=Point(x=cartesian[0, 0], y=cartesian[0, 1]),
+                                          point2=Point(x=cartesian[-1, 0], y=cartesian[-1, 1]))
 
 
 @dataclass(slots=True, kw_only=True)
@@ -38,6 +62,9 @@ class RowSupportPoint(GeoPoint):
 
 
 class Field:
+    GEOMETRY_VERSION = 1
+    """version of the arrays returned by ``geometry_arrays``; stored geometry of other versions is ignored"""
+
     def __init__(self, *,
                  id: str,  # pylint: disable=redefined-builtin
                  name: str,
@@ -48,7 +75,13 @@ class Field:
                  outline_buffer_width: float = 2,
                  row_support_points: list[RowSupportPoint] | None = None,
                  bed_count: int = 1,
-                 bed_spacing: float = 0.5) -> None:
+                 bed_spacing: float = 0.5,
+                 geometry: Mapping[str, Mapping[str, np.ndarray]] | None = None) -> None:
+        """Create a field and generate its rows and outline.
+
+        ``geometry`` maps ``geometry_key``s to stored ``geometry_arrays``.
+        If it contains the key of this field, the stored rows and outline are used instead of regenerating them.
+        """
         self.id: str = id
         self.name: str = name
         self.first_row_start: GeoPoint = first_row_start
@@ -62,82 +95,253 @@ class Field:
         self.row_support_points.sort(key=lambda sp: sp.row_index)
         self.visualized: bool = False
         self.rows: list[Row] = []
+        self.bed_slices: list[slice] = []
+        """slice of ``rows`` for each bed"""
         self.outline: list[GeoPoint] = []
+        self._ab_line: tuple[float, float, float, float] | None = None
+        self._row_offsets: np.ndarray = np.empty(0)
+        self._outline_buffer_width: float | None = None
+        self._geometry_cache: dict[str, Any] = {}
+        self._geometry_projection: LocalProjection | None = None
+        if geometry is not None:
+            self._restore_geometry(geometry)
         self.refresh()
 
+    def _geometry(self) -> dict[str, Any]:
+        """Cache of the geometry derived from the outline and the rows.
+
+        It is cleared when ``refresh`` regenerates anything and when the reference changes,
+        so KPI and UI code can query the properties below as often as needed.
+        """
+        projection = reference_projection()
+        if self._geometry_projection is not projection:
+            self._geometry_cache.clear()
+            self._geometry_projection = projection
+        return self._geometry_cache
+
+    def outline_cartesian_array(self) -> np.ndarray:
+        """Read-only Nx2 array of the cartesian outline coordinates."""
+        cache = self._geometry()
+        if 'outline_cartesian_array' not in cache:
+            array = cartesian_array(self.outline)
+            array.flags.writeable = False
+            cache['outline_cartesian_array'] = array
+        return cache['outline_cartesian_array']
+
     @property
     def outline_cartesian(self) -> list[rosys.geometry.Point]:
-        return [p.cartesian() for p in self.outline]
+        return [Point(x=x, y=y) for x, y in self.outline_cartesian_as_tuples]
 
     @property
     def outline_as_tuples(self) -> list[tuple[float, float]]:
-        return [p.tuple for p in self.outline]
+        cache = self._geometry()
+        if 'outline_as_tuples' not in cache:
+            cache['outline_as_tuples'] = [p.tuple for p in self.outline]
+        return cache['outline_as_tuples']
 
     @property
     def outline_cartesian_as_tuples(self) -> list[tuple[float, float]]:
-        return [p.tuple for p in self.outline_cartesian]
+        cache = self._geometry()
+        if 'outline_cartesian_as_tuples' not in cache:
+            cache['outline_cartesian_as_tuples'] = [(x, y) for x, y in self.outline_cartesian_array().tolist()]
+        return cache['outline_cartesian_as_tuples']
+
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        """Cartesian bounds (min x, min y, max x, max y) of the outline."""
+        cache = self._geometry()
+        if 'bounds' not in cache:
+            outline = self.outline_cartesian_array()
+            cache['bounds'] = (*outline.min(axis=0).tolist(), *outline.max(axis=0).tolist()) if len(outline) else \
+                (0.0, 0.0, 0.0, 0.0)
+        return cache['bounds']
+
+    def bed_extents(self) -> np.ndarray:
+        """Read-only array with the cartesian bounds (min x, min y, max x, max y) of the rows of each bed."""
+        cache = self._geometry()
+        if 'bed_extents' not in cache:
+            extents = np.zeros((self.bed_count, 4))
+            for bed, bed_slice in enumerate(self.bed_slices):
+                rows = self.rows[bed_slice]
+                if rows:
+                    coordinates = np.concatenate([row.cartesian_array() for row in rows])
+                    extents[bed] = (*coordinates.min(axis=0), *coordinates.max(axis=0))
+            extents.flags.writeable = False
+            cache['bed_extents'] = extents
+        return cache['bed_extents']
+
+    def _row_tree(self) -> shapely.STRtree:
+        cache = self._geometry()
+        if 'row_tree' not in cache:
+            cache['row_tree'] = shapely.STRtree(shapely.linestrings([row.cartesian_array() for row in self.rows]))
+        return cache['row_tree']
+
+    def _bed_tree(self) -> shapely.STRtree:
+        cache = self._geometry()
+        if 'bed_tree' not in cache:
+            bed_polygons = [shapely.MultiLineString([row.cartesian_array() for row in self.rows[bed_slice]])
+                            .convex_hull.buffer(self.row_spacing / 2, cap_style='flat', join_style='mitre')
+                            for bed_slice in self.bed_slices if self.rows[bed_slice]]
+            cache['bed_tree'] = shapely.STRtree(bed_polygons)
+        return cache['bed_tree']
+
+    def nearest_row(self, point: rosys.geometry.Point) -> Row | None:
+        """Return the row closest to the given cartesian point."""
+        if not self.rows:
+            return None
+        return self.rows[int(self._row_tree().nearest(shapely.Point(point.x, point.y)))]
+
+    def rows_within(self, point: rosys.geometry.Point, distance: float) -> list[Row]:
+        """Return the rows within the given distance of the cartesian point, in field order."""
+        if not self.rows:
+            return []
+        indices = self._row_tree().query(shapely.Point(point.x, point.y), predicate='dwithin', distance=distance)
+        return [self.rows[i] for i in np.sort(indices).tolist()]
+
+    def bed_at(self, point: rosys.geometry.Point) -> int | None:
+        """Return the (zero-based) index of the bed containing the cartesian point.
+
+        A bed covers its rows and half a row spacing to either side; points between beds belong to none.
+        """
+        if not self.rows:
+            return None
+        indices = self._bed_tree().query(shapely.Point(point.x, point.y), predicate='intersects')
+        return int(indices.min()) if len(indices) else None
 
     def area(self) -> float:
-        outline_cartesian = self.outline_cartesian
-        if not outline_cartesian:
-            return 0.0
-        polygon = Polygon([(p.x, p.y) for p in outline_cartesian])
-        return polygon.area
+        cache = self._geometry()
+        if 'area' not in cache:
+            cache['area'] = Polygon(self.outline_cartesian_array()).area if self.outline else 0.0
+        return cache['area']
 
     def worked_area(self, worked_rows: int) -> float:
-        worked_area = 0.0
-        if self.area() > 0:
-            total_rows = self.row_count * self.bed_count
-            worked_area = worked_rows * self.area() / total_rows
-        return worked_area
+        area = self.area()
+        if area <= 0:
+            return 0.0
+        return worked_rows * area / (self.row_count * self.bed_count)
 
-    def refresh(self):
-        self.rows = self._generate_rows()
-        self.outline = self._generate_outline()
+    def refresh(self) -> bool:
+        """Regenerate the rows and the outline if the parameters they depend on changed since the last refresh.
 
-    def _generate_rows(self) -> list[Row]:
-        assert self.first_row_start is not None
-        assert self.first_row_end is not None
-        ab_line_cartesian = LineString([self.first_row_start.cartesian().tuple, self.first_row_end.cartesian().tuple])
-        rows: list[Row] = []
+        Only rows whose offset to the AB line changed are regenerated (e.g. the rows following a new support point);
+        all other rows are kept, including their cached projections.
+        Returns whether anything was regenerated.
+        """
+        ab_line = (self.first_row_start.lat, self.first_row_start.long, self.first_row_end.lat, self.first_row_end.long)
+        if ab_line != self._ab_line:
+            self._ab_line = ab_line
+            self._row_offsets = np.empty(0)
+        offsets = self._compute_row_offsets()
+        kept = min(len(offsets), len(self._row_offsets))
+        changed = np.concatenate((np.flatnonzero(offsets[:kept] != self._row_offsets[:kept]),
+                                  np.arange(kept, len(offsets))))
+        rows_changed = len(changed) > 0 or len(offsets) != len(self._row_offsets)
+        self._row_offsets = offsets
+        if rows_changed:
+            self.rows = self._generate_rows(offsets, changed)
+        bed_slices = [slice(bed * self.row_count, (bed + 1) * self.row_count) for bed in range(self.bed_count)]
+        beds_changed = bed_slices != self.bed_slices
+        self.bed_slices = bed_slices
+        if rows_changed or self.outline_buffer_width != self._outline_buffer_width:
+            self._outline_buffer_width = self.outline_buffer_width
+            self.outline = self._generate_outline()
+        elif not beds_changed:
+            return False
+        self._geometry_cache.clear()
+        return True
 
-        last_support_point = None
-        last_support_point_offset = 0
+    def _compute_row_offsets(self) -> np.ndarray:
+        """Compute the offset of each row to the AB line in one vectorized pass.
 
+        Without support points the rows are spaced by ``row_spacing`` within and by ``bed_spacing`` between beds.
+        A support point fixes the offset of its row; the following rows are spaced relative to it.
+        """
         total_rows = self.row_count * self.bed_count
-        for i in range(total_rows):
-            bed_index = i // self.row_count
-            row_in_bed = i % self.row_count
-
-            support_point = next((sp for sp in self.row_support_points if sp.row_index == i), None)
-            if support_point:
-                support_point_cartesian = support_point.cartesian()
-                offset = ab_line_cartesian.distance(shapely.geometry.Point(
-                    [support_point_cartesian.x, support_point_cartesian.y]))
-                last_support_point = support_point
-                last_support_point_offset = offset
-            elif last_support_point:
-                rows_since_support = i - last_support_point.row_index
-                beds_crossed = bed_index - (last_support_point.row_index // self.row_count)
-                offset = last_support_point_offset
-                if beds_crossed > 0:
-                    offset += beds_crossed * self.bed_spacing
-                    rows_in_complete_beds = rows_since_support - (row_in_bed + 1)
-                    offset += rows_in_complete_beds * self.row_spacing
-                    offset += row_in_bed * self.row_spacing
-                else:
-                    offset += rows_since_support * self.row_spacing
+        index = np.arange(total_rows)
+        bed_index = index // self.row_count
+        row_in_bed = index % self.row_count
+        offsets = row_in_bed * self.row_spacing + \
+            bed_index * ((self.row_count - 1) * self.row_spacing + self.bed_spacing)
+
+        support_points = {sp.row_index: sp for sp in self.row_support_points if 0 <= sp.row_index < total_rows}
+        if not support_points:
+            return offsets
+        support_rows = np.array(sorted(support_points))
+        a, b = cartesian_array([self.first_row_start, self.first_row_end])
+        p = cartesian_array([support_points[i] for i in support_rows.tolist()])
+        ab = b - a
+        t = np.clip((p - a) @ ab / max(ab @ ab, 1e-12), 0.0, 1.0)
+        support_offsets = np.linalg.norm(p - (a + t[:, None] * ab), axis=1)  # distance to the AB line segment
+
+        last_support = np.searchsorted(support_rows, index, side='right') - 1
+        following = last_support >= 0
+        support_index = support_rows[last_support[following]]
+        rows_since_support = index[following] - support_index
+        beds_crossed = bed_index[following] - support_index // self.row_count
+        offsets[following] = support_offsets[last_support[following]] + \
+            np.where(beds_crossed > 0,
+                     beds_crossed * self.bed_spacing + (rows_since_support - 1) * self.row_spacing,
+                     rows_since_support * self.row_spacing)
+        return offsets
+
+    def _generate_rows(self, offsets: np.ndarray, indices: np.ndarray) -> list[Row]:
+        """Return the rows for the given offsets, regenerating only the rows with the given indices."""
+        rows = self.rows[:len(offsets)]
+        if not len(indices):
+            return rows
+        a, b = cartesian_array([self.first_row_start, self.first_row_end])
+        ab = b - a
+        normal = np.array([ab[1], -ab[0]]) / max(float(np.hypot(*ab)), 1e-12)  # pointing to the right of the AB line
+        shifts = offsets[indices, None] * normal
+        coordinates = np.stack((a + shifts, b + shifts), axis=1).reshape(-1, 2)
+        lat_long = reference_projection().unproject(coordinates)
+        for n, i in enumerate(indices.tolist()):
+            row = Row(id=f'field_{self.id}_row_{i + 1!s}', name=f'row_{i + 1}', lat_long=lat_long[2 * n:2 * n + 2])
+            if i < len(rows):
+                rows[i] = row
             else:
-                base_offset = row_in_bed * self.row_spacing
-                bed_offset = bed_index * ((self.row_count - 1) * self.row_spacing + self.bed_spacing)
-                offset = base_offset + bed_offset
-            offset_row_coordinated = offset_curve(ab_line_cartesian, -offset).coords
-            row_points: list[GeoPoint] = [localization.reference.shifted(
-                Point(x=p[0], y=p[1])) for p in offset_row_coordinated]
-            row = Row(id=f'field_{self.id}_row_{i + 1!s}', name=f'row_{i + 1}', points=row_points)
-            rows.append(row)
+                rows.append(row)
         return rows
 
+    def geometry_key(self) -> str:
+        """Hash of the parameters and the reference the rows and the outline are generated from."""
+        parameters = {key: value for key, value in self.to_dict().items() if key != 'name'}
+        data = [self.GEOMETRY_VERSION, parameters, localization.reference.lat, localization.reference.long]
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    def geometry_arrays(self) -> dict[str, np.ndarray]:
+        """The generated rows and outline as arrays, which can be passed back to the constructor."""
+        return {
+            'row_offsets': self._row_offsets,
+            'row_lengths': np.array([len(row.lat_long) for row in self.rows], dtype=np.int64),
+            'row_points': np.concatenate([row.lat_long for row in self.rows]) if self.rows else np.empty((0, 2)),
+            'outline': np.array([p.tuple for p in self.outline], dtype=np.float64).reshape(-1, 2),
+            'outline_buffer_width': np.array(self._outline_buffer_width or 0.0),
+        }
+
+    def _restore_geometry(self, geometry: Mapping[str, Mapping[str, np.ndarray]]) -> None:
+        """Take the rows and the outline from stored ``geometry_arrays`` if there are any for the current parameters.
+
+        The stored offsets are kept, so the following ``refresh`` validates them and regenerates any row which differs.
+        """
+        arrays = geometry.get(self.geometry_key())
+        if arrays is None:
+            return
+        row_offsets = np.asarray(arrays['row_offsets'], dtype=np.float64)
+        row_lengths = np.asarray(arrays['row_lengths'], dtype=np.int64)
+        row_points = np.asarray(arrays['row_points'], dtype=np.float64)
+        if len(row_lengths) != len(row_offsets) or row_lengths.sum() != len(row_points):
+            logging.getLogger('field_friend.field_provider').warning('Ignoring invalid geometry of field %s', self.name)
+            return
+        ends = np.cumsum(row_lengths).tolist()
+        self.rows = [Row(id=f'field_{self.id}_row_{i + 1}', name=f'row_{i + 1}', lat_long=row_points[end - length:end])
+                     for i, (length, end) in enumerate(zip(row_lengths.tolist(), ends, strict=True))]
+        self.outline = [GeoPoint(lat=lat, long=long) for lat, long in np.asarray(arrays['outline']).tolist()]
+        self._ab_line = (self.first_row_start.lat, self.first_row_start.long,
+                         self.first_row_end.lat, self.first_row_end.long)
+        self._row_offsets = row_offsets
+        self._outline_buffer_width = float(arrays['outline_buffer_width'])
+
     def _generate_outline(self) -> list[GeoPoint]:
         assert len(self.rows) > 0
         return self.get_buffered_area(self.rows, self.outline_buffer_width)
@@ -157,35 +361,34 @@ class Field:
         }
 
     def shapely_polygon(self) -> shapely.geometry.Polygon:
-        return shapely.geometry.Polygon([p.tuple for p in self.outline])
+        """Prepared polygon of the outline in (lat, long), so repeated predicates like ``contains`` are fast."""
+        cache = self._geometry()
+        if 'shapely_polygon' not in cache:
+            polygon = shapely.geometry.Polygon(self.outline_as_tuples)
+            shapely.prepare(polygon)
+            cache['shapely_polygon'] = polygon
+        return cache['shapely_polygon']
 
     @classmethod
     def args_from_dict(cls, data: dict[str, Any]) -> dict:
         return data
 
     @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> Self:
+    def from_dict(cls, data: dict[str, Any], geometry: Mapping[str, Mapping[str, np.ndarray]] | None = None) -> Self:
         data['first_row_start'] = GeoPoint(lat=data['first_row_start']['lat'], long=data['first_row_start']['long'])
         data['first_row_end'] = GeoPoint(lat=data['first_row_end']['lat'], long=data['first_row_end']['long'])
         data['row_support_points'] = [rosys.persistence.from_dict(
             RowSupportPoint, sp) for sp in data['row_support_points']] if 'row_support_points' in data else []
-        field_data = cls(**cls.args_from_dict(data))
+        field_data = cls(**cls.args_from_dict(data), geometry=geometry)
         return field_data
 
     def get_buffered_area(self, rows: list[Row], buffer_width: float) -> list[GeoPoint]:
-        outline_unbuffered: list[Point] = [
-            self.first_row_end.cartesian(),
-            self.first_row_start.cartesian()
-        ]
+        outline_unbuffered = cartesian_array([self.first_row_end, self.first_row_start])
         if len(self.rows) > 1:
-            for p in self.rows[-1].points:
-                outline_unbuffered.append(p.cartesian())
-            outline_shape = Polygon([p.tuple for p in outline_unbuffered])
+            outline_unbuffered = np.concatenate((outline_unbuffered, self.rows[-1].cartesian_array()))
+            outline_shape = Polygon(outline_unbuffered)
         else:
-            outline_shape = LineString([p.tuple for p in outline_unbuffered])
+            outline_shape = LineString(outline_unbuffered)
         bufferd_polygon = outline_shape.buffer(
             self.outline_buffer_width, cap_style='square', join_style='mitre', mitre_limit=math.inf)
-        bufferd_polygon_coords = bufferd_polygon.exterior.coords
-        outline: list[GeoPoint] = [localization.reference.shifted(
-            Point(x=p[0], y=p[1])) for p in bufferd_polygon_coords]
-        return outline
+        return GeoPoint.from_cartesian_array(np.array(bufferd_polygon.exterior.coords))
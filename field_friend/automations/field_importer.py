@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import io
+import itertools
+import logging
+import math
+import xml.etree.ElementTree as ET
+import zipfile
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
+from pathlib import PurePath
+from typing import BinaryIO
+from uuid import uuid4
+
+import numpy as np
+import rosys
+import shapely
+from fiona.io import ZipMemoryFile
+from fiona.transform import transform_geom
+
+from .. import localization
+from ..localization import GeoPoint
+from ..localization.projection import LocalProjection
+from .field import Field
+from .field_provider import FieldProvider
+
+# ISO 11783-10 attribute values
+ISO_BOUNDARY_POLYGON = '1'  # PLN.A: partfield boundary
+ISO_EXTERIOR_RING = '1'  # LSG.A: polygon exterior
+ISO_GUIDANCE_PATTERN = '5'  # LSG.A: guidance pattern
+
+
+@dataclass(slots=True, kw_only=True)
+class ImportedFeature:
+    """A named boundary and/or guidance line as Nx2 arrays of (lat, long)."""
+    name: str
+    boundary: np.ndarray | None = None
+    guidance: np.ndarray | None = None
+
+
+class FieldImporter:
+    """Imports fields from ISO 11783 TaskData (``.xml``), KML (``.kml``) and zipped shapefiles (``.zip``).
+
+    The files are read feature by feature: XML is parsed with ``iterparse`` and every partfield or placemark
+    is dropped after it has been read; shapefiles are iterated with fiona.
+    ISO partfields are converted as soon as they have been read.
+    KML and shapefile features (just their coordinate arrays) are collected until the end of the file,
+    because a guidance line may come before the boundary it belongs to.
+    Every boundary polygon (together with the guidance lines inside) and every other guidance line becomes a ``Field``:
+    the rows run parallel to the guidance line (or the long side of the boundary) and fill the boundary,
+    leaving ``outline_buffer_width`` at both ends for turning.
+    Curved guidance lines are approximated by the line from their first to their last point.
+
+    ``import_file`` reads and converts the file in a thread and adds all fields to the provider at once;
+    ``progress`` (0 to 1) tells how much of the file has been processed so far.
+    """
+
+    def __init__(self, field_provider: FieldProvider, *,
+                 row_spacing: float = 0.5,
+                 outline_buffer_width: float = 2.0) -> None:
+        self.log = logging.getLogger('field_friend.field_importer')
+        self.field_provider = field_provider
+        self.row_spacing = row_spacing
+        self.outline_buffer_width = outline_buffer_width
+        self.progress: float = 0.0
+
+    async def import_file(self, source: BinaryIO, filename: str) -> list[Field]:
+        """Import all fields of the file and add them to the field provider."""
+        self.progress = 0.0
+        features = self.read(source, filename)
+        first = await rosys.run.io_bound(next, features, None)
+        if first is None:
+            return []
+        if not localization.reference.is_set:
+            points = first.boundary if first.boundary is not None else first.guidance
+            assert points is not None
+            localization.reference.update(GeoPoint(lat=float(points[0, 0]), long=float(points[0, 1])))
+        fields = await rosys.run.io_bound(self.create_fields, itertools.chain([first], features)) or []
+        self.field_provider.add_fields(fields)
+        self.log.info('Imported %d fields from %s', len(fields), filename)
+        return fields
+
+    def read(self, source: BinaryIO, filename: str) -> Iterator[ImportedFeature]:
+        """Read the features of the file, choosing the format by the file extension."""
+        suffix = PurePath(filename).suffix.casefold()
+        if suffix == '.xml':
+            yield from self.read_iso_xml(source)
+        elif suffix == '.kml':
+            yield from _pair_lines_with_boundaries(self.read_kml(source))
+        elif suffix == '.zip':
+            yield from _pair_lines_with_boundaries(self.read_shapefile(source))
+        else:
+            raise ValueError(f'Unsupported file type: {filename}')
+        self.progress = 1.0
+
+    def read_iso_xml(self, source: BinaryIO) -> Iterator[ImportedFeature]:
+        """Read the boundaries and the guidance patterns of every partfield (``PFD``) of an ISO 11783 TaskData file.
+
+        Every boundary polygon of a partfield becomes a feature of its own, combined with the guidance lines inside.
+        """
+        size = _size(source)
+        for _, element in ET.iterparse(source, events=('end',)):
+            if element.tag != 'PFD':
+                continue
+            name = element.get('C') or element.get('A') or 'Partfield'
+            rings = [_iso_points(lsg)
+                     for pln in element.iter('PLN') if pln.get('A') == ISO_BOUNDARY_POLYGON
+                     for lsg in pln.iter('LSG') if lsg.get('A') == ISO_EXTERIOR_RING]
+            rings = [ring for ring in rings if len(ring) >= 3]
+            guidance_lines = [(gpn.get('B') or '', _iso_points(lsg))
+                              for gpn in element.iter('GPN')
+                              for lsg in gpn.iter('LSG') if lsg.get('A') == ISO_GUIDANCE_PATTERN]
+            guidance_lines = [(line_name, points) for line_name, points in guidance_lines if len(points) >= 2]
+            features = [ImportedFeature(name=name if len(rings) == 1 else f'{name} {i + 1}', boundary=ring)
+                        for i, ring in enumerate(rings)]
+            features += [ImportedFeature(name=line_name if len(guidance_lines) > 1 else '', guidance=points)
+                         for line_name, points in guidance_lines]
+            for feature in _pair_lines_with_boundaries(features):
+                is_line = feature.boundary is None
+                yield replace(feature, name=f'{name} {feature.name}'.strip()) if is_line else feature
+            element.clear()
+            self.progress = source.tell() / size
+
+    def read_kml(self, source: BinaryIO) -> Iterator[ImportedFeature]:
+        """Read the polygons and line strings of every KML placemark."""
+        size = _size(source)
+        for _, element in ET.iterparse(source, events=('end',)):
+            if _local_name(element.tag) != 'Placemark':
+                continue
+            name = next((child.text or '' for child in element if _local_name(child.tag) == 'name'), '').strip()
+            for geometry in element.iter():
+                tag = _local_name(geometry.tag)
+                if tag == 'Polygon':
+                    outer = next((e for e in geometry if _local_name(e.tag) == 'outerBoundaryIs'), None)
+                    coordinates = _kml_coordinates(outer) if outer is not None else None
+                    if coordinates is not None:
+                        yield ImportedFeature(name=name, boundary=coordinates)
+                elif tag == 'LineString':
+                    coordinates = _kml_coordinates(geometry)
+                    if coordinates is not None:
+                        yield ImportedFeature(name=name, guidance=coordinates)
+            element.clear()
+            self.progress = source.tell() / size
+
+    def read_shapefile(self, source: BinaryIO) -> Iterator[ImportedFeature]:
+        """Read the polygons and line strings of every shapefile in a zip archive."""
+        data = source.read()
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            paths = [name for name in archive.namelist() if name.casefold().endswith('.shp')]
+        if not paths:
+            raise ValueError('The zip file does not contain a shapefile')
+        with ZipMemoryFile(data) as memory_file:
+            for n, path in enumerate(paths):
+                with memory_file.open(path) as collection:
+                    crs = collection.crs
+                    count = max(len(collection), 1)
+                    for i, feature in enumerate(collection):
+                        geometry = feature.geometry
+                        if geometry is None:
+                            continue
+                        if crs and crs.to_epsg() != 4326:
+                            geometry = transform_geom(crs, 'EPSG:4326', geometry)
+                        properties = feature.properties or {}
+                        name = str(next((properties[key] for key in ('name', 'Name', 'NAME') if properties.get(key)),
+                                        f'{PurePath(path).stem} {i + 1}'))
+                        shape = shapely.geometry.shape(geometry)
+                        for part in getattr(shape, 'geoms', [shape]):
+                            if isinstance(part, shapely.Polygon):
+                                yield ImportedFeature(name=name, boundary=np.array(part.exterior.coords)[:, 1::-1])
+                            elif isinstance(part, shapely.LineString):
+                                yield ImportedFeature(name=name, guidance=np.array(part.coords)[:, 1::-1])
+                        self.progress = (n + (i + 1) / count) / len(paths)
+
+    def create_fields(self, features: Iterable[ImportedFeature]) -> list[Field]:
+        """Create a field for every feature (skipping degenerated ones)."""
+        fields: list[Field] = []
+        for feature in features:
+            parameters = self.field_parameters(feature)
+            if parameters is None:
+                self.log.warning('Skipping %s: its geometry does not define a field', feature.name)
+                continue
+            first_row_start, first_row_end, row_count = parameters
+            fields.append(Field(id=str(uuid4()),
+                                name=feature.name,
+                                first_row_start=first_row_start,
+                                first_row_end=first_row_end,
+                                row_spacing=self.row_spacing,
+                                row_count=row_count,
+                                outline_buffer_width=self.outline_buffer_width))
+        return fields
+
+    def field_parameters(self, feature: ImportedFeature) -> tuple[GeoPoint, GeoPoint, int] | None:
+        """Compute the first row and the number of rows covering the boundary of the feature.
+
+        The rows run along the guidance line, which also fixes their lateral position;
+        without guidance line they run along the long side of the boundary's minimum rotated rectangle.
+        Without boundary the guidance line becomes a field with a single row.
+        """
+        points = feature.boundary if feature.boundary is not None else feature.guidance
+        if points is None or len(points) < 2:
+            return None
+        projection = LocalProjection(float(points[0, 0]), float(points[0, 1]))
+        boundary = projection.project(feature.boundary) if feature.boundary is not None else None
+        if feature.guidance is not None:
+            a, b = projection.project(feature.guidance[[0, -1]])
+            anchor = 0.0
+        else:
+            assert boundary is not None
+            if len(boundary) < 3:
+                return None
+            rectangle = np.array(shapely.minimum_rotated_rectangle(shapely.MultiPoint(boundary)).exterior.coords)
+            if len(rectangle) < 4:
+                return None
+            c0, c1, c2 = rectangle[:3]
+            a, b = (c0, c1) if np.hypot(*(c1 - c0)) >= np.hypot(*(c2 - c1)) else (c1, c2)
+            anchor = None
+        length = float(np.hypot(*(b - a)))
+        if length < 1e-3:
+            return None
+        direction = (b - a) / length
+        normal = np.array([direction[1], -direction[0]])  # to the right of the first row, like Field._generate_rows
+        if boundary is None:
+            return GeoPoint.from_list(projection.unproject(a)[0]), GeoPoint.from_list(projection.unproject(b)[0]), 1
+
+        along = (boundary - a) @ direction
+        across = (boundary - a) @ normal
+        start, end = float(along.min()), float(along.max())
+        if end - start > 2 * self.outline_buffer_width:
+            start += self.outline_buffer_width
+            end -= self.outline_buffer_width
+        if anchor is None:
+            anchor = float(across.min()) + self.row_spacing / 2
+        first = math.ceil((across.min() - anchor) / self.row_spacing - 1e-9)
+        last = math.floor((across.max() - anchor) / self.row_spacing + 1e-9)
+        if last < first:
+            first = last = round((across.mean() - anchor) / self.row_spacing)
+        offset = anchor + first * self.row_spacing
+        first_row = projection.unproject(np.array([a + start * direction + offset * normal,
+                                                   a + end * direction + offset * normal]))
+        return GeoPoint.from_list(first_row[0]), GeoPoint.from_list(first_row[1]), last - first + 1
+
+
+def _pair_lines_with_boundaries(features: Iterable[ImportedFeature]) -> Iterator[ImportedFeature]:
+    """Combine every guidance line with the boundary containing its center; other features are kept as they are."""
+    boundaries: list[ImportedFeature] = []
+    lines: list[ImportedFeature] = []
+    for feature in features:
+        (boundaries if feature.boundary is not None else lines).append(feature)
+    polygons = [shapely.Polygon(feature.boundary) for feature in boundaries]
+    tree = shapely.STRtree(polygons)
+    paired: set[int] = set()
+    for line in lines:
+        assert line.guidance is not None
+        center = shapely.LineString(line.guidance).interpolate(0.5, normalized=True)
+        index = next((int(i) for i in tree.query(center, predicate='within')), None)
+        if index is None:
+            yield line
+            continue
+        paired.add(index)
+        boundary = boundaries[index]
+        name = ' '.join(dict.fromkeys(n for n in (boundary.name, line.name) if n))
+        yield ImportedFeature(name=name, boundary=boundary.boundary, guidance=line.guidance)
+    for i, boundary in enumerate(boundaries):
+        if i not in paired:
+            yield boundary
+
+
+def _size(source: BinaryIO) -> int:
+    size = source.seek(0, 2)
+    source.seek(0)
+    return max(size, 1)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _iso_points(element: ET.Element) -> np.ndarray:
+    return np.array([(float(pnt.attrib['C']), float(pnt.attrib['D'])) for pnt in element.iter('PNT')]).reshape(-1, 2)
+
+
+def _kml_coordinates(element: ET.Element) -> np.ndarray | None:
+    """Parse the first KML ``coordinates`` ("long,lat[,alt] ...") below the element into an Nx2 array of (lat, long)."""
+    text = next((e.text for e in element.iter() if _local_name(e.tag) == 'coordinates' and e.text), None)
+    if text is None:
+        return None
+    return np.array([[float(v) for v in point.split(',')[1::-1]] for point in text.split()]).reshape(-1, 2)
@@ -1,16 +1,22 @@
 import logging
+from pathlib import Path
 from typing import Any
 
+import numpy as np
 import rosys
 
 from .field import Field, Row, RowSupportPoint
 
 
 class FieldProvider(rosys.persistence.PersistentModule):
+    GEOMETRY_PATH = Path('~/.rosys/field_geometry.npz').expanduser()
+
     def __init__(self) -> None:
         super().__init__()
         self.log = logging.getLogger('field_friend.field_provider')
-        self.fields: list[Field] = []
+        self._fields: dict[str, Field] = {}
+        self.geometry_path: Path | None = None if rosys.is_test else self.GEOMETRY_PATH
+        """side file with the generated rows and outlines, so restoring does not need to regenerate them"""
         self.needs_backup: bool = False
 
         self.FIELDS_CHANGED = rosys.event.Event()
@@ -26,6 +32,11 @@ class FieldProvider(rosys.persistence.PersistentModule):
         self._only_specific_beds: bool = False
         self._selected_beds: list[int] = []
 
+    @property
+    def fields(self) -> list[Field]:
+        """All fields in the order they were added (a new list; use the provider methods to add or remove fields)."""
+        return list(self._fields.values())
+
     @property
     def selected_beds(self) -> list[int]:
         return self._selected_beds
@@ -35,42 +46,109 @@ class FieldProvider(rosys.persistence.PersistentModule):
         self._selected_beds = sorted(value)
 
     def backup(self) -> dict:
+        if self.geometry_path is not None:
+            try:
+                self._backup_geometry(self.geometry_path)
+            except Exception:
+                self.log.exception('Failed to store the field geometry in %s', self.geometry_path)
         return {
-            'fields': {f.id: f.to_dict() for f in self.fields},
+            'fields': {f.id: f.to_dict() for f in self._fields.values()},
             'selected_field': self.selected_field.id if self.selected_field else None,
         }
 
     def restore(self, data: dict[str, Any]) -> None:
         fields_data: dict[str, dict] = data.get('fields', {})
+        geometry = self._load_geometry(self.geometry_path) if self.geometry_path is not None else {}
         for field in list(fields_data.values()):
-            new_field = Field.from_dict(field)
-            self.fields.append(new_field)
+            new_field = Field.from_dict(field, geometry=geometry)
+            self._fields[new_field.id] = new_field
         selected_field_id: str | None = data.get('selected_field')
         if selected_field_id:
             self.selected_field = self.get_field(selected_field_id)
             self.FIELD_SELECTED.emit()
         self.FIELDS_CHANGED.emit()
 
+    def _backup_geometry(self, path: Path) -> None:
+        """Store the ``geometry_arrays`` of all fields as a few concatenated columns, so they load with few reads."""
+        fields = list(self._fields.values())
+        geometries = [field.geometry_arrays() for field in fields]
+
+        def concatenate(name: str) -> np.ndarray:
+            return np.concatenate([g[name] for g in geometries]) if geometries else np.empty(0)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix('.tmp')
+        with temp_path.open('wb') as f:
+            np.savez(f,
+                     version=np.array(Field.GEOMETRY_VERSION),
+                     keys=np.array([field.geometry_key() for field in fields], dtype=str),
+                     row_counts=np.array([len(g['row_offsets']) for g in geometries], dtype=np.int64),
+                     outline_lengths=np.array([len(g['outline']) for g in geometries], dtype=np.int64),
+                     outline_buffer_widths=np.array([g['outline_buffer_width'] for g in geometries], dtype=np.float64),
+                     row_offsets=concatenate('row_offsets'),
+                     row_lengths=concatenate('row_lengths'),
+                     row_points=concatenate('row_points'),
+                     outline=concatenate('outline'))
+        temp_path.replace(path)
+
+    def _load_geometry(self, path: Path) -> dict[str, dict[str, np.ndarray]]:
+        """Load the stored geometry of all fields by geometry key; each field validates its own arrays when restored."""
+        if not path.exists():
+            return {}
+        try:
+            with np.load(path) as data:
+                if int(data['version']) != Field.GEOMETRY_VERSION:
+                    self.log.info('Ignoring field geometry of version %s', data['version'])
+                    return {}
+                columns = {name: data[name] for name in data.files}
+            row_ends = np.cumsum(columns['row_counts']).tolist()
+            point_ends = np.cumsum(columns['row_lengths']).tolist()
+            outline_ends = np.cumsum(columns['outline_lengths']).tolist()
+            geometry: dict[str, dict[str, np.ndarray]] = {}
+            for i, key in enumerate(columns['keys'].tolist()):
+                row_start = row_ends[i - 1] if i else 0
+                row_end = row_ends[i]
+                point_start = point_ends[row_start - 1] if row_start else 0
+                point_end = point_ends[row_end - 1] if row_end else 0
+                outline_start = outline_ends[i - 1] if i else 0
+                geometry[key] = {
+                    'row_offsets': columns['row_offsets'][row_start:row_end],
+                    'row_lengths': columns['row_lengths'][row_start:row_end],
+                    'row_points': columns['row_points'][point_start:point_end],
+                    'outline': columns['outline'][outline_start:outline_ends[i]],
+                    'outline_buffer_width': columns['outline_buffer_widths'][i],
+                }
+            return geometry
+        except Exception:
+            self.log.exception('Failed to load the field geometry from %s', path)
+            return {}
+
     def invalidate(self) -> None:
         self.request_backup()
         self.FIELDS_CHANGED.emit()
-        if self.selected_field and self.selected_field not in self.fields:
+        if self.selected_field and self._fields.get(self.selected_field.id) is not self.selected_field:
             self.selected_field = None
             self._only_specific_beds = False
             self.selected_beds = []
             self.FIELD_SELECTED.emit()
 
     def get_field(self, id_: str | None) -> Field | None:
-        return next((f for f in self.fields if f.id == id_), None)
+        return self._fields.get(id_) if id_ is not None else None
 
     def create_field(self, new_field: Field) -> Field:
-        self.fields.append(new_field)
+        self._fields[new_field.id] = new_field
         self.select_field(new_field.id)
         self.invalidate()
         return new_field
 
+    def add_fields(self, fields: list[Field]) -> None:
+        """Add several fields at once (e.g. from an import), with a single backup and change event."""
+        if not fields:
+            return
+        self._fields.update((field.id, field) for field in fields)
+        self.invalidate()
+
     def clear_fields(self) -> None:
-        self.fields.clear()
+        self._fields.clear()
         self.invalidate()
 
     def delete_selected_field(self) -> None:
@@ -78,7 +156,7 @@ class FieldProvider(rosys.persistence.PersistentModule):
             self.log.warning('No field selected. Nothing was deleted.')
             return
         name = self.selected_field.name
-        self.fields.remove(self.selected_field)
+        del self._fields[self.selected_field.id]
         self.log.info('Field %s has been deleted.', name)
         self.invalidate()
 
@@ -101,7 +179,7 @@ class FieldProvider(rosys.persistence.PersistentModule):
         self.invalidate()
 
     def refresh_fields(self) -> None:
-        for field in self.fields:
+        for field in self._fields.values():
             field.refresh()
 
     def select_field(self, id_: str | None) -> None:
@@ -145,8 +223,6 @@ class FieldProvider(rosys.persistence.PersistentModule):
         if len(self.selected_beds) == 0:
             self.log.warning('No beds selected. Cannot get rows to work on.')
             return []
-        row_indices = []
-        for bed in self.selected_beds:
-            for row_index in range(self.selected_field.row_count):
-                row_indices.append((bed - 1) * self.selected_field.row_count + row_index)
-        return [row for i, row in enumerate(self.selected_field.rows) if i in row_indices]
+        field = self.selected_field
+        return [row for bed in sorted(set(self.selected_beds)) if 1 <= bed <= field.bed_count
+                for row in field.rows[field.bed_slices[bed - 1]]]
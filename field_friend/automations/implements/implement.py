@@ -7,6 +7,8 @@ class Implement(abc.ABC):  # noqa: B024
     def __init__(self, name: str) -> None:
         self.name = name
         self.is_active = False
+        self.creep_speed: float = 0.0
+        """speed in m/s at which the robot keeps moving while working (0 for stop-and-go)"""
 
     async def prepare(self) -> bool:
         """Prepare the implement once at the beginning (for reference points, etc.);
@@ -26,6 +28,12 @@ class Implement(abc.ABC):  # noqa: B024
         """Deactivate the implement (for example to stop weeding at the row's end)"""
         self.is_active = False
 
+    def max_creep_speed(self) -> float:
+        """Return the highest speed in m/s at which the implement can work while the robot keeps moving.
+
+        0 means the robot has to stand still while working."""
+        return 0.0
+
     async def get_stretch(self, max_distance: float) -> float:  # pylint: disable=unused-argument
         """Return the stretch which the implement thinks is safe to drive forward."""
         return 0.02
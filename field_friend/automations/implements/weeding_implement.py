@@ -1,9 +1,10 @@
+import asyncio
 import logging
 from collections import deque
 from typing import TYPE_CHECKING, Any
 
 import rosys
-from nicegui import ui
+from nicegui import background_tasks, ui
 from rosys.geometry import Point3d, Pose
 
 from ...hardware import ChainAxis
@@ -19,6 +20,7 @@ class ImplementException(Exception):
 
 class WeedingImplement(Implement, rosys.persistence.PersistentModule):
     WORKING_DISTANCE = 0.15
+    MAX_SETTLING_WAIT = 2.0
 
     def __init__(self,  name: str, system: 'System', persistence_key: str = 'weeding') -> None:
         Implement.__init__(self, name)
@@ -45,6 +47,8 @@ class WeedingImplement(Implement, rosys.persistence.PersistentModule):
         self.weeds_to_handle: dict[str, Point3d] = {}
         self.last_punches: deque[Point3d] = deque(maxlen=5)
         self.next_punch_y_position: float = 0
+        self._y_positioning: asyncio.Task | None = None
+        self._y_positioning_target: float | None = None
 
     async def prepare(self) -> bool:
         await super().prepare()
@@ -73,14 +77,20 @@ class WeedingImplement(Implement, rosys.persistence.PersistentModule):
 
     async def deactivate(self):
         await super().deactivate()
+        if self._y_positioning is not None:
+            self._y_positioning.cancel()
+            self._y_positioning = None
         self.system.timelapse_recorder.camera = None
         if self.system.field_friend.flashlight:
             await self.system.field_friend.flashlight.turn_off()
         self.system.plant_locator.pause()
 
     async def start_workflow(self) -> None:
-        # TODO: only sleep when moving
-        await rosys.sleep(2)  # wait for robot to stand still
+        if not self.creep_speed:
+            try:
+                await self.system.motion_state_estimator.wait_until_settled(timeout=self.MAX_SETTLING_WAIT)
+            except TimeoutError:
+                self.log.warning('Robot did not settle, working anyway')
         if not self._has_plants_to_handle():
             return
         self.log.info(f'Handling plants with {self.name}...')
@@ -90,6 +100,26 @@ class WeedingImplement(Implement, rosys.persistence.PersistentModule):
         self.crops_to_handle = {}
         self.weeds_to_handle = {}
 
+    def _preposition_y_axis(self, y: float) -> None:
+        """Move the y axis towards the next target in the background while the robot is still driving."""
+        if self._y_positioning_target is not None and abs(self._y_positioning_target - y) < 0.001:
+            return
+        if self._y_positioning is not None and not self._y_positioning.done():
+            return  # NOTE: the axis cannot be retargeted while moving; the punch will correct the position
+        self._y_positioning_target = y
+        self._y_positioning = background_tasks.create(self.puncher.move_y_to(y), name='preposition y axis')
+
+    async def _wait_for_y_axis(self) -> None:
+        if self._y_positioning is None:
+            return
+        try:
+            await self._y_positioning
+        except Exception:
+            self.log.exception('Could not preposition y axis')
+        finally:
+            self._y_positioning = None
+            self._y_positioning_target = None
+
     # TODO: can we get rid of the pylint disable?
     async def _check_hardware_ready(self) -> bool:  # pylint: disable=too-many-return-statements
         if self.system.field_friend.estop.active or self.system.field_friend.estop.is_soft_estop_active:
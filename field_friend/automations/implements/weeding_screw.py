@@ -1,6 +1,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
 from typing import TYPE_CHECKING, Any
 
 import rosys
@@ -14,6 +15,7 @@ if TYPE_CHECKING:
 
 
 class WeedingScrew(WeedingImplement):
+    PUNCH_DURATION = 2.0
 
     def __init__(self, system: System) -> None:
         super().__init__('Weed Screw', system, 'weeding_screw')
@@ -21,14 +23,35 @@ class WeedingScrew(WeedingImplement):
         self.log.info(f'Using relevant weeds: {self.relevant_weeds}')
         self.weed_screw_depth: float = 0.13
         self.max_crop_distance: float = 0.08
+        self.punch_duration: float = self.PUNCH_DURATION
+        """moving average of the measured punch durations in seconds"""
+        self.following_punch_y_position: float | None = None
+        """local y position of the weed after the next one (the y axis moves there as soon as the next punch is done)"""
+
+    def max_creep_speed(self) -> float:
+        # NOTE: while punching, the screw is dragged along by at most the drill radius
+        return self.system.field_friend.DRILL_RADIUS / self.punch_duration
+
+    @property
+    def lead_distance(self) -> float:
+        """Distance the robot creeps until the middle of the punch, so the drag is centered on the target."""
+        return self.creep_speed * self.punch_duration / 2
 
     async def start_workflow(self) -> None:
         await super().start_workflow()
         try:
+            await self._wait_for_y_axis()
             punch_position = self.system.odometer.prediction.transform3d(
-                rosys.geometry.Point3d(x=self.system.field_friend.WORK_X, y=self.next_punch_y_position, z=0))
+                rosys.geometry.Point3d(x=self.system.field_friend.WORK_X + self.lead_distance,
+                                       y=self.next_punch_y_position, z=0))
             self.last_punches.append(punch_position)
+            start_time = rosys.time()
             await self.system.puncher.punch(y=self.next_punch_y_position, depth=self.weed_screw_depth)
+            self.punch_duration = 0.7 * self.punch_duration + 0.3 * (rosys.time() - start_time)
+            if self.creep_speed and self.following_punch_y_position is not None:
+                # NOTE: the screw is out of the ground, so the y axis can head for the following weed right away
+                self._preposition_y_axis(self.following_punch_y_position)
+            self.following_punch_y_position = None
             punched_weeds = [weed.id for weed in self.system.plant_provider.get_relevant_weeds(self.system.odometer.prediction.point_3d())
                              if weed.position.distance(punch_position) <= self.system.field_friend.DRILL_RADIUS]
             for weed_id in punched_weeds:
@@ -52,9 +75,27 @@ class WeedingScrew(WeedingImplement):
             self.log.info('No weeds in range')
             return self.WORKING_DISTANCE
         self.log.info(f'Found {len(weeds_in_range)} weeds in range: {weeds_in_range}')
-        for next_weed_id, next_weed_position in weeds_in_range.items():
-            # next_weed_position.x += 0.01  # NOTE somehow this helps to mitigate an offset we experienced in the tests
-            weed_world_position = self.system.odometer.prediction.transform3d(next_weed_position)
+        targets = self._targets(weeds_in_range)
+        target = next(targets, None)
+        if target is None:
+            return self.WORKING_DISTANCE
+        next_weed_id, next_weed_position, stretch = target
+        self.log.info(f'Targeting weed {next_weed_id} which is {stretch} away at local: {next_weed_position}')
+        if self.creep_speed:
+            self._preposition_y_axis(next_weed_position.y)
+        if stretch >= max_distance:
+            return self.WORKING_DISTANCE
+        self.next_punch_y_position = next_weed_position.y
+        following = next((position for _, position, _ in targets
+                          if position.distance(next_weed_position) > self.system.field_friend.DRILL_RADIUS), None)
+        self.following_punch_y_position = following.y if following is not None else None
+        return stretch
+
+    def _targets(self, weeds: dict[str, rosys.geometry.Point3d]) -> Iterator[tuple[str, rosys.geometry.Point3d, float]]:
+        """Yield the weeds (in local coordinates) which should be punched, with the distance to drive to each of them."""
+        for weed_id, position in weeds.items():
+            # position.x += 0.01  # NOTE somehow this helps to mitigate an offset we experienced in the tests
+            weed_world_position = self.system.odometer.prediction.transform3d(position)
             crops = self.system.plant_provider.get_relevant_crops(self.system.odometer.prediction.point_3d())
             if self.cultivated_crop and not any(c.position.distance(weed_world_position) < self.max_crop_distance for c in crops):
                 self.log.info('Skipping weed because it is to far from the cultivated crops')
@@ -62,18 +103,11 @@ class WeedingScrew(WeedingImplement):
             if any(p.distance(weed_world_position) < self.system.field_friend.DRILL_RADIUS for p in self.last_punches):
                 self.log.info('Skipping weed because it was already punched')
                 continue
-            stretch = next_weed_position.x - self.system.field_friend.WORK_X
+            stretch = position.x - self.system.field_friend.WORK_X
             if stretch < - self.system.field_friend.DRILL_RADIUS:
-                self.log.info(f'Skipping weed {next_weed_id} because it is behind the robot')
+                self.log.info(f'Skipping weed {weed_id} because it is behind the robot')
                 continue
-            stretch = max(stretch, 0)
-            self.log.info(f'Targeting weed {next_weed_id} which is {stretch} away at world: '
-                          f'{weed_world_position}, local: {next_weed_position}')
-            if stretch < max_distance:
-                self.next_punch_y_position = next_weed_position.y
-                return stretch
-            break
-        return self.WORKING_DISTANCE
+            yield weed_id, position, max(stretch - self.lead_distance, 0)
 
     def settings_ui(self):
         super().settings_ui()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+from enum import Enum, auto
+from typing import Any
+
+import rosys
+from nicegui import ui
+from rosys.driving import Odometer
+from rosys.geometry import Pose, Velocity
+
+
+class MotionState(Enum):
+    MOVING = auto()
+    STOPPED = auto()
+    SETTLED = auto()
+
+
+class MotionStateEstimator(rosys.persistence.PersistentModule):
+    """Estimates whether the robot is moving, has just stopped or has settled, based on the wheel velocity feedback.
+
+    The robot is stopped as soon as all measured velocities are below the thresholds
+    and settled once it has been stopped for the settling time (e.g. to let the chassis stop swaying).
+    """
+    LINEAR_THRESHOLD = 0.005
+    ANGULAR_THRESHOLD = 0.01
+    SETTLING_TIME = 0.3
+
+    def __init__(self, wheels: rosys.driving.VelocityProvider, odometer: Odometer, *,
+                 persistence_key: str = 'motion_state_estimator') -> None:
+        super().__init__(persistence_key=f'field_friend.automations.{persistence_key}')
+        self.STOPPED = rosys.event.Event()
+        """the robot came to a stop (argument: pose of the robot)"""
+
+        self.SETTLED = rosys.event.Event()
+        """the robot has been standing still for the settling time (argument: pose of the robot)"""
+
+        self.MOVED = rosys.event.Event()
+        """the robot started moving"""
+
+        self.log = logging.getLogger('field_friend.motion_state_estimator')
+        self.odometer = odometer
+        self.linear_threshold = self.LINEAR_THRESHOLD
+        self.angular_threshold = self.ANGULAR_THRESHOLD
+        self.settling_time = self.SETTLING_TIME
+
+        self.state = MotionState.MOVING
+        self.stop_time: float | None = None
+        self.stop_pose: Pose | None = None
+        wheels.VELOCITY_MEASURED.register(self.handle_velocities)
+
+    def backup(self) -> dict:
+        return {
+            'linear_threshold': self.linear_threshold,
+            'angular_threshold': self.angular_threshold,
+            'settling_time': self.settling_time,
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        self.linear_threshold = data.get('linear_threshold', self.linear_threshold)
+        self.angular_threshold = data.get('angular_threshold', self.angular_threshold)
+        self.settling_time = data.get('settling_time', self.settling_time)
+
+    @property
+    def is_stopped(self) -> bool:
+        return self.state != MotionState.MOVING
+
+    @property
+    def is_settled(self) -> bool:
+        return self.state == MotionState.SETTLED
+
+    def handle_velocities(self, velocities: list[Velocity]) -> None:
+        for velocity in velocities:
+            if abs(velocity.linear) > self.linear_threshold or abs(velocity.angular) > self.angular_threshold:
+                if self.state != MotionState.MOVING:
+                    self.state = MotionState.MOVING
+                    self.stop_time = None
+                    self.stop_pose = None
+                    self.MOVED.emit()
+                continue
+            if self.state == MotionState.MOVING:
+                self.state = MotionState.STOPPED
+                self.stop_time = velocity.time
+                self.stop_pose = self.odometer.prediction
+                self.STOPPED.emit(self.stop_pose)
+            if self.state == MotionState.STOPPED and self.stop_time is not None and \
+                    velocity.time - self.stop_time >= self.settling_time:
+                self.state = MotionState.SETTLED
+                self.SETTLED.emit(self.stop_pose)
+
+    async def wait_for_stop(self, timeout: float | None = None) -> None:
+        """Return as soon as the robot is stopped (or raise a ``TimeoutError``)."""
+        if not self.is_stopped:
+            await self.STOPPED.emitted(timeout)
+
+    async def wait_until_settled(self, timeout: float | None = None) -> None:
+        """Return as soon as the robot is settled (or raise a ``TimeoutError``)."""
+        if not self.is_settled:
+            await self.SETTLED.emitted(timeout)
+
+    def settings_ui(self) -> None:
+        ui.number('Linear threshold', step=0.001, min=0.001, max=0.1, format='%.3f', on_change=self.request_backup) \
+            .props('dense outlined suffix=m/s') \
+            .classes('w-24') \
+            .bind_value(self, 'linear_threshold') \
+            .tooltip(f'Linear velocity below which the robot counts as stopped (default: {self.LINEAR_THRESHOLD:.3f})')
+        ui.number('Angular threshold', step=0.001, min=0.001, max=0.2, format='%.3f', on_change=self.request_backup) \
+            .props('dense outlined suffix=rad/s') \
+            .classes('w-24') \
+            .bind_value(self, 'angular_threshold') \
+            .tooltip(f'Angular velocity below which the robot counts as stopped (default: {self.ANGULAR_THRESHOLD:.3f})')
+        ui.number('Settling time', step=0.05, min=0.0, max=2.0, format='%.2f', on_change=self.request_backup) \
+            .props('dense outlined suffix=s') \
+            .classes('w-24') \
+            .bind_value(self, 'settling_time') \
+            .tooltip(f'Time the robot has to stand still before it counts as settled (default: {self.SETTLING_TIME:.2f})')
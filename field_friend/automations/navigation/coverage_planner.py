@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import itertools
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+import rosys
+from rosys.driving import PathSegment
+from rosys.driving.driver import DriveParameters
+from rosys.geometry import Point, Pose, Spline
+
+from ..field import Row
+
+
+@dataclass(slots=True, kw_only=True)
+class CoveragePlan:
+    rows: list[Row] = field(default_factory=list)
+    """rows in the order they should be worked on"""
+    working_time: float = 0.0
+    """time in seconds for driving along the rows"""
+    turning_time: float = 0.0
+    """time in seconds for changing between the rows"""
+    area: float = 0.0
+    """worked area in m²"""
+
+    @property
+    def total_time(self) -> float:
+        return self.working_time + self.turning_time
+
+    @property
+    def throughput(self) -> float:
+        """Worked area per time in ha/h."""
+        return self.area / 10_000 / (self.total_time / 3600) if self.total_time > 0 else 0.0
+
+
+class CoveragePlanner:
+    """Finds the order of rows with the least time spent changing rows.
+
+    The rows are worked alternately in opposite directions, so each row change happens in the headland at one end.
+    Its duration depends on the lateral distance ``d`` between the rows and the kinematics of the driver:
+
+    - ``d >= 2 r``: U-turn with two quarter circles and a straight in between;
+      the radius is ``d / 2`` (a semicircle) as long as it fits into the headland, but at least ``r``,
+    - ``d < 2 r``: Ω-turn (turning away first), which needs more headland than ``r``;
+      if it does not fit into the headland (or is slower), the robot switches back by reversing.
+
+    ``transition_path`` creates these maneuvers as spline paths for ``Driver.drive_path``.
+
+    Turning is limited by the angular speed limit, so for robots turning on the spot (``r`` ≈ 0)
+    every row change costs two 90° turns plus the lateral distance.
+    Whenever adjacent rows are closer than ``2 r``, skipping rows (e.g. 0, 3, 1, 4, 2, ...) avoids the expensive turns.
+    The order is optimized with 2-opt, starting from the sequential and the greedy order;
+    the sequential order is only replaced by a strictly faster one.
+
+    The times are estimates at the speed limits, without stops of the implement.
+    """
+    MAX_TWO_OPT_PASSES = 20
+
+    def __init__(self, parameters: DriveParameters, *,
+                 working_speed: float,
+                 headland_width: float,
+                 row_spacing: float) -> None:
+        self.linear_speed = min(working_speed, parameters.linear_speed_limit)
+        self.angular_speed = parameters.angular_speed_limit
+        self.turning_radius = parameters.minimum_turning_radius
+        self.headland_width = headland_width
+        self.row_spacing = row_spacing
+
+    def turn_time(self, distance: np.ndarray | float) -> np.ndarray:
+        """Time in seconds to change to a row at the given lateral distance."""
+        d = np.abs(np.asarray(distance, dtype=np.float64))
+        r = self.turning_radius
+        radius = self._u_turn_radius(d)
+        u_turn = np.pi * self._seconds_per_radian(radius) + (d - 2 * radius) / self.linear_speed
+        if r <= 0:
+            return u_turn
+        switch_back = self._switch_back_time(d)
+        narrow_turn = np.where(self._omega_fits(d), np.minimum(self._omega_time(d), switch_back), switch_back)
+        return np.where(d < 2 * r, narrow_turn, u_turn)
+
+    def _seconds_per_radian(self, radius: np.ndarray | float) -> np.ndarray:
+        return np.maximum(np.asarray(radius) / self.linear_speed, 1 / self.angular_speed)
+
+    def _omega_time(self, d: np.ndarray | float) -> np.ndarray:
+        return (np.pi + 4 * self._omega_angle(d)) * self._seconds_per_radian(self.turning_radius)
+
+    def _switch_back_time(self, d: np.ndarray | float) -> np.ndarray:
+        r = self.turning_radius
+        return np.pi * self._seconds_per_radian(r) + 2 * (2 * r - np.asarray(d)) / self.linear_speed
+
+    def _u_turn_radius(self, d: np.ndarray) -> np.ndarray:
+        return np.maximum(self.turning_radius, np.minimum(d / 2, self.headland_width))
+
+    def _omega_angle(self, d: np.ndarray | float) -> np.ndarray:
+        """Angle of turning away from the next row at the start (and end) of an Ω-turn."""
+        return np.pi / 2 - np.arcsin(np.clip((d + 2 * self.turning_radius) / (4 * self.turning_radius), -1.0, 1.0))
+
+    def _omega_fits(self, d: np.ndarray | float) -> np.ndarray:
+        r = self.turning_radius
+        return r + np.sqrt(np.maximum(4 * r**2 - (np.asarray(d) / 2 + r)**2, 0.0)) <= self.headland_width
+
+    def transition_path(self, start: Pose, end: Pose) -> list[PathSegment]:
+        """Create the path from the end of a row (``start``) to the start of the next row (``end``).
+
+        For rows worked in opposite directions this is the turn modeled by ``turn_time``;
+        the turn begins beyond the farther of both row ends, so it stays in the headland.
+        Otherwise (e.g. when approaching the first row) see ``_approach_path``.
+        """
+        target = start.relative_point(end.point)
+        if abs(rosys.helpers.angle(start.yaw + np.pi, end.yaw)) > np.deg2rad(30) or abs(target.y) < 1e-3:
+            return self._approach_path(start, end)
+        side = 1.0 if target.y > 0 else -1.0  # NOTE: the turn is planned to the left and mirrored for the right
+        d = abs(target.y)
+        r = self.turning_radius
+        turn_x = max(target.x, 0.0)
+        segments: list[tuple[list[Spline], bool]] = [([_line(Point(x=0, y=0), Point(x=turn_x, y=0))], False)]
+        if d >= 2 * r:
+            radius = float(self._u_turn_radius(np.array(d)))
+            segments.append((_arc(Point(x=turn_x, y=radius), radius, -np.pi / 2, np.pi / 2), False))
+            straight = _line(Point(x=turn_x + radius, y=radius), Point(x=turn_x + radius, y=d - radius))
+            segments.append(([straight], False))
+            segments.append((_arc(Point(x=turn_x, y=d - radius), radius, 0, np.pi / 2), False))
+        elif self._omega_fits(d) and self._omega_time(d) < self._switch_back_time(d):
+            theta = float(self._omega_angle(d))
+            x2 = math.sqrt(max(4 * r**2 - (d / 2 + r)**2, 0.0))
+            phi = math.atan2(d / 2 + r, x2)
+            segments.append((_arc(Point(x=turn_x, y=-r), r, np.pi / 2, -theta), False))
+            segments.append((_arc(Point(x=turn_x + x2, y=d / 2), r, phi + np.pi, np.pi + 2 * theta), False))
+            segments.append((_arc(Point(x=turn_x, y=d + r), r, -np.pi / 2 + theta, -theta), False))
+        else:  # switch-back: quarter turn, reverse, quarter turn
+            segments.append((_arc(Point(x=turn_x, y=r), r, -np.pi / 2, np.pi / 2), False))
+            segments.append(([_line(Point(x=turn_x + r, y=r), Point(x=turn_x + r, y=d - r))], True))
+            segments.append((_arc(Point(x=turn_x, y=d - r), r, 0, np.pi / 2), False))
+        segments.append(([_line(Point(x=turn_x, y=d), Point(x=target.x, y=d))], False))
+
+        def to_world(point: Point) -> Point:
+            return start.transform(Point(x=point.x, y=side * point.y))
+        return [PathSegment(spline=Spline(start=to_world(spline.start),
+                                          control1=to_world(spline.control1),
+                                          control2=to_world(spline.control2),
+                                          end=to_world(spline.end)),
+                            backward=backward)
+                for splines, backward in segments for spline in splines
+                if spline.start.distance(spline.end) > 1e-3]
+
+    def _approach_path(self, start: Pose, end: Pose) -> list[PathSegment]:
+        """Create the fastest path of a turn, a straight and another turn from ``start`` to ``end``.
+
+        Both turns follow a circle with the minimum turning radius on either side of the respective pose
+        and the straight is a common tangent of both circles.
+        Each part is driven forward or backward, whichever is shorter (like the CSC paths of Reeds and Shepp).
+        """
+        r = self.turning_radius
+        best: list[tuple[list[Spline], bool]] = []
+        best_time = math.inf
+        for side1, side2 in itertools.product((1.0, -1.0), repeat=2):
+            center1 = start.transform(Point(x=0, y=side1 * r))
+            center2 = end.transform(Point(x=0, y=side2 * r))
+            distance = center1.distance(center2)
+            if distance < 1e-9 or abs(side1 - side2) * r > distance:
+                continue  # NOTE: there is no common tangent (or infinitely many for identical circles)
+            offset = math.asin((side1 - side2) * r / distance)
+            for yaw in (center1.direction(center2) + offset, center1.direction(center2) + np.pi - offset):
+                normal = Point(x=math.sin(yaw), y=-math.cos(yaw))
+                point1 = Point(x=center1.x + side1 * r * normal.x, y=center1.y + side1 * r * normal.y)
+                point2 = Point(x=center2.x + side2 * r * normal.x, y=center2.y + side2 * r * normal.y)
+                sweep1 = rosys.helpers.eliminate_2pi(yaw - start.yaw)
+                sweep2 = rosys.helpers.eliminate_2pi(end.yaw - yaw)
+                straight = point1.distance(point2)
+                time = float((abs(sweep1) + abs(sweep2)) * self._seconds_per_radian(r) + straight / self.linear_speed)
+                if time < best_time:
+                    best_time = time
+                    # NOTE: the heading changes with the angle on the circle; driving backward reverses the direction
+                    best = [
+                        (_arc(center1, r, start.yaw - side1 * np.pi / 2, sweep1), side1 * sweep1 < 0),
+                        ([_line(point1, point2)], point1.projected_distance(point2, yaw) < 0),
+                        (_arc(center2, r, yaw - side2 * np.pi / 2, sweep2), side2 * sweep2 < 0),
+                    ]
+        return [PathSegment(spline=spline, backward=backward)
+                for splines, backward in best for spline in splines
+                if spline.start.distance(spline.end) > 1e-3]
+
+    def plan(self, rows: list[Row], start: Point | None = None) -> CoveragePlan:
+        """Plan the order of the given rows, starting with the row closest to ``start`` (or the first row)."""
+        if not rows:
+            return CoveragePlan()
+        ends = np.array([row.cartesian_array()[[0, -1]] for row in rows])  # Nx2x2
+        lengths = np.linalg.norm(ends[:, 1] - ends[:, 0], axis=1)
+        # lateral distance between rows: mean distance of their start points and of their end points
+        distances = (np.linalg.norm(ends[:, None, 0] - ends[None, :, 0], axis=2) +
+                     np.linalg.norm(ends[:, None, 1] - ends[None, :, 1], axis=2)) / 2
+        costs = self.turn_time(distances)
+
+        first = 0 if start is None else int(np.argmin(_distances_to_segments(start, ends)))
+        candidates = [*self._sequential_orders(ends, first), self._greedy_order(costs, first)]
+        orders = [self._two_opt(order, costs) for order in candidates]
+        order = min(orders, key=lambda o: _path_cost(o, costs))
+        return CoveragePlan(rows=[rows[i] for i in order],
+                            working_time=float(lengths.sum() / self.linear_speed),
+                            turning_time=_path_cost(order, costs),
+                            area=float(lengths.sum() * self.row_spacing))
+
+    @staticmethod
+    def _sequential_orders(ends: np.ndarray, first: int) -> list[list[int]]:
+        """Visit the rows side by side from the first row to one side of the field, then the rows on the other side."""
+        direction = ends[0, 1] - ends[0, 0]
+        normal = np.array([direction[1], -direction[0]])  # to the right of the rows, like Field._generate_rows
+        offsets = ends.mean(axis=1) @ normal
+        by_offset = sorted(range(len(ends)), key=lambda i: (offsets[i], i))
+        position = by_offset.index(first)
+        right = by_offset[position + 1:]
+        left = by_offset[:position][::-1]
+        return [[first, *right, *left], [first, *left, *right]]
+
+    @staticmethod
+    def _greedy_order(costs: np.ndarray, first: int) -> list[int]:
+        order = [first]
+        visited = np.zeros(len(costs), dtype=bool)
+        visited[first] = True
+        for _ in range(len(costs) - 1):
+            next_costs = np.where(visited, np.inf, costs[order[-1]])
+            i = int(np.argmin(next_costs))
+            order.append(i)
+            visited[i] = True
+        return order
+
+    def _two_opt(self, order: list[int], costs: np.ndarray) -> list[int]:
+        """Reverse sections of the path (keeping the first row) as long as this shortens it."""
+        path = np.array(order)
+        n = len(path)
+        for _ in range(self.MAX_TWO_OPT_PASSES):
+            improved = False
+            for i in range(1, n - 1):
+                j = np.arange(i + 1, n)
+                after = np.minimum(j + 1, n - 1)
+                has_next = j + 1 < n
+                removed = costs[path[i - 1], path[i]] + np.where(has_next, costs[path[j], path[after]], 0.0)
+                added = costs[path[i - 1], path[j]] + np.where(has_next, costs[path[i], path[after]], 0.0)
+                gain = removed - added
+                best = int(np.argmax(gain))
+                if gain[best] > 1e-9:
+                    path[i:j[best] + 1] = path[i:j[best] + 1][::-1]
+                    improved = True
+            if not improved:
+                break
+        return path.tolist()
+
+
+def _line(start: Point, end: Point) -> Spline:
+    return Spline.from_points(start, end)
+
+
+def _arc(center: Point, radius: float, start_angle: float, sweep: float) -> list[Spline]:
+    """Approximate a circular arc (counterclockwise for positive sweep) by cubic splines of at most 90° each."""
+    count = max(1, math.ceil(abs(sweep) / (np.pi / 2) - 1e-9))
+    step = sweep / count
+    handle = 4 / 3 * math.tan(abs(step) / 4) * radius
+    direction = 1.0 if sweep > 0 else -1.0
+    splines = []
+    for i in range(count):
+        a0 = start_angle + i * step
+        a1 = a0 + step
+        p0 = Point(x=center.x + radius * math.cos(a0), y=center.y + radius * math.sin(a0))
+        p3 = Point(x=center.x + radius * math.cos(a1), y=center.y + radius * math.sin(a1))
+        splines.append(Spline(start=p0,
+                              control1=Point(x=p0.x - direction * handle * math.sin(a0),
+                                             y=p0.y + direction * handle * math.cos(a0)),
+                              control2=Point(x=p3.x + direction * handle * math.sin(a1),
+                                             y=p3.y - direction * handle * math.cos(a1)),
+                              end=p3))
+    return splines
+
+
+def _path_cost(order: list[int], costs: np.ndarray) -> float:
+    return float(costs[order[:-1], order[1:]].sum()) if len(order) > 1 else 0.0
+
+
+def _distances_to_segments(point: Point, ends: np.ndarray) -> np.ndarray:
+    p = np.array([point.x, point.y])
+    a = ends[:, 0]
+    ab = ends[:, 1] - a
+    t = np.clip(np.einsum('ij,ij->i', p - a, ab) / np.maximum(np.einsum('ij,ij->i', ab, ab), 1e-12), 0.0, 1.0)
+    return np.linalg.norm(p - (a + t[:, None] * ab), axis=1)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import math
+from dataclasses import dataclass
+
+import rosys
+from rosys.geometry import Pose
+
+from ... import localization
+from ...localization import LocalProjection
+from ..plant_provider import PlantProvider
+
+
+@dataclass(slots=True, kw_only=True)
+class RowEstimate:
+    pose: Pose
+    """point on the row (centroid of the inliers) with the yaw pointing along the row in driving direction"""
+    lateral_offset: float
+    """signed distance of the row from the robot (positive: row is left of the robot)"""
+    heading_error: float
+    """angle between the row and the robot heading in radians (positive: row turns left)"""
+    inliers: int
+    outliers: int
+    rms: float
+    """root mean square of the perpendicular inlier distances in meters"""
+    confidence: float
+    """between 0 (no support) and 1 (many inliers, no outliers, perfectly straight)"""
+
+
+class _LineSums:
+    """Sufficient statistics for a total least squares line which can be updated point by point."""
+
+    def __init__(self) -> None:
+        self.anchor: tuple[float, float] | None = None
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+
+    def clear(self) -> None:
+        self.anchor = None
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+
+    def add(self, x: float, y: float, sign: int = 1) -> None:
+        if self.anchor is None:
+            self.anchor = (x, y)  # NOTE: summing relative to a nearby point keeps the variances accurate
+        x -= self.anchor[0]
+        y -= self.anchor[1]
+        self.n += sign
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxx += sign * x * x
+        self.sxy += sign * x * y
+        self.syy += sign * y * y
+        if self.n == 0:
+            self.clear()
+
+    def remove(self, x: float, y: float) -> None:
+        self.add(x, y, -1)
+
+    def fit(self) -> tuple[float, float, float, float]:
+        """Return centroid, direction and perpendicular variance of the line."""
+        assert self.anchor is not None
+        mx = self.sx / self.n
+        my = self.sy / self.n
+        cxx = self.sxx / self.n - mx * mx
+        cxy = self.sxy / self.n - mx * my
+        cyy = self.syy / self.n - my * my
+        yaw = 0.5 * math.atan2(2 * cxy, cxx - cyy)
+        variance = (cxx + cyy) / 2 - math.hypot((cxx - cyy) / 2, cxy)
+        return self.anchor[0] + mx, self.anchor[1] + my, yaw, max(variance, 0.0)
+
+
+class CropRowTracker:
+    """Robust estimate of the crop row next to the robot which is updated incrementally as crops are detected.
+
+    The row is a total least squares line through the crops within the window around the robot,
+    so it works for any row direction.
+    New crops are only accepted if they are close to the current line;
+    repeated rejections (or a lack of inliers) trigger a RANSAC search over all crops in the window.
+    Only crops with new detections are looked at during an update, so it is cheap enough for every control tick.
+
+    NOTE: the statistics are kept in the odometry frame (where the crops do not move)
+    and the estimate is expressed relative to the robot pose on demand.
+    """
+    WINDOW = 1.0
+    INLIER_DISTANCE = 0.05
+    MIN_INLIERS = 3
+    REFIT_REJECTIONS = 2
+
+    def __init__(self, plant_provider: PlantProvider) -> None:
+        self.log = logging.getLogger('field_friend.crop_row_tracker')
+        self.plant_provider = plant_provider
+        self.window = self.WINDOW
+        self.inlier_distance = self.INLIER_DISTANCE
+        self.estimate: RowEstimate | None = None
+
+        self._inliers: dict[str, tuple[float, float]] = {}
+        self._outliers: dict[str, tuple[float, float]] = {}
+        self._sums = _LineSums()
+        self._line: tuple[float, float, float, float] | None = None
+        self._rejections = 0
+        self._last_detection_time = -math.inf
+        self._plants_changed = False
+        plant_provider.PLANTS_CHANGED.register(self._handle_plants_changed)
+        localization.reference.REFERENCE_CHANGED.register(self._handle_reference_changed)
+
+    def reset(self) -> None:
+        """Forget all crops; the next update starts over with all crops known to the plant provider."""
+        self.estimate = None
+        self._inliers.clear()
+        self._outliers.clear()
+        self._sums.clear()
+        self._line = None
+        self._rejections = 0
+        self._last_detection_time = -math.inf
+        self._plants_changed = False
+
+    def _handle_plants_changed(self) -> None:
+        self._plants_changed = True
+
+    def _handle_reference_changed(self, _: LocalProjection | None) -> None:
+        self.reset()  # NOTE: the plant provider converts the crop positions, so they are read again
+
+    def update(self, pose: Pose) -> RowEstimate | None:
+        """Take new crop detections into account and return the row estimate relative to the given robot pose.
+
+        Returns ``None`` if there are not enough crops on a common line.
+        """
+        changed = False
+        if self._plants_changed:  # NOTE: crops may have been removed
+            self._plants_changed = False
+            crop_ids = {crop.id for crop in self.plant_provider.crops}
+            for crop_id in [crop_id for crop_id in self._inliers | self._outliers if crop_id not in crop_ids]:
+                self._drop(crop_id)
+                changed = True
+        for crop_id, (x, y) in list(self._inliers.items()) + list(self._outliers.items()):
+            if math.hypot(x - pose.x, y - pose.y) > self.window:
+                self._drop(crop_id)
+                changed = True
+        detection_time = self._last_detection_time
+        for crop in self.plant_provider.crops:
+            if crop.detection_time < self._last_detection_time:
+                continue
+            detection_time = max(detection_time, crop.detection_time)
+            changed |= self._handle_crop(crop.id, crop.position, crop.confidence, pose)
+        self._last_detection_time = detection_time
+        if changed and (self._line is None or self._rejections >= self.REFIT_REJECTIONS):
+            self._refit()
+        elif changed:
+            self._line = self._sums.fit() if len(self._inliers) >= 2 else None
+        self.estimate = self._estimate(pose)
+        return self.estimate
+
+    def _handle_crop(self, crop_id: str, position: rosys.geometry.Point3d, confidence: float, pose: Pose) -> bool:
+        point = (position.x, position.y)
+        known = self._inliers.get(crop_id, self._outliers.get(crop_id))
+        if known == point:
+            return False
+        if known is not None:
+            self._drop(crop_id)
+        if confidence < self.plant_provider.minimum_combined_crop_confidence or \
+                math.hypot(point[0] - pose.x, point[1] - pose.y) > self.window:
+            return known is not None
+        if self._line is None or self._distance(point) <= self.inlier_distance:
+            self._inliers[crop_id] = point
+            self._sums.add(*point)
+        else:
+            self._outliers[crop_id] = point
+            self._rejections += 1
+        return True
+
+    def _drop(self, crop_id: str) -> None:
+        if crop_id in self._inliers:
+            self._sums.remove(*self._inliers.pop(crop_id))
+        else:
+            self._outliers.pop(crop_id, None)
+
+    def _distance(self, point: tuple[float, float]) -> float:
+        assert self._line is not None
+        x, y, yaw, _ = self._line
+        return abs(math.cos(yaw) * (point[1] - y) - math.sin(yaw) * (point[0] - x))
+
+    def _refit(self) -> None:
+        """Find the line with the most inliers among all lines through two crops in the window (RANSAC)."""
+        points = self._inliers | self._outliers
+        best: set[str] = set(points) if len(points) < 2 else set()
+        best_error = math.inf
+        for (_, a), (_, b) in itertools.combinations(points.items(), 2):
+            length = math.hypot(b[0] - a[0], b[1] - a[1])
+            if length < self.inlier_distance:
+                continue
+            inliers: set[str] = set()
+            error = 0.0
+            for crop_id, p in points.items():
+                distance = abs((b[0] - a[0]) * (p[1] - a[1]) - (b[1] - a[1]) * (p[0] - a[0])) / length
+                if distance <= self.inlier_distance:
+                    inliers.add(crop_id)
+                    error += distance
+            if len(inliers) > len(best) or (len(inliers) == len(best) and error < best_error):
+                best = inliers
+                best_error = error
+        self._inliers = {crop_id: p for crop_id, p in points.items() if crop_id in best}
+        self._outliers = {crop_id: p for crop_id, p in points.items() if crop_id not in best}
+        self._sums.clear()
+        for p in self._inliers.values():
+            self._sums.add(*p)
+        self._line = self._sums.fit() if len(self._inliers) >= 2 else None
+        self._rejections = 0
+        self.log.debug('refitted crop row: %d inliers, %d outliers', len(self._inliers), len(self._outliers))
+
+    def _estimate(self, pose: Pose) -> RowEstimate | None:
+        if self._line is None or len(self._inliers) < self.MIN_INLIERS:
+            return None
+        x, y, yaw, variance = self._line
+        if abs(rosys.helpers.angle(pose.yaw, yaw)) > math.pi / 2:
+            yaw += math.pi
+        yaw = rosys.helpers.eliminate_2pi(yaw)
+        rms = math.sqrt(variance)
+        inliers = len(self._inliers)
+        outliers = len(self._outliers)
+        confidence = inliers / (inliers + outliers) * max(0.0, 1 - rms / self.inlier_distance)
+        return RowEstimate(pose=Pose(x=x, y=y, yaw=yaw),
+                           lateral_offset=math.cos(yaw) * (y - pose.y) - math.sin(yaw) * (x - pose.x),
+                           heading_error=rosys.helpers.angle(pose.yaw, yaw),
+                           inliers=inliers,
+                           outliers=outliers,
+                           rms=rms,
+                           confidence=confidence)
@@ -1,14 +1,18 @@
 from enum import Enum, auto
+from itertools import groupby
 from random import randint
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
 import rosys
 from nicegui import ui
+from rosys.driving import PathSegment
 from rosys.geometry import Point, Pose
 
+from ...localization import LocalProjection
 from ..field import Field, Row
 from ..implements.implement import Implement
+from .coverage_planner import CoveragePlan, CoveragePlanner
 from .straight_line_navigation import StraightLineNavigation
 
 if TYPE_CHECKING:
@@ -25,9 +29,6 @@ class State(Enum):
 
 
 class FieldNavigation(StraightLineNavigation):
-    DRIVE_STEP = 0.2
-    TURN_STEP = np.deg2rad(25.0)
-    MAX_GNSS_WAITING_TIME = 15.0
     MAX_DISTANCE_DEVIATION = 0.05
     MAX_ANGLE_DEVIATION = np.deg2rad(10.0)
 
@@ -39,6 +40,7 @@ class FieldNavigation(StraightLineNavigation):
         self.automator = system.automator
         self.automation_watcher = system.automation_watcher
         self.field_provider = system.field_provider
+        self.path_provider = system.path_provider
 
         self._state = State.APPROACH_START_ROW
         self.row_index = 0
@@ -49,11 +51,11 @@ class FieldNavigation(StraightLineNavigation):
         self.field_id: str | None = self.field_provider.selected_field.id if self.field_provider.selected_field else None
         self.field_provider.FIELD_SELECTED.register(self._set_field_id)
         self._loop: bool = False
-        self._drive_step = self.DRIVE_STEP
-        self._turn_step = self.TURN_STEP
-        self._max_gnss_waiting_time = self.MAX_GNSS_WAITING_TIME
         self.rows_to_work_on: list[Row] = []
+        self.coverage_plan = CoveragePlan()
+        self.coverage_planner: CoveragePlanner | None = None
         self.robot_in_working_area = False
+        self._driving_transition = False
 
     @property
     def current_row(self) -> Row:
@@ -66,18 +68,30 @@ class FieldNavigation(StraightLineNavigation):
         if self.field is None:
             rosys.notify('No field selected', 'negative')
             return False
-        self.rows_to_work_on = self.field_provider.get_rows_to_work_on()
-        if not self.rows_to_work_on or len(self.rows_to_work_on) == 0:
+        rows_to_work_on = self.field_provider.get_rows_to_work_on()
+        if not rows_to_work_on:
             rosys.notify('No rows available', 'negative')
             return False
         if self.gnss.device is None:
             rosys.notify('GNSS is not available', 'negative')
             return False
-        for idx, row in enumerate(self.rows_to_work_on):
-            if not len(row.points) >= 2:
+        if not self.gnss.pose_filter.is_initialized:
+            rosys.notify('Robot pose has not been located by GNSS yet', 'negative')
+            return False
+        for idx, row in enumerate(rows_to_work_on):
+            if not len(row) >= 2:
                 rosys.notify(f'Row {idx} on field {self.field.name} has not enough points', 'negative')
                 return False
-        self.row_index = self.field.rows.index(self.get_nearest_row())
+        self.coverage_planner = CoveragePlanner(self.driver.parameters,
+                                                working_speed=self.linear_speed_limit,
+                                                headland_width=self.field.outline_buffer_width,
+                                                row_spacing=self.field.row_spacing)
+        self.coverage_plan = self.coverage_planner.plan(rows_to_work_on, self.odometer.prediction.point)
+        self.rows_to_work_on = self.coverage_plan.rows
+        self.row_index = 0
+        self.log.info('Working on %d rows starting with %s, expected to take %.0f min (%.3f ha/h)',
+                      len(self.rows_to_work_on), self.current_row.name,
+                      self.coverage_plan.total_time / 60, self.coverage_plan.throughput)
         self._state = State.APPROACH_START_ROW
         self.plant_provider.clear()
 
@@ -95,16 +109,7 @@ class FieldNavigation(StraightLineNavigation):
         self.automation_watcher.stop_field_watch()
         await self.implement.deactivate()
 
-    def get_nearest_row(self) -> Row:
-        assert self.field is not None
-        assert self.gnss.device is not None
-        row = min(self.field.rows, key=lambda r: r.line_segment().line.foot_point(
-            self.odometer.prediction.point).distance(self.odometer.prediction.point))
-        self.log.info(f'Nearest row is {row.name}')
-        self.row_index = self.field.rows.index(row)
-        return row
-
-    def set_start_and_end_points(self):
+    def set_start_and_end_points(self, *, changing_row: bool = False):
         assert self.field is not None
         self.start_point = None
         self.end_point = None
@@ -112,7 +117,8 @@ class FieldNavigation(StraightLineNavigation):
         end_point = self.current_row.points[-1].cartesian()
 
         swap_points: bool
-        self.robot_in_working_area = self._is_in_working_area(start_point, end_point)
+        # NOTE: when changing rows the robot stands at the end of the previous row, so the closer end is the start
+        self.robot_in_working_area = not changing_row and self._is_in_working_area(start_point, end_point)
         if self.robot_in_working_area:
             abs_angle_to_start = abs(self.odometer.prediction.relative_direction(start_point))
             abs_angle_to_end = abs(self.odometer.prediction.relative_direction(end_point))
@@ -136,12 +142,20 @@ class FieldNavigation(StraightLineNavigation):
             return
         self.target = self.end_point
 
+    def _handle_reference_changed(self, previous: LocalProjection | None) -> None:
+        super()._handle_reference_changed(previous)
+        if previous is None:
+            return
+        if self.start_point is not None:
+            self.start_point = self._convert_point(self.start_point, previous)
+        if self.end_point is not None:
+            self.end_point = self._convert_point(self.end_point, previous)
+        if self._driving_transition and self.automator.is_running:
+            # NOTE: the driver follows the transition path in the previous frame
+            self.automator.stop(because='the reference changed while driving to the next row')
+
     async def _drive(self, distance: float) -> None:
         assert self.field is not None
-        # TODO: remove temporary fix for GNSS waiting
-        if self.odometer.prediction.distance(self.gnss._last_gnss_pose) > 1.0:  # pylint: disable=protected-access
-            await self.gnss.ROBOT_POSE_LOCATED.emitted(self._max_gnss_waiting_time)
-
         if self._state == State.APPROACH_START_ROW:
             self._state = await self._run_approach_start_row()
         elif self._state == State.CHANGE_ROW:
@@ -164,24 +178,13 @@ class FieldNavigation(StraightLineNavigation):
         else:
             self.plant_provider.clear()
 
-        await self.gnss.ROBOT_POSE_LOCATED.emitted(self._max_gnss_waiting_time)
         if not self.robot_in_working_area:
-            # turn towards row start
-            assert self.start_point is not None
-            target_yaw = self.odometer.prediction.direction(self.start_point)
-            await self.turn_in_steps(target_yaw)
-            # drive to row start
-            await self.drive_in_steps(Pose(x=self.start_point.x, y=self.start_point.y, yaw=target_yaw))
-            await self.gnss.ROBOT_POSE_LOCATED.emitted(self._max_gnss_waiting_time)
-        # turn to row
-        assert self.end_point is not None
-        driving_yaw = self.odometer.prediction.direction(self.end_point)
-        await self.turn_in_steps(driving_yaw)
+            await self._drive_to_row_start()
         return State.FOLLOW_ROW
 
     async def _run_change_row(self) -> State:
         self.robot_in_working_area = False
-        self.set_start_and_end_points()
+        self.set_start_and_end_points(changing_row=True)
         if self.start_point is None or self.end_point is None:
             return State.ERROR
 
@@ -190,55 +193,27 @@ class FieldNavigation(StraightLineNavigation):
         else:
             self.plant_provider.clear()
 
-        await self.gnss.ROBOT_POSE_LOCATED.emitted(self._max_gnss_waiting_time)
-        # turn towards row start
-        assert self.start_point is not None
-        target_yaw = self.odometer.prediction.direction(self.start_point)
-        await self.turn_in_steps(target_yaw)
-        # drive to row start
-        await self.drive_in_steps(Pose(x=self.start_point.x, y=self.start_point.y, yaw=target_yaw))
-        await self.gnss.ROBOT_POSE_LOCATED.emitted(self._max_gnss_waiting_time)
-        # turn to row
-        assert self.end_point is not None
-        driving_yaw = self.odometer.prediction.direction(self.end_point)
-        await self.turn_in_steps(driving_yaw)
+        await self._drive_to_row_start()
         return State.FOLLOW_ROW
 
-    async def drive_in_steps(self, target: Pose) -> None:
-        while True:
-            if target.relative_point(self.odometer.prediction.point).x > 0:
-                return
-            drive_step = min(self._drive_step, self.odometer.prediction.distance(target))
-            # Calculate timeout based on linear speed limit and drive step
-            timeout = (drive_step / self.driver.parameters.linear_speed_limit) + 3.0
-            await self._drive_towards_target(drive_step, target, timeout=timeout)
-            await self.gnss.ROBOT_POSE_LOCATED.emitted(self._max_gnss_waiting_time)
-
-    async def turn_to_yaw(self, target_yaw: float, angle_threshold: float | None = None) -> None:
-        if angle_threshold is None:
-            angle_threshold = np.deg2rad(1.0)
-        while True:
-            angle = rosys.helpers.eliminate_2pi(target_yaw - self.odometer.prediction.yaw)
-            if abs(angle) < angle_threshold:
-                break
-            linear = 0.5
-            sign = 1 if angle > 0 else -1
-            angular = linear / self.driver.parameters.minimum_turning_radius * sign
-            await self.driver.wheels.drive(*self.driver._throttle(linear, angular))  # pylint: disable=protected-access
-            await rosys.sleep(0.1)
-        await self.driver.wheels.stop()
-
-    async def turn_in_steps(self, target_yaw: float) -> None:
-        angle_difference = rosys.helpers.angle(self.odometer.prediction.yaw, target_yaw)
-        while abs(angle_difference) > np.deg2rad(1.0):
-            next_angle = rosys.helpers.eliminate_2pi(
-                self.odometer.prediction.yaw + np.sign(angle_difference) * self._turn_step)
-            if abs(angle_difference) > self._turn_step:
-                await self.turn_to_yaw(next_angle)
-            else:
-                await self.turn_to_yaw(target_yaw)
-            await self.gnss.ROBOT_POSE_LOCATED.emitted(self._max_gnss_waiting_time)
-            angle_difference = rosys.helpers.angle(self.odometer.prediction.yaw, target_yaw)
+    async def _drive_to_row_start(self) -> None:
+        assert self.coverage_planner is not None
+        assert self.start_point is not None
+        assert self.end_point is not None
+        row_start = Pose(x=self.start_point.x, y=self.start_point.y, yaw=self.start_point.direction(self.end_point))
+        path = self.coverage_planner.transition_path(self.odometer.prediction, row_start)
+        self.path_provider.SHOW_PATH.emit(path)
+        self._driving_transition = True
+        try:
+            await self.drive_transition(path)
+        finally:
+            self._driving_transition = False
+            self.path_provider.SHOW_PATH.emit([])
+
+    async def drive_transition(self, path: list[PathSegment]) -> None:
+        """Drive along the path, stopping wherever the driving direction changes (e.g. when switching back)."""
+        for _, segments in groupby(path, key=lambda segment: segment.backward):
+            await self.driver.drive_path(list(segments))
 
     async def _run_follow_row(self, distance: float) -> State:
         assert self.end_point is not None
@@ -301,9 +276,6 @@ class FieldNavigation(StraightLineNavigation):
             'row_index': self.row_index,
             'state': self._state.name,
             'loop': self._loop,
-            'drive_step': self._drive_step,
-            'turn_step': self._turn_step,
-            'max_gnss_waiting_time': self._max_gnss_waiting_time,
         }
 
     def restore(self, data: dict[str, Any]) -> None:
@@ -313,9 +285,6 @@ class FieldNavigation(StraightLineNavigation):
         self.row_index = data.get('row_index', 0)
         self._state = State[data.get('state', State.APPROACH_START_ROW.name)]
         self._loop = data.get('loop', False)
-        self._drive_step = data.get('drive_step', self.DRIVE_STEP)
-        self._turn_step = data.get('turn_step', self.TURN_STEP)
-        self._max_gnss_waiting_time = data.get('max_gnss_waiting_time', self.MAX_GNSS_WAITING_TIME)
 
     def settings_ui(self) -> None:
         with ui.row():
@@ -325,22 +294,9 @@ class FieldNavigation(StraightLineNavigation):
         # super().developer_ui()
         ui.label('').bind_text_from(self, '_state', lambda state: f'State: {state.name}')
         ui.label('').bind_text_from(self, 'row_index', lambda row_index: f'Row Index: {row_index}')
+        ui.label('').bind_text_from(self, 'coverage_plan',
+                                    lambda plan: f'Expected: {plan.total_time / 60:.0f} min ({plan.throughput:.3f} ha/h)')
         ui.checkbox('Loop', on_change=self.request_backup).bind_value(self, '_loop')
-        ui.number('Drive Step', step=0.01, min=0.01, max=10.0, format='%.2f', suffix='m', on_change=self.request_backup) \
-            .props('dense outlined') \
-            .classes('w-24') \
-            .bind_value(self, '_drive_step') \
-            .tooltip(f'DRIVE_STEP (default: {self.DRIVE_STEP:.2f})')
-        ui.number('Turn Step', step=1.0, min=1.0, max=180.0, format='%.1f', suffix='°', on_change=self.request_backup) \
-            .props('dense outlined') \
-            .classes('w-24') \
-            .bind_value(self, '_turn_step', forward=np.deg2rad, backward=np.rad2deg) \
-            .tooltip(f'TURN_STEP (default: {np.rad2deg(self.TURN_STEP):.2f})')
-        ui.number('Max GNSS Waiting Time', step=0.1, min=0.1, format='%.1f', suffix='s', on_change=self.request_backup) \
-            .props('dense outlined') \
-            .classes('w-24') \
-            .bind_value(self, '_max_gnss_waiting_time') \
-            .tooltip(f'MAX_GNSS_WAITING_TIME (default: {self.MAX_GNSS_WAITING_TIME:.2f})')
 
     def _set_field_id(self) -> None:
         self.field_id = self.field_provider.selected_field.id if self.field_provider.selected_field else None
@@ -1,4 +1,3 @@
-import math
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
@@ -7,6 +6,7 @@ from nicegui import ui
 from rosys.helpers import eliminate_2pi
 
 from ..implements.implement import Implement
+from .crop_row_tracker import CropRowTracker
 from .straight_line_navigation import StraightLineNavigation
 
 if TYPE_CHECKING:
@@ -15,6 +15,7 @@ if TYPE_CHECKING:
 
 class FollowCropsNavigation(StraightLineNavigation):
     CROP_ATTRACTION: float = 0.3
+    MIN_ROW_CONFIDENCE: float = 0.2
 
     def __init__(self, system: 'System', tool: Implement) -> None:
         super().__init__(system, tool)
@@ -25,11 +26,15 @@ class FollowCropsNavigation(StraightLineNavigation):
         self.plant_locator = system.plant_locator
         self.name = 'Follow Crops'
         self.crop_attraction = self.CROP_ATTRACTION
+        self.row_tracker = CropRowTracker(self.plant_provider)
+        self.row: rosys.geometry.Pose | None = None
+        """the crop row which is currently followed"""
 
     async def prepare(self) -> bool:
         await super().prepare()
         self.log.info(f'Activating {self.implement.name}...')
         self.plant_provider.clear()
+        self.row_tracker.reset()
         await self.implement.activate()
         if self.flashlight:
             await self.flashlight.turn_on()
@@ -49,24 +54,25 @@ class FollowCropsNavigation(StraightLineNavigation):
         self.target = self.odometer.prediction.transform(rosys.geometry.Point(x=distance, y=0))
 
     async def _drive(self, distance: float) -> None:
-        row = self.plant_provider.get_relevant_crops(point=self.odometer.prediction.point_3d(), max_distance=1.0)
-        if len(row) >= 3:
-            points_array = np.array([(p.position.x, p.position.y) for p in row])
-            # Fit a line using least squares
-            A = np.vstack([points_array[:, 0], np.ones(len(points_array))]).T
-            m, c = np.linalg.lstsq(A, points_array[:, 1], rcond=None)[0]
-            yaw = np.arctan(m)
-            # flip if it is pointing backwards
-            if np.abs(yaw - self.odometer.prediction.yaw) > math.pi / 2:
-                yaw = yaw + math.pi
-            fitted_line = rosys.geometry.Line(a=m, b=-1, c=c)
-            closest_point = fitted_line.foot_point(self.odometer.prediction.point)
-            target = rosys.geometry.Pose(x=closest_point.x, y=closest_point.y, yaw=yaw)
-            await self._drive_towards_target(distance, target)
+        self.row = None
+        self._update_row()
+        if self.row is not None:
+            await self._drive_towards_target(distance, self._follow_row)
         else:
             self.update_target()
             await super()._drive(distance)
 
+    def _update_row(self) -> None:
+        estimate = self.row_tracker.update(self.odometer.prediction)
+        if estimate is not None and estimate.confidence >= self.MIN_ROW_CONFIDENCE:
+            self.row = estimate.pose
+
+    def _follow_row(self) -> rosys.geometry.Pose:
+        """Called on every control tick to steer along the latest row estimate."""
+        self._update_row()
+        assert self.row is not None
+        return self.row
+
     def combine_angles(self, angle1: float, influence: float, angle2: float) -> float:
         weight1 = influence
         weight2 = 1 - influence
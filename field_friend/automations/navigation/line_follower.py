@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import rosys
+from rosys.driving import Driver, Odometer
+from rosys.geometry import Line, Point, Pose
+
+
+@dataclass(slots=True, kw_only=True)
+class ControlTiming:
+    period: float
+    """scheduled time between two control ticks in seconds"""
+    ticks: int = 0
+    overruns: int = 0
+    """ticks which started after the next tick was already due"""
+    max_jitter: float = 0.0
+    """largest delay of a tick behind its schedule in seconds"""
+    total_jitter: float = 0.0
+
+    @property
+    def mean_jitter(self) -> float:
+        return self.total_jitter / self.ticks if self.ticks else 0.0
+
+    def record(self, jitter: float) -> None:
+        self.ticks += 1
+        self.max_jitter = max(self.max_jitter, jitter)
+        self.total_jitter += jitter
+
+
+class LineFollower:
+    """Pure pursuit controller which follows a line at a fixed control rate.
+
+    Every tick, the robot steers on a circular arc towards a carrot which lies ``lookahead`` meters ahead
+    of its foot point on the line, so lateral and heading errors are corrected while driving.
+    The curvature is limited by the minimum turning radius of the driver.
+    """
+    RATE = 50.0
+    DISTANCE_TOLERANCE = 0.0005
+
+    def __init__(self, driver: Driver, odometer: Odometer, *, rate: float = RATE) -> None:
+        self.driver = driver
+        self.odometer = odometer
+        self.period = 1 / rate
+        self.timing = ControlTiming(period=self.period)
+
+    @property
+    def lookahead(self) -> float:
+        return self.driver.parameters.carrot_offset
+
+    async def follow(self, line: Pose | Callable[[], Pose], *,
+                     distance: float | None = None,
+                     until: Callable[[], bool] | None = None,
+                     linear_speed_limit: float,
+                     angular_speed_limit: float,
+                     stop_at_end: bool = True,
+                     timeout: float | None = None) -> None:
+        """Follow the line through the given pose (in the direction of its yaw).
+
+        The line may also be a function which is called every tick, e.g. to steer along a row estimate.
+
+        The robot drives until it has covered the given distance (measured from its start position)
+        or the given condition is met; without both it follows the line until the automation is stopped.
+        When stopping at the end of a distance, the speed is reduced so the last tick ends on the spot.
+
+        :raises TimeoutError: if the end is not reached within the timeout
+        """
+        start = self.odometer.prediction.point
+        deadline = None if timeout is None else rosys.time() + timeout
+        next_tick = rosys.time()
+        try:
+            while True:
+                remaining = None if distance is None else distance - self.odometer.prediction.point.distance(start)
+                if remaining is not None and remaining <= self.DISTANCE_TOLERANCE:
+                    break
+                if until is not None and until():
+                    break
+                if deadline is not None and rosys.time() >= deadline:
+                    raise TimeoutError('Driving Timeout')
+                linear = linear_speed_limit
+                if stop_at_end and remaining is not None:
+                    linear = min(linear, remaining / self.period)
+                target = line() if callable(line) else line
+                await self.driver.wheels.drive(*self._command(target, linear, angular_speed_limit))
+                next_tick += self.period
+                if rosys.time() > next_tick:
+                    self.timing.overruns += 1
+                    next_tick = rosys.time()
+                else:
+                    await rosys.sleep(next_tick - rosys.time())
+                self.timing.record(rosys.time() - next_tick)
+        except BaseException:
+            await self.driver.wheels.stop()
+            raise
+        if stop_at_end:
+            await self.driver.wheels.stop()
+
+    def _command(self, line: Pose, linear: float, angular_speed_limit: float) -> tuple[float, float]:
+        pose = self.odometer.prediction
+        foot_point = Line.from_points(line.point, line.transform(Point(x=1, y=0))).foot_point(pose.point)
+        carrot = pose.relative_point(foot_point.polar(self.lookahead, line.yaw))
+        curvature = 2 * carrot.y / (carrot.x**2 + carrot.y**2)
+        radius = self.driver.parameters.minimum_turning_radius
+        if radius > 0 and abs(curvature) > 1 / radius:
+            curvature = (-1 if curvature < 0 else 1) / radius
+        angular = linear * curvature
+        if abs(angular) > angular_speed_limit:
+            linear *= angular_speed_limit / abs(angular)
+            angular = angular_speed_limit if angular > 0 else -angular_speed_limit
+        return linear, angular
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import abc
 import logging
+from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
 import rosys
 from nicegui import ui
 
+from ... import localization
+from ...localization import LocalProjection
 from ..implements.implement import Implement
+from .line_follower import LineFollower
 
 if TYPE_CHECKING:
     from ...system import System
@@ -37,6 +41,10 @@ class Navigation(rosys.persistence.PersistentModule):
         self.start_position = self.odometer.prediction.point
         self.linear_speed_limit = self.LINEAR_SPEED_LIMIT
         self.angular_speed_limit = 0.1
+        self.line_follower = LineFollower(self.driver, self.odometer)
+        self.continuous = False
+        """keep the robot moving while the implement works (if the implement supports it)"""
+        localization.reference.REFERENCE_CHANGED.register(self._handle_reference_changed)
 
     async def start(self) -> None:
         try:
@@ -49,21 +57,28 @@ class Navigation(rosys.persistence.PersistentModule):
             if self.gnss.check_distance_to_reference():
                 raise WorkflowException('reference to far away from robot')
             self.start_position = self.odometer.prediction.point
+            if self.continuous and not self.implement.max_creep_speed():
+                self.log.warning(f'{self.implement.name} can not work continuously, stopping for every target')
             if isinstance(self.driver.wheels, rosys.hardware.WheelsSimulation) and not rosys.is_test:
                 self.create_simulation()
             self.log.info('Navigation started')
             while not self._should_finish():
+                if self.continuous:  # NOTE: the implement may adapt its speed to the measured work durations
+                    self.implement.creep_speed = min(self.linear_speed_limit, self.implement.max_creep_speed())
                 distance = await self.implement.get_stretch(self.MAX_STRETCH_DISTANCE)
                 if distance > self.MAX_STRETCH_DISTANCE:  # we do not want to drive to long without observing
                     await self._drive(self.DEFAULT_DRIVE_DISTANCE)
                     continue
                 await self._drive(distance)
+                if self.implement.creep_speed and self.implement.is_active:
+                    await self._creep()
                 await self.implement.start_workflow()
                 await self.implement.stop_workflow()
         except WorkflowException as e:
             self.log.error(f'WorkflowException: {e}')
             rosys.notify(f'An exception occurred during automation: {e}', 'negative')
         finally:
+            self.implement.creep_speed = 0.0
             await self.implement.finish()
             await self.finish()
             await self.driver.wheels.stop()
@@ -86,28 +101,26 @@ class Navigation(rosys.persistence.PersistentModule):
     async def _drive(self, distance: float) -> None:
         """Drives the vehicle a short distance forward"""
 
-    async def _drive_towards_target(self, distance: float, target: rosys.geometry.Pose, timeout: float = 3.0) -> None:
+    async def _drive_towards_target(self, distance: float, target: rosys.geometry.Pose | Callable[[], rosys.geometry.Pose],
+                                    timeout: float = 3.0) -> None:
         """Drives the vehicle a short distance forward while steering onto the line defined by the target pose.
-        NOTE: the target pose should be the foot point of the current position on the line.
+
+        The target may also be a function which is evaluated every control tick.
+        """
+        await self.line_follower.follow(target,
+                                        distance=distance,
+                                        linear_speed_limit=self.linear_speed_limit,
+                                        angular_speed_limit=self.angular_speed_limit,
+                                        stop_at_end=not self.implement.creep_speed,
+                                        timeout=timeout)
+
+    async def _creep(self) -> None:
+        """Let the robot move on slowly while the implement works.
+
+        NOTE: this is a single command, so stopping or pausing the automation stops the wheels for good.
         """
-        start_position = self.odometer.prediction.point
-        hook_offset = rosys.geometry.Point(x=self.driver.parameters.hook_offset, y=0)
-        carrot_offset = rosys.geometry.Point(x=self.driver.parameters.carrot_offset, y=0)
-        target_point = target.transform(carrot_offset)
-        hook = self.odometer.prediction.transform(hook_offset)
-        turn_angle = rosys.helpers.angle(self.odometer.prediction.yaw, hook.direction(target_point))
-        curvature = np.tan(turn_angle) / hook_offset.x
-        if curvature != 0 and abs(1 / curvature) < self.driver.parameters.minimum_turning_radius:
-            curvature = (-1 if curvature < 0 else 1) / self.driver.parameters.minimum_turning_radius
-        deadline = rosys.time() + timeout
-        while self.odometer.prediction.point.distance(start_position) < distance:
-            if rosys.time() >= deadline:
-                await self.driver.wheels.stop()
-                raise TimeoutError('Driving Timeout')
-            await rosys.sleep(0.01)
-            with self.driver.parameters.set(linear_speed_limit=self.linear_speed_limit, angular_speed_limit=self.angular_speed_limit):
-                await self.driver.wheels.drive(*self.driver._throttle(1.0, curvature))  # pylint: disable=protected-access
-        await self.driver.wheels.stop()
+        with self.driver.parameters.set(linear_speed_limit=self.implement.creep_speed):
+            await self.driver.wheels.drive(*self.driver._throttle(1.0, 0.0))  # pylint: disable=protected-access
 
     @abc.abstractmethod
     def _should_finish(self) -> bool:
@@ -116,13 +129,25 @@ class Navigation(rosys.persistence.PersistentModule):
     def clear(self) -> None:
         """Resets the state to initial configuration"""
 
+    def _handle_reference_changed(self, previous: LocalProjection | None) -> None:
+        """Convert the cartesian points of a running navigation into the frame of the new reference"""
+        if previous is not None:
+            self.start_position = self._convert_point(self.start_position, previous)
+
+    @staticmethod
+    def _convert_point(point: rosys.geometry.Point, previous: LocalProjection) -> rosys.geometry.Point:
+        [[x, y]] = localization.reference.convert_points(np.array([[point.x, point.y]]), previous).tolist()
+        return rosys.geometry.Point(x=x, y=y)
+
     def backup(self) -> dict:
         return {
             'linear_speed_limit': self.linear_speed_limit,
+            'continuous': self.continuous,
         }
 
     def restore(self, data: dict[str, Any]) -> None:
         self.linear_speed_limit = data.get('linear_speed_limit', self.linear_speed_limit)
+        self.continuous = data.get('continuous', self.continuous)
 
     def create_simulation(self) -> None:
         pass
@@ -133,3 +158,6 @@ class Navigation(rosys.persistence.PersistentModule):
             .classes('w-24') \
             .bind_value(self, 'linear_speed_limit') \
             .tooltip(f'Forward speed limit in m/s (default: {self.LINEAR_SPEED_LIMIT:.2f})')
+        ui.checkbox('Continuous', on_change=self.request_backup) \
+            .bind_value(self, 'continuous') \
+            .tooltip('Keep moving slowly while the implement works instead of stopping for every target')
@@ -8,6 +8,7 @@ import rosys
 from nicegui import ui
 
 from ...automations.implements.implement import Implement
+from ...localization import LocalProjection
 from .navigation import Navigation
 
 if TYPE_CHECKING:
@@ -40,6 +41,12 @@ class StraightLineNavigation(Navigation):
         self.origin = self.odometer.prediction.point
         self.target = self.odometer.prediction.transform(rosys.geometry.Point(x=self.length, y=0))
 
+    def _handle_reference_changed(self, previous: LocalProjection | None) -> None:
+        super()._handle_reference_changed(previous)
+        if previous is not None and hasattr(self, 'target'):
+            self.origin = self._convert_point(self.origin, previous)
+            self.target = self._convert_point(self.target, previous)
+
     async def _drive(self, distance: float) -> None:
         start_position = self.odometer.prediction.point
         closest_point = rosys.geometry.Line.from_points(self.origin, self.target).foot_point(start_position)
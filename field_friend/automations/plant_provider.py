@@ -1,10 +1,13 @@
 import logging
 from typing import Any
 
+import numpy as np
 import rosys
 from nicegui import ui
 from rosys.geometry import Point3d
 
+from .. import localization
+from ..localization import LocalProjection
 from .plant import Plant
 
 # see field_friend/automations/plant_locator.py
@@ -50,6 +53,7 @@ class PlantProvider(rosys.persistence.PersistentModule):
         self.ADDED_NEW_CROP = rosys.event.Event()
         """A new crop has been added."""
 
+        localization.reference.REFERENCE_CHANGED.register(self._handle_reference_changed)
         rosys.on_repeat(self.prune, 10.0)
 
     def backup(self) -> dict:
@@ -80,6 +84,17 @@ class PlantProvider(rosys.persistence.PersistentModule):
         self.crops[:] = [crop for crop in self.crops if crop.detection_time > rosys.time() - crops_max_age]
         self.PLANTS_CHANGED.emit()
 
+    def _handle_reference_changed(self, previous: LocalProjection | None) -> None:
+        # NOTE: positions may be shared between plants, so each object must only be converted once
+        positions = list({id(p): p for plant in self.crops + self.weeds for p in plant.positions}.values())
+        if previous is None or not positions:
+            return
+        converted = localization.reference.convert_points(np.array([(p.x, p.y) for p in positions]), previous)
+        for position, (x, y) in zip(positions, converted.tolist(), strict=True):
+            position.x = x
+            position.y = y
+        self.PLANTS_CHANGED.emit()
+
     def get_plant_by_id(self, plant_id: str) -> Plant:
         for plant in self.crops + self.weeds:
             if plant.id == plant_id:
@@ -54,6 +54,15 @@ class Puncher:
         with self.driver.parameters.set(linear_speed_limit=0.125, angular_speed_limit=0.1):
             await self.driver.drive_to(world_target, backward=axis_distance < 0)
 
+    async def move_y_to(self, y: float) -> None:
+        """Move the y axis to the given local position, e.g. to prepare the next punch while the robot is still driving."""
+        if self.field_friend.y_axis is None or not self.field_friend.y_axis.is_referenced:
+            return
+        y += self.field_friend.WORK_Y
+        if not self.field_friend.y_axis.min_position <= y <= self.field_friend.y_axis.max_position:
+            return
+        await self.field_friend.y_axis.move_to(y)
+
     async def punch(self,
                     y: float, *,
                     depth: float = 0.01,
@@ -41,6 +41,7 @@ class FieldFriendHardware(FieldFriend, rosys.hardware.RobotHardware):
         self.M_PER_TICK: float = self.WHEEL_DIAMETER * np.pi / self.MOTOR_GEAR_RATIO
         self.WHEEL_DISTANCE: float = config_params['wheel_distance']
         self.ANTENNA_OFFSET: float = config_params['antenna_offset']
+        self.GNSS_PROTOCOL: str = config_params.get('gnss_protocol', 'nmea')
         self.WORK_X: float
         self.DRILL_RADIUS: float
         implement: str = config_params['tool']
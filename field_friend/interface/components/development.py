@@ -4,6 +4,7 @@ import rosys
 from nicegui import ui
 from rosys.hardware import EspPins
 
+from ...localization import GnssHardware
 from .hardware_control import create_hardware_control_ui
 from .io_overview import IoOverview as io_overview
 from .settings import create_settings_ui
@@ -34,6 +35,10 @@ def create_development_ui(system: 'System') -> None:
                     with ui.card().style('background-color: #3E63A6; color: white;'):
                         ui.label('Field Navigation')
                         system.field_navigation.developer_ui()
+                    with ui.card().style('background-color: #3E63A6; color: white;'):
+                        system.gnss.developer_ui()  # type: ignore
+                        if isinstance(system.gnss, GnssHardware):
+                            system.gnss.reader_ui()
     with ui.row().style('width: calc(100vw - 2rem); flex-wrap: nowrap;'):
         io_overview(system)
     if isinstance(system.field_friend, rosys.hardware.RobotHardware):
@@ -64,7 +64,7 @@ class FieldCreator:
     def get_infos(self) -> None:
         self.headline.text = 'Field Parameters'
         assert self.gnss.current is not None
-        if not ('R' in self.gnss.current.mode or self.gnss.current.mode == 'SSSS'):
+        if not self.gnss.current.has_rtk_fix:
             with self.content:
                 ui.label('No RTK fix available.').classes('text-red')
         self.first_row_start = self.gnss.current.location
@@ -117,7 +117,7 @@ class FieldCreator:
 
     def confirm_geometry(self) -> None:
         assert self.gnss.current is not None
-        if not ('R' in self.gnss.current.mode or self.gnss.current.mode == 'SSSS'):
+        if not self.gnss.current.has_rtk_fix:
             with self.content:
                 ui.label('No RTK fix available.').classes('text-red')
         self.first_row_end = self.gnss.current.location
@@ -6,6 +6,7 @@ import numpy as np
 from nicegui.elements.scene_objects import Box, Curve, Cylinder, Group
 from rosys.geometry import Spline
 
+from ... import localization
 from ...automations import Field, FieldProvider
 
 if TYPE_CHECKING:
@@ -21,6 +22,7 @@ class FieldObject(Group):
         self._update()
         self.field_provider.FIELDS_CHANGED.register_ui(self._update)
         self.field_provider.FIELD_SELECTED.register_ui(self._update)
+        localization.reference.REFERENCE_CHANGED.register_ui(lambda _: self._update())
 
     def create_fence(self, start, end):
         height = 0.12
@@ -58,14 +60,14 @@ class FieldObject(Group):
 
         if active_field is None:
             return
-        outline = [point.cartesian().tuple for point in active_field.outline]
+        outline = active_field.outline_cartesian_as_tuples
         if len(outline) > 1:  # Make sure there are at least two points to form a segment
             for i, start in enumerate(outline):
                 end = outline[(i + 1) % len(outline)]  # Loop back to the first point
                 self.create_fence(start, end)
 
             for row in active_field.rows:
-                if len(row.points) == 1:
+                if len(row) == 1:
                     continue
                 row_points = row.cartesian()
                 for i in range(len(row_points) - 1):
@@ -68,7 +68,7 @@ class LeafletMap:
         ui.button(icon='polyline', on_click=self.zoom_to_field).props('dense flat') \
             .tooltip('center map on field boundaries').classes('ml-0')
         ui.button('Update reference', on_click=self.gnss.update_reference).props('outline color=warning') \
-            .tooltip('Set current position as geo reference and restart the system').classes('ml-auto')
+            .tooltip('Set current position as geo reference').classes('ml-auto')
 
     def abort_point_drawing(self, dialog) -> None:
         self.on_dialog_close()
@@ -41,6 +41,8 @@ class Operation:
                         self.implement_settings = ui.row().classes('items-center')
                     with ui.expansion('Plant Provider').classes('w-full').bind_value(app.storage.user, 'show_plant_provider_settings'), ui.row().classes('items-center'):
                         self.system.plant_provider.settings_ui()
+                    with ui.expansion('Motion State').classes('w-full').bind_value(app.storage.user, 'show_motion_state_settings'), ui.row().classes('items-center'):
+                        self.system.motion_state_estimator.settings_ui()
                     with ui.expansion('Detections').classes('w-full').bind_value(app.storage.user, 'show_detection_settings'), ui.row().classes('items-center'):
                         self.system.plant_locator.settings_ui()
 
@@ -261,8 +261,7 @@ def status_dev_page(robot: FieldFriend, system: System):
             'NW' if system.gnss.current.heading <= 338 else \
             'N'
 
-        reference_position_label.text = 'No reference' if localization.reference is None or (
-            localization.reference.lat == 0 and localization.reference.long == 0) else str(localization.reference)
+        reference_position_label.text = str(localization.reference) if localization.reference.is_set else 'No reference'
         heading_label.text = f'{system.gnss.current.heading:.2f}° {direction_flag}' if system.gnss.current is not None and system.gnss.current.heading is not None else 'No heading'
         rtk_fix_label.text = f'gps_qual: {system.gnss.current.gps_qual}, mode: {system.gnss.current.mode}' if system.gnss.current is not None else 'No fix'
         odometry_label.text = str(system.odometer.prediction)
@@ -203,7 +203,7 @@ def create_status_drawer(system: System) -> ui.right_drawer:
 
             kpi_time_in_automation_off.text = f'{system.kpi_provider.get_time_kpi()}'
             gnss_device_label.text = 'No connection' if gnss.device is None else 'Connected'
-            reference_position_label.text = 'No reference' if localization.reference is None else 'Set'
+            reference_position_label.text = 'Set' if localization.reference.is_set else 'No reference'
             gnss_label.text = str(system.gnss.current.location) if system.gnss.current is not None else 'No position'
             heading_label.text = f'{system.gnss.current.heading:.2f}° {direction_flag}' if system.gnss.current is not None and system.gnss.current.heading is not None else 'No heading'
             rtk_fix_label.text = f'gps_qual: {system.gnss.current.gps_qual}, mode: {system.gnss.current.mode}' if system.gnss.current is not None else 'No fix'
@@ -74,7 +74,7 @@ class SupportPointDialog:
 
     def confirm_support_point(self) -> None:
         assert self.gnss.current is not None
-        if not ('R' in self.gnss.current.mode or self.gnss.current.mode == 'SSSS'):
+        if not self.gnss.current.has_rtk_fix:
             with self.content:
                 ui.label('No RTK fix available.').classes('text-red')
         self.support_point_coordinates = self.gnss.current.location
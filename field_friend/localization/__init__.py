@@ -1,14 +1,20 @@
 from .geo_point import GeoPoint, GeoPointCollection
+from .geo_reference import GeoReference
 from .gnss import Gnss
 from .gnss_hardware import GnssHardware
+from .gnss_replay import GnssReplay
 from .gnss_simulation import GnssSimulation
+from .projection import LocalProjection
 
-reference: GeoPoint = GeoPoint(lat=0, long=0)
+reference: GeoReference = GeoReference()
 
 __all__ = [
     'GeoPoint',
     'GeoPointCollection',
+    'GeoReference',
     'Gnss',
     'GnssHardware',
+    'GnssReplay',
     'GnssSimulation',
+    'LocalProjection',
 ]
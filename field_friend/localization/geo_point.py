@@ -1,7 +1,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
 import numpy as np
 import rosys
@@ -9,6 +9,23 @@ import shapely
 from geographiclib.geodesic import Geodesic
 
 from .. import localization
+from .projection import LocalProjection
+
+
+def reference_projection() -> LocalProjection:
+    """Return the local projection bound to ``localization.reference``; it is replaced whenever the reference moves."""
+    return localization.reference.projection
+
+
+def cartesian_array(points: list[GeoPoint]) -> np.ndarray:
+    """Project the given points relative to the reference point in one vectorized call.
+
+    Returns:
+    np.ndarray: An Nx2 array of cartesian coordinates (x pointing north, y pointing west) in meters.
+    """
+    if not points:
+        return np.empty((0, 2))
+    return reference_projection().project(np.array([(p.lat, p.long) for p in points]))
 
 
 @dataclass(slots=True, kw_only=True)
@@ -31,21 +48,17 @@ class GeoPoint:
     def cartesian(self) -> rosys.geometry.Point:
         """Calculate the cartesian coordinates of this point relative to the reference point.
 
-        This method uses the geodesic distance and azimuth angle between the reference point and
-        the current point to calculate the Cartesian coordinates.
+        The coordinates are computed with the local projection of the reference point (see ``LocalProjection``),
+        which matches the geodesic distance and azimuth angle between the reference point and the current point.
         The azimuth angle is measured clockwise from the north direction, and the resulting Cartesian coordinates have the x-axis to north and y-axis to west.
 
         Returns:
         rosys.geometry.Point: A Point object representing the Cartesian coordinates (x, y)
                             relative to the reference point, where:
-                            - x is the eastward distance in meters,
-                            - y is the northward distance in meters.
+                            - x is the northward distance in meters,
+                            - y is the westward distance in meters.
         """
-        r = Geodesic.WGS84.Inverse(localization.reference.lat, localization.reference.long, self.lat, self.long)
-        s = r['s12']
-        a = -np.deg2rad(r['azi1'])
-        x = s * np.cos(a)
-        y = s * np.sin(a)
+        x, y = reference_projection().project_point(self.lat, self.long)
         return rosys.geometry.Point(x=x, y=y)
 
     def shifted(self, point: rosys.geometry.Point) -> GeoPoint:
@@ -55,8 +68,8 @@ class GeoPoint:
 
         Parameters:
         point (rosys.geometry.Point): A Point object representing the shift in meters, where:
-                                    - x is the eastward shift in meters,
-                                    - y is the northward shift in meters.
+                                    - x is the northward shift in meters,
+                                    - y is the westward shift in meters.
 
         Returns:
         GeoPoint: A new GeoPoint object representing the shifted geographic coordinates.
@@ -65,33 +78,117 @@ class GeoPoint:
         west_shift = Geodesic.WGS84.Direct(north_shift['lat2'], north_shift['lon2'], 270.0, point.y)
         return GeoPoint(lat=west_shift['lat2'], long=west_shift['lon2'])
 
+    def shifted_many(self, points: np.ndarray) -> list[GeoPoint]:
+        """Shift by an Nx2 array of Cartesian coordinates (x, y) relative to the current point in one vectorized pass.
+
+        Note: the RoSys coordinate system maps x-axis to north and y-axis to west.
+        The points are mapped with the local projection (the inverse of ``cartesian``),
+        which agrees with ``shifted`` to about 1 mm at a distance of 5 km.
+        """
+        projection = reference_projection()
+        if projection.lat != self.lat or projection.long != self.long:
+            projection = LocalProjection(self.lat, self.long)
+        return [GeoPoint(lat=lat, long=long) for lat, long in projection.unproject(points).tolist()]
+
+    @staticmethod
+    def from_cartesian_array(points: np.ndarray) -> list[GeoPoint]:
+        """Map an Nx2 array of Cartesian coordinates (x, y) relative to the reference point back to geo points."""
+        return [GeoPoint(lat=lat, long=long) for lat, long in reference_projection().unproject(points).tolist()]
+
     def __str__(self) -> str:
         return f'GeoPoint({round(self.lat, 5)}, {round(self.long, 5)})'
 
 
-@dataclass(slots=True, kw_only=True)
 class GeoPointCollection:
-    id: str
-    name: str
-    points: list[GeoPoint] = field(default_factory=list)
+    """A named sequence of geo points stored as one contiguous Nx2 float64 array of (lat, long).
+
+    The ``GeoPoint`` objects, the cartesian coordinates and the shapely geometries are derived lazily and cached.
+    The cartesian coordinates are recomputed when the reference point changes.
+    All arrays handed out are read-only views, so callers can use them without copying.
+    """
+    __slots__ = ('_cartesian', '_cartesian_projection', '_lat_long', '_points', '_shapely_line', '_shapely_polygon',
+                 'id', 'name')
+
+    def __init__(self, *,
+                 id: str,  # pylint: disable=redefined-builtin
+                 name: str,
+                 points: list[GeoPoint] | None = None,
+                 lat_long: np.ndarray | None = None) -> None:
+        self.id = id
+        self.name = name
+        if lat_long is not None:
+            self._set_lat_long(lat_long)
+        else:
+            self.points = points or []
+
+    def _set_lat_long(self, lat_long: np.ndarray) -> None:
+        array = np.ascontiguousarray(lat_long, dtype=np.float64).reshape(-1, 2).view()
+        array.flags.writeable = False
+        self._lat_long = array
+        self._points: list[GeoPoint] | None = None
+        self._cartesian: np.ndarray | None = None
+        self._cartesian_projection: LocalProjection | None = None
+        self._shapely_line: shapely.geometry.LineString | None = None
+        self._shapely_polygon: shapely.geometry.Polygon | None = None
+
+    @property
+    def lat_long(self) -> np.ndarray:
+        """Read-only Nx2 array of (lat, long) in degrees."""
+        return self._lat_long
+
+    @property
+    def points(self) -> list[GeoPoint]:
+        """The points as ``GeoPoint`` objects; created on first access and shared, so do not modify the list."""
+        if self._points is None:
+            self._points = [GeoPoint(lat=lat, long=long) for lat, long in self._lat_long.tolist()]
+        return self._points
+
+    @points.setter
+    def points(self, points: list[GeoPoint]) -> None:
+        self._set_lat_long(np.array([(p.lat, p.long) for p in points], dtype=np.float64).reshape(-1, 2))
+
+    def __len__(self) -> int:
+        return len(self._lat_long)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        assert isinstance(other, GeoPointCollection)
+        return self.id == other.id and self.name == other.name and np.array_equal(self._lat_long, other._lat_long)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(id={self.id!r}, name={self.name!r}, points={len(self)})'
+
+    def cartesian_array(self) -> np.ndarray:
+        """Read-only Nx2 array of cartesian coordinates (x pointing north, y pointing west) relative to the reference."""
+        projection = reference_projection()
+        if self._cartesian is None or self._cartesian_projection is not projection:
+            cartesian = projection.project(self._lat_long) if len(self) else np.empty((0, 2))
+            cartesian.flags.writeable = False
+            self._cartesian = cartesian
+            self._cartesian_projection = projection
+        return self._cartesian
 
     def cartesian(self) -> list[rosys.geometry.Point]:
-        cartesian_points = []
-        for point in self.points:
-            cartesian_points.append(point.cartesian())
-        return cartesian_points
+        return [rosys.geometry.Point(x=x, y=y) for x, y in self.cartesian_array().tolist()]
 
     @property
     def points_as_tuples(self) -> list[tuple[float, float]]:
-        return [p.tuple for p in self.points]
+        return [(lat, long) for lat, long in self._lat_long.tolist()]
 
     @property
     def shapely_polygon(self) -> shapely.geometry.Polygon:
-        return shapely.geometry.Polygon([p.tuple for p in self.points])
+        if self._shapely_polygon is None:
+            self._shapely_polygon = shapely.geometry.Polygon(self._lat_long)
+        return self._shapely_polygon
 
     @property
     def shapely_line(self) -> shapely.geometry.LineString:
-        return shapely.geometry.LineString([p.tuple for p in self.points])
+        if self._shapely_line is None:
+            self._shapely_line = shapely.geometry.LineString(self._lat_long)
+        return self._shapely_line
 
 
 def get_new_position(reference: GeoPoint, distance: float, yaw: float) -> GeoPoint:
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import rosys
+
+from .geo_point import GeoPoint
+from .projection import LocalProjection
+
+
+class GeoReference(GeoPoint):
+    """The geo point all cartesian coordinates are relative to.
+
+    There is a single instance (``localization.reference``) which is updated in place.
+    Modules holding cartesian data subscribe to ``REFERENCE_CHANGED`` and convert it into the new frame,
+    so moving the reference does not require a restart.
+    """
+    __slots__ = ('REFERENCE_CHANGED', 'projection', 'version')
+
+    def __init__(self, lat: float = 0.0, long: float = 0.0) -> None:
+        super().__init__(lat=lat, long=long)
+        self.version: int = 0
+        self.projection = LocalProjection(lat, long)
+
+        self.REFERENCE_CHANGED = rosys.event.Event()
+        """the reference has been moved (argument: LocalProjection of the previous reference or None if it was not set)"""
+
+    @property
+    def is_set(self) -> bool:
+        return self.lat != 0 or self.long != 0
+
+    def update(self, point: GeoPoint) -> None:
+        if point.lat == self.lat and point.long == self.long:
+            return
+        previous = self.projection if self.is_set else None
+        self.lat = point.lat
+        self.long = point.long
+        self.projection = LocalProjection(self.lat, self.long)
+        self.version += 1
+        self.REFERENCE_CHANGED.emit(previous)
+
+    def convert_points(self, points: np.ndarray, previous: LocalProjection) -> np.ndarray:
+        """Convert an Nx2 array of cartesian coordinates relative to a previous reference into the current frame."""
+        return self.projection.project(previous.unproject(points))
+
+    def convert_pose(self, pose: rosys.geometry.Pose, previous: LocalProjection) -> rosys.geometry.Pose:
+        """Convert a pose relative to a previous reference into the current frame, including the meridian convergence."""
+        ahead = pose.point.polar(1.0, pose.yaw)
+        (x, y), (ahead_x, ahead_y) = self.convert_points(np.array([[pose.x, pose.y], [ahead.x, ahead.y]]),
+                                                         previous).tolist()
+        return rosys.geometry.Pose(x=x, y=y, yaw=math.atan2(ahead_y - y, ahead_x - x), time=pose.time)
@@ -1,11 +1,8 @@
 from __future__ import annotations
 
 import logging
-import os
 from abc import ABC, abstractmethod
-from collections import deque
-from copy import deepcopy
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Any
 
 import numpy as np
@@ -16,9 +13,11 @@ from rosys.persistence.registry import backup
 
 from .. import localization
 from .geo_point import GeoPoint, get_new_position
+from .pose_filter import PoseFilter
+from .projection import LocalProjection
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, kw_only=True)
 class GNSSRecord:
     timestamp: float
     location: GeoPoint
@@ -28,12 +27,21 @@ class GNSSRecord:
     separation: float = 0.0
     heading: float | None = None
     speed_kmh: float = 0.0
+    latitude_std_dev: float | None = None
+    longitude_std_dev: float | None = None
+    heading_std_dev: float | None = None
+
+    @property
+    def has_rtk_fix(self) -> bool:
+        """RTK fixed or float (or the simulated mode "SSSS")"""
+        return 'R' in self.mode or self.mode == 'SSSS'
 
 
 class Gnss(rosys.persistence.PersistentModule, ABC):
-    MIN_POSES: int = 3
-    MAX_POSES: int = 30
     MAX_DISTANCE_TO_REFERENCE: float = 5000.0
+    POSITION_STD_DEV: float = 0.02  # used if the receiver does not provide the accuracy of an RTK fix
+    HEADING_STD_DEV: float = 0.5  # degrees, used if the receiver does not provide the accuracy of the heading
+    RETRY_INTERVAL: float = 0.1
 
     def __init__(self, odometer: rosys.driving.Odometer, antenna_offset: float) -> None:
         super().__init__()
@@ -41,7 +49,7 @@ class Gnss(rosys.persistence.PersistentModule, ABC):
         self.odometer = odometer
 
         self.ROBOT_POSE_LOCATED = rosys.event.Event()
-        """the robot has been located (argument: Pose) with RTK-fixed"""
+        """the robot has been located (argument: Pose fused from odometry and RTK-fixed GNSS at the time of the record)"""
 
         self.ROBOT_GNSS_POSITION_CHANGED = rosys.event.Event()
         """the robot has been located (argument: GeoPoint), may only be a rough estimate if no RTK fix is available"""
@@ -55,44 +63,53 @@ class Gnss(rosys.persistence.PersistentModule, ABC):
         self.current: GNSSRecord | None = None
         self.device: str | None = None
         self.antenna_offset = antenna_offset
-        self.observed_poses: deque[rosys.geometry.Pose] = deque(maxlen=self.MAX_POSES)
-        self.needed_poses: int = self.MIN_POSES
+        self.pose_filter = PoseFilter(odometer)
         self.max_distance_to_reference: float = self.MAX_DISTANCE_TO_REFERENCE
         self.reference_alert_dialog: ui.dialog
-        self._last_odometer_pose = self.odometer.prediction
         self._last_gnss_pose = self.odometer.prediction
 
         self.needs_backup = False
-        rosys.on_repeat(self.check_gnss, 0.01)
+        localization.reference.REFERENCE_CHANGED.register(self._handle_reference_changed)
+        rosys.on_repeat(self.check_gnss, self.RETRY_INTERVAL)
         rosys.on_repeat(self.try_connection, 3.0)
-        rosys.on_repeat(self.update_robot_pose, 0.5)
 
     @abstractmethod
     async def try_connection(self) -> None:
         pass
 
     async def check_gnss(self) -> None:
-        previous = deepcopy(self.current)
-        try:
-            self.current = await self._create_new_record()
-        except Exception:
-            self.log.exception('creation of gnss record failed')
-        if previous is not None:
-            if self.current is None:
-                self.log.warning('new GNSS record is None')
-                self.GNSS_CONNECTION_LOST.emit()
+        """Process each record as soon as the source has received a complete epoch.
+
+        ``_create_new_record`` waits for the next epoch, so this only returns (and is retried by the repeater)
+        if the source has no record.
+        """
+        while not rosys.helpers.is_stopping():
+            try:
+                record = await self._create_new_record()
+            except Exception:
+                self.log.exception('creation of gnss record failed')
                 return
-            if ('R' in previous.mode or previous.mode == 'SSSS') and ('R' not in self.current.mode and self.current.mode != 'SSSS'):
-                self.log.warning('GNSS RTK fix lost')
-                self.ROBOT_GNSS_POSITION_CHANGED.emit(self.current.location)
-                self.RTK_FIX_LOST.emit()
+            await self._handle_record(record)
+            if record is None:
                 return
-        if self.current is None:
+
+    async def _handle_record(self, record: GNSSRecord | None) -> None:
+        previous = self.current
+        self.current = record
+        if record is None:
+            if previous is not None:
+                self.log.warning('new GNSS record is None')
+                self.GNSS_CONNECTION_LOST.emit()
+            return
+        if previous is not None and previous.has_rtk_fix and not record.has_rtk_fix:
+            self.log.warning('GNSS RTK fix lost')
+            self.ROBOT_GNSS_POSITION_CHANGED.emit(record.location)
+            self.RTK_FIX_LOST.emit()
             return
         try:
             # TODO also do antenna_offset correction for this event
-            self.ROBOT_GNSS_POSITION_CHANGED.emit(self.current.location)
-            if 'R' in self.current.mode or self.current.mode == 'SSSS':
+            self.ROBOT_GNSS_POSITION_CHANGED.emit(record.location)
+            if record.has_rtk_fix:
                 await self._on_rtk_fix()
         except Exception:
             self.log.exception('gnss record could not be applied')
@@ -100,67 +117,64 @@ class Gnss(rosys.persistence.PersistentModule, ABC):
 
     @abstractmethod
     async def _create_new_record(self) -> GNSSRecord | None:
-        pass
+        """Wait for the next complete epoch and return its record (or None if no record is available)."""
 
     async def _on_rtk_fix(self) -> None:
-        distance = self._last_odometer_pose.distance(self.odometer.prediction)
-        yaw_difference = abs(rosys.helpers.angle(self._last_odometer_pose.yaw, self.odometer.prediction.yaw))
-        if abs(distance) > 0.0001 or yaw_difference > np.deg2rad(0.01):  # if robot does not stand still
-            self.observed_poses.clear()
-            self._last_odometer_pose = self.odometer.prediction
-            return
         assert self.current is not None
-        if localization.reference.lat == 0 and localization.reference.long == 0:
+        if not localization.reference.is_set:
             await self.update_reference()
         if self.current.heading is not None:
             yaw = np.deg2rad(-self.current.heading)
         else:
-            # TODO: Better INS implementation if no heading provided by GNSS
             yaw = self.odometer.get_pose(time=self.current.timestamp).yaw
         # correct the gnss coordinate by antenna offset
-        self.current.location = get_new_position(self.current.location, self.antenna_offset, yaw+np.pi/2)
+        self.current = replace(self.current,
+                               location=get_new_position(self.current.location, self.antenna_offset, yaw+np.pi/2))
         cartesian_coordinates = self.current.location.cartesian()
-        pose = rosys.geometry.Pose(
+        measurement = rosys.geometry.Pose(
             x=cartesian_coordinates.x,
             y=cartesian_coordinates.y,
             yaw=yaw,
             time=self.current.timestamp)
-        self.observed_poses.append(pose)
-
-    async def update_robot_pose(self) -> None:
-        if len(self.observed_poses) < self.needed_poses:
+        position_std_dev = (self.current.latitude_std_dev or self.POSITION_STD_DEV,
+                            self.current.longitude_std_dev or self.POSITION_STD_DEV)
+        heading_std_dev = None if self.current.heading is None else \
+            np.deg2rad(self.current.heading_std_dev or self.HEADING_STD_DEV)
+        pose = self.pose_filter.update(measurement, position_std_dev, heading_std_dev)
+        if pose is None:
             return
-        x = np.mean([pose.point.x for pose in self.observed_poses])
-        y = np.mean([pose.point.y for pose in self.observed_poses])
-        yaw = np.mean([pose.yaw for pose in self.observed_poses])
-        self._last_gnss_pose = rosys.geometry.Pose(x=float(x), y=float(
-            y), yaw=float(yaw), time=self.observed_poses[-1].time)
-        self.ROBOT_POSE_LOCATED.emit(self._last_gnss_pose)
-        self.observed_poses.clear()
+        self._last_gnss_pose = pose
+        self.ROBOT_POSE_LOCATED.emit(pose)
 
     def backup(self) -> dict:
-        return {
-            'needed_poses': self.needed_poses,
-        }
+        return {}
 
     def restore(self, data: dict[str, Any]) -> None:
-        self.needed_poses = data.get('needed_poses', self.needed_poses)
+        pass
 
     async def update_reference(self) -> None:
         if self.current is None:
             self.log.warning('No GNSS position available')
             return
-        localization.reference = self.current.location
+        localization.reference.update(self.current.location)
         await backup(force=True)
         self.log.info('GNSS reference set to %s', self.current.location)
-        os.utime('main.py')
+
+    def _handle_reference_changed(self, previous: LocalProjection | None) -> None:
+        if previous is None:
+            self.pose_filter.reset()
+            return
+        self.odometer.handle_detection(localization.reference.convert_pose(self.odometer.prediction, previous))
+        if self.pose_filter.pose is not None:
+            self.pose_filter.pose = localization.reference.convert_pose(self.pose_filter.pose, previous)
+        self._last_gnss_pose = localization.reference.convert_pose(self._last_gnss_pose, previous)
 
     def reference_warning_dialog(self) -> None:
         with ui.dialog() as self.reference_alert_dialog, ui.card():
             ui.label('The reference is to far away from the current position which would lead to issues in the navigation. Do you want to set it now?')
             with ui.row():
                 ui.button('Update reference', on_click=self.update_reference).props('outline color=warning') \
-                    .tooltip('Set current position as geo reference and restart the system').classes('ml-auto').style('display: block; margin-top:auto; margin-bottom: auto;')
+                    .tooltip('Set current position as geo reference').classes('ml-auto').style('display: block; margin-top:auto; margin-bottom: auto;')
                 ui.button('Cancel', on_click=self.reference_alert_dialog.close)
 
     def check_distance_to_reference(self) -> bool:
@@ -173,6 +187,7 @@ class Gnss(rosys.persistence.PersistentModule, ABC):
     def developer_ui(self) -> None:
         ui.label('GNSS').classes('text-center text-bold')
         ui.label(f'Reference: {localization.reference}')
-        ui.label(f'Observed_Poses: {len(self.observed_poses)}')
-        ui.label(f'Needed Poses: {self.needed_poses}')
+        ui.label().bind_text_from(self, 'pose_filter', lambda pose_filter:
+                                  f'Filter std dev: {pose_filter.position_std_dev * 100:.1f} cm, '
+                                  f'{np.rad2deg(pose_filter.yaw_std_dev):.2f}°')
         ui.label(f'odom: {self.odometer.prediction}')
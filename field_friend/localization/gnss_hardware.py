@@ -1,27 +1,61 @@
 # pylint: disable-all
 # TODO: this will be refactored
-import datetime
+from typing import Any, ClassVar
 
-import pynmea2
-import rosys
 import serial
+from nicegui import ui
 from rosys.driving.odometer import Odometer
 from serial.tools import list_ports
 
-from .gnss import GeoPoint, Gnss, GNSSRecord
+from .gnss import Gnss, GNSSRecord
+from .gnss_reader import GnssDecoder, GnssReader
+from .gnss_recorder import GnssRecorder
+from .nmea import NmeaDecoder
+from .sbf import SbfDecoder
 
 
 class GnssHardware(Gnss):
     PORT = '/dev/cu.usbmodem36307295'
-    TYPES_NEEDED = ('GGA', 'GNS', 'HDT')
+    RECORD_TIMEOUT = 1.0
+    DECODERS: ClassVar[dict[str, type[GnssDecoder]]] = {'nmea': NmeaDecoder, 'sbf': SbfDecoder}
 
-    def __init__(self, odometer: Odometer, antenna_offset: float) -> None:
+    def __init__(self, odometer: Odometer, antenna_offset: float, protocol: str = 'nmea') -> None:
         super().__init__(odometer, antenna_offset)
+        if protocol not in self.DECODERS:
+            raise ValueError(f'Unknown GNSS protocol "{protocol}", expected one of {list(self.DECODERS)}')
+        self.protocol = protocol
         self.ser: serial.Serial | None = None
+        self.reader: GnssReader | None = None
+        self.recorder: GnssRecorder | None = None
 
     def __del__(self) -> None:
-        if self.ser is not None:
-            self.ser.close()
+        self._disconnect()
+        self.recording = False
+
+    @property
+    def recording(self) -> bool:
+        """Whether the raw receiver stream is recorded (see ``GnssRecorder``)."""
+        return self.recorder is not None
+
+    @recording.setter
+    def recording(self, value: bool) -> None:
+        if value and self.recorder is None:
+            self.recorder = GnssRecorder(self.protocol)
+            if self.reader is not None:
+                self.reader.recorder = self.recorder
+        elif not value and self.recorder is not None:
+            recorder = self.recorder
+            self.recorder = None
+            if self.reader is not None:
+                self.reader.recorder = None
+            recorder.close()  # NOTE: the reader thread might still hold the recorder, which ignores writes once closed
+
+    def backup(self) -> dict:
+        return super().backup() | {'recording': self.recording}
+
+    def restore(self, data: dict[str, Any]) -> None:
+        super().restore(data)
+        self.recording = data.get('recording', self.recording)
 
     async def try_connection(self) -> None:
         if self.device is not None:
@@ -44,73 +78,35 @@ class GnssHardware(Gnss):
         except serial.SerialException as e:
             self.log.error(f'Could not connect to GNSS device: {e}')
             self.device = None
+            return
+        self.reader = GnssReader(self.ser, self.DECODERS[self.protocol]())
+        self.reader.recorder = self.recorder
+        self.reader.start()
         self.log.info(f'Connected to GNSS device "{self.device}"')
 
-    async def _read(self) -> str | None:
-        if self.ser is None:
-            self.log.debug('GNSS device not connected')
-            return None
-        if not self.ser.isOpen():
-            self.log.debug('GNSS device not open')
-            return None
-        line = await rosys.run.io_bound(self.ser.read_until, b'\r\n')
-        if not line:
-            self.log.debug('No data')
-            return None
-        line = line.decode()
-        return line
-
     async def _create_new_record(self) -> GNSSRecord | None:
-        if self.ser is None:
+        if self.reader is None:
             return None
-        data = {}
-        types_seen: set[str] = set()
-        try:
-            deadline = rosys.time() + 0.2
-            while self.TYPES_NEEDED != types_seen and rosys.time() < deadline:
-                line = await self._read()
-                if not line:
-                    self.log.debug('No data received')
-                    return None
-                try:
-                    msg = pynmea2.parse(line)
-                    # self.log.info(f'GNSS message: {msg}')
-                    if not hasattr(msg, 'sentence_type'):
-                        self.log.debug(f'No sentence type: {msg}')
-                        return None
-                    gps_qual = getattr(msg, 'gps_qual', 0)
-                    if msg.sentence_type == 'GGA' and gps_qual is not None and gps_qual > 0:
-                        data['gps_qual'] = msg.gps_qual
-                        data['altitude'] = msg.altitude
-                        data['separation'] = msg.geo_sep
-                        types_seen.add(msg.sentence_type)
-                        gga = msg
-                    if msg.sentence_type == 'GNS' and getattr(msg, 'mode_indicator', None):
-                        if isinstance(msg.timestamp, datetime.time):
-                            dt = datetime.datetime.combine(datetime.date.today(), msg.timestamp)
-                            dt.replace(tzinfo=datetime.UTC)
-                            data['timestamp'] = dt.timestamp()
-                        else:
-                            data['timestamp'] = msg.timestamp
-                        data['location'] = GeoPoint(lat=msg.latitude, long=msg.longitude)
-                        data['mode'] = msg.mode_indicator
-                        types_seen.add(msg.sentence_type)
-                        # print(f'The GNSS message: {msg.mode_indicator}')
-                    if msg.sentence_type == 'HDT' and getattr(msg, 'heading', None):
-                        data['heading'] = float(msg.heading) if msg.heading else None
-                        types_seen.add(msg.sentence_type)
-                except pynmea2.ParseError as e:
-                    self.log.info(f'Parse error: {e}')
-                    continue
-        except serial.SerialException as e:
-            self.log.info(f'Device error: {e}')
-            self.device = None
-            return None
-        if data.get('location') is None:
-            self.log.warning('No location in GNSS data -- maybe it was provided in GGA message?')
-            return None
-        try:
-            return GNSSRecord(**data)
-        except Exception:
-            self.log.exception(f'Could not create GNSS record from msg: {gga.__dict__} resulting in data: {data}')
+        record = await self.reader.next_record(timeout=self.RECORD_TIMEOUT)
+        if self.reader.error is not None:
+            self._disconnect()
             return None
+        if record is None:
+            self.log.debug('No data received')
+        return record
+
+    def _disconnect(self) -> None:
+        if self.reader is not None:
+            self.reader.stop()
+            self.reader = None
+        if self.ser is not None:
+            self.ser.close()
+            self.ser = None
+        self.device = None
+
+    def reader_ui(self) -> None:
+        ui.checkbox('Record raw stream', on_change=self.request_backup).bind_value(self, 'recording') \
+            .tooltip(f'Write the received bytes to {GnssRecorder.PATH}')
+        for stage in ('epoch', 'decode', 'handoff'):
+            ui.label().bind_text_from(self, 'reader', lambda reader, stage=stage:
+                                      f'Latency {stage}: {reader.latency[stage] if reader else "-"}')
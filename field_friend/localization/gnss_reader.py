@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Protocol
+
+import serial
+
+from .gnss import GNSSRecord
+from .gnss_recorder import GnssRecorder
+
+
+class GnssDecoder(Protocol):
+    def feed(self, data: bytes) -> list[GNSSRecord]:
+        ...
+
+
+@dataclass(slots=True, kw_only=True)
+class LatencyStats:
+    count: int = 0
+    last: float = 0.0
+    mean: float = 0.0
+    max: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.last = value
+        self.mean += (value - self.mean) / min(self.count, 100)  # NOTE: moving average over roughly 100 samples
+        self.max = max(self.max, value)
+
+    def __str__(self) -> str:
+        return f'{self.last * 1000:.2f} ms (mean {self.mean * 1000:.2f}, max {self.max * 1000:.2f})'
+
+
+class GnssReader:
+    """Reads a GNSS receiver on a background thread and hands decoded records over to the event loop.
+
+    Incoming bytes are decoded as soon as they arrive, so an epoch is delivered right after its last message.
+    Delivered records are kept in a small ring buffer until they are consumed with ``next_record``.
+    If a ``recorder`` is set, the received bytes are written to it after decoding.
+    Errors while decoding or recording are logged and the affected chunk is skipped, so the reader keeps running.
+    The latency of each stage is tracked in ``latency``:
+
+    - ``epoch``: from the first bytes of an epoch until it is complete
+    - ``decode``: from the last bytes of an epoch until its record is created
+    - ``handoff``: from the reader thread to the event loop
+    """
+    MAX_RECORDS = 16
+    READ_SIZE = 4096
+
+    def __init__(self, ser: serial.Serial, decoder: GnssDecoder) -> None:
+        self.log = logging.getLogger('field_friend.gnss')
+        self.ser = ser
+        self.decoder = decoder
+        self.records: deque[GNSSRecord] = deque(maxlen=self.MAX_RECORDS)
+        self.latency: dict[str, LatencyStats] = {'epoch': LatencyStats(), 'decode': LatencyStats(), 'handoff': LatencyStats()}
+        self.error: Exception | None = None
+        self.recorder: GnssRecorder | None = None
+        self._loop = asyncio.get_running_loop()
+        self._record_available = asyncio.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='gnss_reader', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    async def next_record(self, timeout: float) -> GNSSRecord | None:
+        """Return the oldest unconsumed record, waiting up to ``timeout`` seconds for a new one."""
+        if not self.records and self.error is None:
+            self._record_available.clear()
+            try:
+                await asyncio.wait_for(self._record_available.wait(), timeout)
+            except TimeoutError:
+                return None
+        return self.records.popleft() if self.records else None
+
+    def _run(self) -> None:
+        epoch_start: float | None = None
+        while not self._stop.is_set():
+            try:
+                data = self.ser.read(min(max(self.ser.in_waiting, 1), self.READ_SIZE))
+            except (serial.SerialException, OSError, TypeError) as e:
+                # NOTE: pyserial raises TypeError when the port is closed while reading
+                if not self._stop.is_set():
+                    self._loop.call_soon_threadsafe(self._fail, e)
+                return
+            if not data:
+                continue
+            received_time = time.time()
+            received = time.perf_counter()
+            if epoch_start is None:
+                epoch_start = received
+            try:
+                records = self.decoder.feed(data)
+            except Exception:
+                self.log.exception('Could not decode GNSS data')
+                records = []
+            if records:
+                decoded = time.perf_counter()
+                for record in records:
+                    self._loop.call_soon_threadsafe(self._deliver, record, decoded, received - epoch_start, decoded - received)
+                epoch_start = None
+            if (recorder := self.recorder) is not None:
+                try:
+                    recorder.write(data, received_time)
+                except Exception:
+                    self.log.exception('Could not record GNSS data')
+
+    def _deliver(self, record: GNSSRecord, decoded: float, epoch_latency: float, decode_latency: float) -> None:
+        self.latency['epoch'].add(epoch_latency)
+        self.latency['decode'].add(decode_latency)
+        self.latency['handoff'].add(time.perf_counter() - decoded)
+        self.records.append(record)
+        self._record_available.set()
+
+    def _fail(self, error: Exception) -> None:
+        self.log.info(f'Device error: {error}')
+        self.error = error
+        self._record_available.set()
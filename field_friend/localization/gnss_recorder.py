@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import datetime
+import gzip
+import logging
+import struct
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+CHUNK = struct.Struct('<dI')  # unix timestamp of reception, number of bytes
+
+
+class GnssRecorder:
+    """Writes the raw bytes received from the GNSS receiver to rolling gzip files.
+
+    Each file is named after its start time and the protocol (e.g. ``20241112_101718.nmea.gz``)
+    and contains chunks of a timestamp, a length and the received bytes.
+    A new file is started every ``max_file_duration`` seconds; only the newest ``max_files`` files are kept.
+    ``write`` is thread-safe so it can be called directly from the reader thread; it does nothing after ``close``.
+    """
+    PATH = Path('~/.rosys/gnss').expanduser()
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, protocol: str, *,
+                 path: Path = PATH,
+                 max_file_duration: float = 600.0,
+                 max_files: int = 50) -> None:
+        self.log = logging.getLogger('field_friend.gnss')
+        self.protocol = protocol
+        self.path = path
+        self.max_file_duration = max_file_duration
+        self.max_files = max_files
+        self.file_path: Path | None = None
+        self._file: gzip.GzipFile | None = None
+        self._file_start = 0.0
+        self._last_flush = 0.0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes, timestamp: float | None = None) -> None:
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None or timestamp - self._file_start > self.max_file_duration:
+                self._open(timestamp)
+            assert self._file is not None
+            self._file.write(CHUNK.pack(timestamp, len(data)))
+            self._file.write(data)
+            if timestamp - self._last_flush > self.FLUSH_INTERVAL:
+                self._file.flush()  # NOTE: keeps the file readable up to this point if the process is killed
+                self._last_flush = timestamp
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self, timestamp: float) -> None:
+        if self._file is not None:
+            self._file.close()
+        self.path.mkdir(parents=True, exist_ok=True)
+        name = datetime.datetime.fromtimestamp(timestamp, datetime.UTC).strftime('%Y%m%d_%H%M%S')
+        self.file_path = self.path / f'{name}.{self.protocol}.gz'
+        self._file = gzip.GzipFile(self.file_path, 'ab', compresslevel=6)
+        self._file_start = timestamp
+        self.log.info(f'Recording GNSS stream to {self.file_path}')
+        for old_file in sorted(self.path.glob(f'*.{self.protocol}.gz'))[:-self.max_files]:
+            old_file.unlink()
+
+
+def recording_protocol(path: Path) -> str:
+    """Return the protocol a recording was made with, e.g. ``nmea`` for ``20241112_101718.nmea.gz``."""
+    return path.suffixes[-2].lstrip('.')
+
+
+def read_recording(paths: Iterable[Path]) -> Iterator[tuple[float, bytes]]:
+    """Yield the timestamp and the received bytes of all chunks in the given recording files.
+
+    A file which was not closed properly is read up to its last complete chunk.
+    """
+    for path in paths:
+        with gzip.open(path, 'rb') as f:
+            try:
+                while header := f.read(CHUNK.size):
+                    timestamp, length = CHUNK.unpack(header)
+                    data = f.read(length)
+                    if len(data) < length:
+                        break
+                    yield timestamp, data
+            except (EOFError, struct.error):
+                logging.getLogger('field_friend.gnss').warning(f'Recording {path} is truncated')
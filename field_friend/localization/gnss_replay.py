@@ -0,0 +1,65 @@
+import dataclasses
+import math
+from collections import deque
+from pathlib import Path
+
+import rosys
+
+from .gnss import Gnss, GNSSRecord
+from .gnss_reader import GnssDecoder
+from .gnss_recorder import read_recording, recording_protocol
+from .nmea import NmeaDecoder
+from .sbf import SbfDecoder
+
+
+class GnssReplay(Gnss):
+    """Replays raw receiver streams written by ``GnssRecorder`` through the same decoders as ``GnssHardware``.
+
+    The recording is paced by its reception timestamps, accelerated by ``speed`` (``math.inf`` replays as fast as possible).
+    Record timestamps are mapped onto the RoSys time of the replay, so the odometer history matches.
+    """
+
+    def __init__(self, odometer: rosys.driving.Odometer, recording: list[Path], *,
+                 antenna_offset: float = 0.0,
+                 speed: float = 1.0) -> None:
+        super().__init__(odometer, antenna_offset)
+        self.recording = sorted(recording)
+        self.protocol = recording_protocol(self.recording[0])
+        self.speed = speed
+        self.finished = False
+        self._chunks = read_recording(self.recording)
+        self._chunk_time = 0.0
+        self._recording_start: float | None = None
+        self._replay_start = 0.0
+        self._records: deque[GNSSRecord] = deque()
+        self._decoder: GnssDecoder = NmeaDecoder(clock=lambda: self._chunk_time) if self.protocol == 'nmea' else SbfDecoder()
+
+    async def try_connection(self) -> None:
+        if not self.finished:
+            self.device = 'replay'
+
+    async def _create_new_record(self) -> GNSSRecord | None:
+        while not self._records:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                if not self.finished:
+                    self.log.info('GNSS replay finished')
+                self.finished = True
+                self.device = None
+                return None
+            self._chunk_time, data = chunk
+            if self._recording_start is None:
+                self._recording_start = self._chunk_time
+                self._replay_start = rosys.time()
+            delay = self._to_replay_time(self._chunk_time) - rosys.time()
+            if delay > 0:
+                await rosys.sleep(delay)
+            self._records.extend(self._decoder.feed(data))
+        record = self._records.popleft()
+        return dataclasses.replace(record, timestamp=self._to_replay_time(record.timestamp))
+
+    def _to_replay_time(self, timestamp: float) -> float:
+        assert self._recording_start is not None
+        if math.isinf(self.speed):
+            return rosys.time()
+        return self._replay_start + (timestamp - self._recording_start) / self.speed
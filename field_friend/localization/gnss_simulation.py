@@ -5,6 +5,7 @@ from rosys.geometry import Pose
 from .. import localization
 from .geo_point import GeoPoint
 from .gnss import Gnss, GNSSRecord
+from .projection import LocalProjection
 
 
 class GnssSimulation(Gnss):
@@ -22,18 +23,22 @@ class GnssSimulation(Gnss):
 
     async def _create_new_record(self) -> GNSSRecord | None:
         pose = self.wheels.pose
-        if localization.reference.lat == 0 and localization.reference.long == 0:
+        if not localization.reference.is_set:
             new_position = GeoPoint(lat=51.983159, long=7.434212)
         else:
             new_position = localization.reference.shifted(pose.point)
-        record = GNSSRecord(timestamp=pose.time, location=new_position, heading=-np.rad2deg(pose.yaw))
-        record.gps_qual = self.gps_quality
-        record.mode = self.mode
+        record = GNSSRecord(timestamp=pose.time, location=new_position, heading=-np.rad2deg(pose.yaw),
+                            gps_qual=self.gps_quality, mode=self.mode)
         await rosys.sleep(0.1)  # NOTE simulation does not be so fast and only eats a lot of cpu time
         return record
 
+    def _handle_reference_changed(self, previous: LocalProjection | None) -> None:
+        if previous is not None:
+            self.wheels.pose = localization.reference.convert_pose(self.wheels.pose, previous)
+        super()._handle_reference_changed(previous)
+
     def relocate(self, position: GeoPoint) -> None:
-        localization.reference = position
+        localization.reference.update(position)
         self.wheels.pose = Pose(x=position.lat, y=position.long, yaw=0.0, time=rosys.time())
 
     def disconnect(self):
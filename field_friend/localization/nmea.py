@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import datetime
+import functools
+import logging
+import operator
+import time
+from collections.abc import Callable
+
+import pynmea2
+
+from .geo_point import GeoPoint
+from .gnss import GNSSRecord
+
+GGA = 1
+GNS = 2
+HDT = 4
+
+_M512, _M256, _M128, _M64, _M32, _M16 = ((1 << bits) - 1 for bits in (512, 256, 128, 64, 32, 16))
+
+
+def checksum(data: bytes) -> int:
+    """XOR of all bytes, as used for NMEA checksums."""
+    if len(data) > 128:
+        return functools.reduce(operator.xor, data, 0)
+    # NOTE: fold the bytes as one integer instead of looping over them, which is about twice as fast
+    n = int.from_bytes(data, 'little')
+    n = (n >> 512) ^ (n & _M512)
+    n = (n >> 256) ^ (n & _M256)
+    n = (n >> 128) ^ (n & _M128)
+    n = (n >> 64) ^ (n & _M64)
+    n = (n >> 32) ^ (n & _M32)
+    n = (n >> 16) ^ (n & _M16)
+    return (n >> 8) ^ (n & 0xFF)
+
+
+def checksum_valid(sentence: bytes) -> bool:
+    """Check that the sentence has the form ``$<data>*<checksum>`` and the checksum matches."""
+    star = sentence.rfind(b'*')
+    if star < 1 or sentence[0] != 0x24 or len(sentence) < star + 3:  # 0x24 is '$'
+        return False
+    try:
+        return checksum(sentence[1:star]) == int(sentence[star + 1:star + 3], 16)
+    except ValueError:
+        return False
+
+
+def parse_time_of_day(value: bytes) -> float:
+    """Parse ``hhmmss.ss`` into seconds since midnight."""
+    return int(value[0:2]) * 3600 + int(value[2:4]) * 60 + float(value[4:])
+
+
+def parse_coordinate(value: bytes, hemisphere: bytes) -> float:
+    """Parse ``(d)ddmm.mmmm`` and the hemisphere (N/S/E/W) into decimal degrees."""
+    dot = value.index(b'.')
+    degrees = int(value[:dot - 2]) + float(value[dot - 2:]) / 60
+    return -degrees if hemisphere in (b'S', b'W') else degrees
+
+
+def utc_timestamp(time_of_day: float, now: float | None = None) -> float:
+    """Combine seconds since UTC midnight with the current UTC date, handling epochs from just before midnight."""
+    if now is None:
+        now = time.time()
+    midnight = now - now % 86400
+    timestamp = midnight + time_of_day
+    if timestamp - now > 43200:
+        timestamp -= 86400
+    return timestamp
+
+
+class NmeaEpoch:
+    """Preallocated storage for the fields of one epoch, reused for every epoch to avoid intermediate objects."""
+    __slots__ = ('altitude', 'gps_qual', 'heading', 'lat', 'long', 'mode', 'separation', 'time_of_day', 'types_seen')
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self.types_seen: int = 0
+        self.time_of_day: float | None = None
+        self.lat: float | None = None
+        self.long: float | None = None
+        self.mode: str = ''
+        self.gps_qual: int = 0
+        self.altitude: float = 0.0
+        self.separation: float = 0.0
+        self.heading: float | None = None
+
+
+class NmeaDecoder:
+    """Incrementally splits an NMEA byte stream into sentences and assembles them into GNSS epochs.
+
+    GGA, GNS and HDT sentences are parsed directly from the received bytes after validating their checksum;
+    pynmea2 is only used as a fallback if a sentence does not have the expected layout.
+    Other sentence types are ignored.
+    An epoch is complete as soon as all ``TYPES_NEEDED`` have been seen.
+    If a GGA or GNS sentence of the next epoch arrives first, the incomplete epoch is emitted if it has a location.
+    The ``clock`` provides the current unix time to determine the date of the UTC time of day in the sentences.
+    """
+    TYPES_NEEDED = GGA | GNS | HDT
+    MAX_BUFFER_SIZE = 4096
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self.log = logging.getLogger('field_friend.gnss')
+        self.clock = clock
+        self._buffer = bytearray()
+        self._epoch = NmeaEpoch()
+
+    def feed(self, data: bytes) -> list[GNSSRecord]:
+        """Add received bytes and return the records of all epochs completed by them."""
+        self._buffer += data
+        records: list[GNSSRecord] = []
+        start = 0
+        while (end := self._buffer.find(b'\n', start)) >= 0:
+            record = self._handle_sentence(bytes(self._buffer[start:end]).strip())
+            if record is not None:
+                records.append(record)
+            start = end + 1
+        del self._buffer[:start]
+        if len(self._buffer) > self.MAX_BUFFER_SIZE:
+            self.log.warning('discarding %d bytes without line ending', len(self._buffer))
+            self._buffer.clear()
+        return records
+
+    def _handle_sentence(self, sentence: bytes) -> GNSSRecord | None:
+        if not sentence:
+            return None
+        sentence_type = sentence[3:6]
+        if sentence_type not in (b'GGA', b'GNS', b'HDT'):
+            return None
+        if not checksum_valid(sentence):
+            self.log.info(f'Checksum error: {sentence!r}')
+            return None
+        fields = sentence[7:sentence.rfind(b'*')].split(b',')
+        try:
+            if sentence_type == b'GGA':
+                return self._add_gga(parse_time_of_day(fields[0]), int(fields[5] or 0),
+                                     float(fields[8] or 0), float(fields[10] or 0))
+            if sentence_type == b'GNS':
+                mode = fields[5].decode()
+                if not mode:
+                    return self._add_gns(parse_time_of_day(fields[0]), None, None, mode)
+                return self._add_gns(parse_time_of_day(fields[0]),
+                                     parse_coordinate(fields[1], fields[2]), parse_coordinate(fields[3], fields[4]), mode)
+            return self._add_hdt(float(fields[0]) if fields[0] else None)
+        except (ValueError, IndexError):
+            return self._handle_fallback(sentence)
+
+    def _handle_fallback(self, sentence: bytes) -> GNSSRecord | None:
+        try:
+            msg = pynmea2.parse(sentence.decode('ascii', errors='replace'))
+        except pynmea2.ParseError as e:
+            self.log.info(f'Parse error: {e}')
+            return None
+        time_of_day = None
+        if isinstance(getattr(msg, 'timestamp', None), datetime.time):
+            time_of_day = msg.timestamp.hour * 3600 + msg.timestamp.minute * 60 + \
+                msg.timestamp.second + msg.timestamp.microsecond / 1e6
+        try:
+            # NOTE: pynmea2 returns the raw string if a field cannot be converted, so all values are converted here
+            if msg.sentence_type == 'GGA':
+                return self._add_gga(time_of_day, int(msg.gps_qual or 0), float(msg.altitude or 0), float(msg.geo_sep or 0))
+            if msg.sentence_type == 'GNS':
+                return self._add_gns(time_of_day, msg.latitude, msg.longitude, msg.mode_indicator or '')
+            if msg.sentence_type == 'HDT':
+                return self._add_hdt(float(msg.heading) if msg.heading else None)
+        except (ValueError, TypeError) as e:
+            self.log.info(f'Parse error: {e}')
+        return None
+
+    def _start_epoch(self, time_of_day: float | None) -> GNSSRecord | None:
+        epoch = self._epoch
+        record = None
+        if epoch.time_of_day is not None and time_of_day != epoch.time_of_day:
+            record = self._finish_epoch()
+        epoch.time_of_day = time_of_day
+        return record
+
+    def _add_gga(self, time_of_day: float | None, gps_qual: int, altitude: float, separation: float) -> GNSSRecord | None:
+        if not gps_qual:
+            return self._start_epoch(time_of_day)
+        record = self._start_epoch(time_of_day)
+        epoch = self._epoch
+        epoch.gps_qual = gps_qual
+        epoch.altitude = altitude
+        epoch.separation = separation
+        epoch.types_seen |= GGA
+        return record or self._finish_complete_epoch()
+
+    def _add_gns(self, time_of_day: float | None, lat: float | None, long: float | None, mode: str) -> GNSSRecord | None:
+        if not mode:
+            return self._start_epoch(time_of_day)
+        record = self._start_epoch(time_of_day)
+        epoch = self._epoch
+        epoch.lat = lat
+        epoch.long = long
+        epoch.mode = mode
+        epoch.types_seen |= GNS
+        return record or self._finish_complete_epoch()
+
+    def _add_hdt(self, heading: float | None) -> GNSSRecord | None:
+        if heading is None:
+            return None
+        self._epoch.heading = heading
+        self._epoch.types_seen |= HDT
+        return self._finish_complete_epoch()
+
+    def _finish_complete_epoch(self) -> GNSSRecord | None:
+        return self._finish_epoch() if self._epoch.types_seen == self.TYPES_NEEDED else None
+
+    def _finish_epoch(self) -> GNSSRecord | None:
+        epoch = self._epoch
+        record = None
+        if epoch.types_seen & GNS and epoch.lat is not None and epoch.long is not None:
+            now = self.clock()
+            record = GNSSRecord(timestamp=utc_timestamp(epoch.time_of_day, now) if epoch.time_of_day is not None else now,
+                                location=GeoPoint(lat=epoch.lat, long=epoch.long),
+                                mode=epoch.mode,
+                                gps_qual=epoch.gps_qual,
+                                altitude=epoch.altitude,
+                                separation=epoch.separation,
+                                heading=epoch.heading)
+        else:
+            self.log.warning('No location in GNSS data -- maybe it was provided in GGA message?')
+        epoch.clear()
+        return record
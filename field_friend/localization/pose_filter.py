@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+import rosys
+from rosys.geometry import Pose
+
+from .pose_history import PoseHistory
+
+# chi-square quantiles (99.9 %) for gating innovations with 2 (position) and 3 (position and yaw) degrees of freedom
+GATES = {2: 13.82, 3: 16.27}
+
+
+class PoseFilter:
+    """Extended Kalman filter fusing wheel odometry with GNSS position and heading measurements.
+
+    The state is the robot pose (x, y, yaw) in the local frame of the geo reference.
+    Wheel odometry is the motion model: before each measurement, the state is propagated by the odometry step
+    between the previous and the current measurement time, interpolated from the ``PoseHistory``.
+    Measurements are fused at their own timestamp, so the latency of the receiver does not bias the estimate;
+    the resulting pose is propagated to the present by ``Odometer.handle_detection``.
+    Measurements outside the 99.9 % confidence region are rejected;
+    after ``MAX_REJECTIONS`` consecutive rejections the filter is reinitialized from the measurement.
+    """
+    ODOMETRY_LINEAR_NOISE = 0.05  # m per m driven
+    ODOMETRY_ANGULAR_NOISE = 0.05  # rad per rad turned
+    ODOMETRY_YAW_DRIFT = 0.02  # rad per m driven
+    PROCESS_LINEAR_NOISE = 0.01  # m per s, e.g. slip while standing
+    PROCESS_ANGULAR_NOISE = 0.002  # rad per s
+    INITIAL_YAW_STD_DEV = np.pi  # without heading measurement the yaw is only observable while driving
+    MAX_PREDICTION_TIME = 5.0
+    MAX_REJECTIONS = 10
+
+    def __init__(self, odometer: rosys.driving.Odometer) -> None:
+        self.log = logging.getLogger('field_friend.gnss')
+        self.odometer = odometer
+        self.history = PoseHistory(odometer)
+        self.pose: Pose | None = None
+        self.covariance = np.zeros((3, 3))
+        self.rejections = 0
+
+    @property
+    def is_initialized(self) -> bool:
+        return self.pose is not None
+
+    @property
+    def position_std_dev(self) -> float:
+        return float(np.sqrt(max(self.covariance[0, 0], self.covariance[1, 1])))
+
+    @property
+    def yaw_std_dev(self) -> float:
+        return float(np.sqrt(self.covariance[2, 2]))
+
+    def reset(self) -> None:
+        self.pose = None
+        self.covariance = np.zeros((3, 3))
+        self.rejections = 0
+
+    def update(self, measurement: Pose, position_std_dev: tuple[float, float], yaw_std_dev: float | None) -> Pose | None:
+        """Fuse a measured pose and return the estimated pose at its time (or None if the measurement was rejected).
+
+        The standard deviations are given for x and y in meters and for the yaw in radians.
+        If ``yaw_std_dev`` is None, the yaw of the measurement is ignored.
+        """
+        assert measurement.time is not None
+        if self.pose is None or not 0 <= measurement.time - self.pose.time <= self.MAX_PREDICTION_TIME:
+            self._initialize(measurement, position_std_dev, yaw_std_dev)
+            return self.pose
+        self._predict(measurement.time)
+        assert self.pose is not None
+
+        rows = 3 if yaw_std_dev is not None else 2
+        H = np.eye(3)[:rows]
+        R = np.diag([position_std_dev[0]**2, position_std_dev[1]**2, (yaw_std_dev or 0.0)**2][:rows])
+        innovation = np.array([measurement.x - self.pose.x,
+                               measurement.y - self.pose.y,
+                               rosys.helpers.angle(self.pose.yaw, measurement.yaw)][:rows])
+        S = H @ self.covariance @ H.T + R
+        S_inv = np.linalg.inv(S)
+        if innovation @ S_inv @ innovation > GATES[rows]:
+            self.rejections += 1
+            if self.rejections < self.MAX_REJECTIONS:
+                self.log.debug('rejected GNSS measurement %s (estimate %s)', measurement, self.pose)
+                return None
+            self.log.warning('GNSS measurements do not match the estimated pose anymore, reinitializing')
+            self._initialize(measurement, position_std_dev, yaw_std_dev)
+            return self.pose
+        self.rejections = 0
+        K = self.covariance @ H.T @ S_inv
+        correction = K @ innovation
+        self.pose = Pose(x=float(self.pose.x + correction[0]),
+                         y=float(self.pose.y + correction[1]),
+                         yaw=float(rosys.helpers.eliminate_2pi(self.pose.yaw + correction[2])),
+                         time=self.pose.time)
+        I_KH = np.eye(3) - K @ H
+        self.covariance = I_KH @ self.covariance @ I_KH.T + K @ R @ K.T  # NOTE: Joseph form stays symmetric
+        return self.pose
+
+    def _initialize(self, measurement: Pose, position_std_dev: tuple[float, float], yaw_std_dev: float | None) -> None:
+        yaw = measurement.yaw if yaw_std_dev is not None else self.odometer.get_pose(measurement.time).yaw
+        self.pose = Pose(x=measurement.x, y=measurement.y, yaw=yaw, time=measurement.time)
+        self.covariance = np.diag([position_std_dev[0]**2, position_std_dev[1]**2,
+                                   (yaw_std_dev if yaw_std_dev is not None else self.INITIAL_YAW_STD_DEV)**2])
+        self.rejections = 0
+
+    def _predict(self, time: float) -> None:
+        assert self.pose is not None
+        self.history.sync()
+        start = self.history.get(self.pose.time)
+        end = self.history.get(time)
+        if start is not None and end is not None:
+            dx_world = end.x - start.x
+            dy_world = end.y - start.y
+            dx = np.cos(start.yaw) * dx_world + np.sin(start.yaw) * dy_world
+            dy = -np.sin(start.yaw) * dx_world + np.cos(start.yaw) * dy_world
+            dyaw = rosys.helpers.angle(start.yaw, end.yaw)
+        else:
+            dx = dy = dyaw = 0.0
+        cos_yaw = np.cos(self.pose.yaw)
+        sin_yaw = np.sin(self.pose.yaw)
+        F = np.array([[1.0, 0.0, -sin_yaw * dx - cos_yaw * dy],
+                      [0.0, 1.0, cos_yaw * dx - sin_yaw * dy],
+                      [0.0, 0.0, 1.0]])
+        dt = time - self.pose.time
+        distance = np.hypot(dx, dy)
+        linear_std_dev = self.ODOMETRY_LINEAR_NOISE * distance + self.PROCESS_LINEAR_NOISE * dt
+        angular_std_dev = self.ODOMETRY_ANGULAR_NOISE * abs(dyaw) + self.ODOMETRY_YAW_DRIFT * distance + \
+            self.PROCESS_ANGULAR_NOISE * dt
+        Q = np.diag([linear_std_dev**2, linear_std_dev**2, angular_std_dev**2])
+        self.pose = Pose(x=float(self.pose.x + cos_yaw * dx - sin_yaw * dy),
+                         y=float(self.pose.y + sin_yaw * dx + cos_yaw * dy),
+                         yaw=float(rosys.helpers.eliminate_2pi(self.pose.yaw + dyaw)),
+                         time=time)
+        self.covariance = F @ self.covariance @ F.T + Q
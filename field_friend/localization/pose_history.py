@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+import rosys
+from rosys.geometry import Pose
+
+
+class PoseHistory:
+    """Preallocated ring buffer of local odometry poses for looking up the pose at a given time.
+
+    ``sync`` copies the poses the odometer added since the last call, so it only has to be called before a lookup.
+    Each pose is stored twice, ``capacity`` entries apart, so the valid poses are always a contiguous, time-sorted slice
+    which can be searched with ``np.searchsorted`` instead of scanning the odometer history.
+    """
+    CAPACITY = 1024
+
+    def __init__(self, odometer: rosys.driving.Odometer, capacity: int = CAPACITY) -> None:
+        self.odometer = odometer
+        self.capacity = capacity
+        self._times = np.zeros(2 * capacity)
+        self._poses = np.zeros((2 * capacity, 3))
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_time(self) -> float:
+        return float(self._times[self._start + self._count - 1]) if self._count else -np.inf
+
+    def append(self, pose: Pose) -> None:
+        """Add a pose which is newer than all poses in the buffer, replacing the oldest one if it is full."""
+        if pose.time <= self.last_time:
+            return
+        end = (self._start + self._count) % self.capacity
+        self._times[end] = self._times[end + self.capacity] = pose.time
+        self._poses[end] = self._poses[end + self.capacity] = (pose.x, pose.y, pose.yaw)
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def sync(self) -> None:
+        """Append the poses of the odometer history which are newer than the last pose in the buffer."""
+        last_time = self.last_time
+        history = self.odometer.history
+        first_new = len(history)
+        while first_new > 0 and history[first_new - 1].time > last_time:
+            first_new -= 1
+        for pose in history[first_new:]:
+            self.append(pose)
+
+    def get(self, time: float) -> Pose | None:
+        """Return the interpolated local pose at the given time (clamped to the buffered time range)."""
+        if not self._count:
+            return None
+        times = self._times[self._start:self._start + self._count]
+        poses = self._poses[self._start:self._start + self._count]
+        i = int(np.searchsorted(times, time, side='right'))
+        if i == 0:
+            x, y, yaw = poses[0]
+        elif i == self._count:
+            x, y, yaw = poses[-1]
+        else:
+            f = (time - times[i - 1]) / (times[i] - times[i - 1])
+            x, y = poses[i - 1, :2] + f * (poses[i, :2] - poses[i - 1, :2])
+            yaw = poses[i - 1, 2] + f * rosys.helpers.angle(poses[i - 1, 2], poses[i, 2])
+        return Pose(x=float(x), y=float(y), yaw=float(yaw), time=time)
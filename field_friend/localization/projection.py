@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# WGS84 ellipsoid
+A = 6378137.0
+F = 1 / 298.257223563
+E2 = F * (2 - F)
+
+
+class LocalProjection:
+    """Local azimuthal equidistant projection bound to a fixed geo reference.
+
+    The projection reproduces ``GeoPoint.cartesian``: the distance of a projected point to the origin equals the
+    geodesic distance to the reference and its direction equals the geodesic azimuth.
+    The x-axis points north and the y-axis points west (RoSys convention).
+
+    Internally the points are rotated into a local east-north-up frame via earth-centered coordinates,
+    which is exact, and the horizontal chord is bent back onto the ellipsoid using the radius of curvature
+    in the direction of the point.
+    Compared to ``geographiclib`` (``Geodesic.WGS84.Inverse``) the deviation is below 2 µm
+    within the 5 km radius of ``Gnss.MAX_DISTANCE_TO_REFERENCE`` (checked at latitudes from 0° to 70°).
+    """
+
+    def __init__(self, lat: float, long: float) -> None:
+        self.lat = lat
+        self.long = long
+        phi = math.radians(lat)
+        lam = math.radians(long)
+        sin_phi, cos_phi = math.sin(phi), math.cos(phi)
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        self._rotation = np.array([
+            [-sin_lam, cos_lam, 0.0],
+            [-sin_phi * cos_lam, -sin_phi * sin_lam, cos_phi],
+            [cos_phi * cos_lam, cos_phi * sin_lam, sin_phi],
+        ])
+        self._rotation_rows = tuple(tuple(float(v) for v in row) for row in self._rotation)
+        self._origin = _ecef(np.array([[lat, long]]))[0]
+        self._origin_tuple = tuple(float(v) for v in self._origin)
+        w = 1 - E2 * sin_phi**2
+        self._n = A / math.sqrt(w)  # prime vertical radius of curvature
+        self._m = A * (1 - E2) / w**1.5  # meridional radius of curvature
+
+    def project(self, lat_long: np.ndarray) -> np.ndarray:
+        """Project an Nx2 array of (lat, long) in degrees to an Nx2 array of cartesian (x, y) in meters."""
+        lat_long = np.asarray(lat_long, dtype=np.float64).reshape(-1, 2)
+        enu = (_ecef(lat_long) - self._origin) @ self._rotation.T
+        east, north, up = enu[:, 0], enu[:, 1], enu[:, 2]
+        chord = np.hypot(east, north)
+        radius = self._radius(north, chord)
+        arc = radius * np.arctan2(chord, radius + up)
+        scale = np.divide(arc, chord, out=np.ones_like(arc), where=chord > 0)
+        return np.column_stack((north * scale, -east * scale))
+
+    def project_point(self, lat: float, long: float) -> tuple[float, float]:
+        """Project a single point; faster than ``project`` for scalar input because it avoids array overhead."""
+        phi = math.radians(lat)
+        lam = math.radians(long)
+        sin_phi, cos_phi = math.sin(phi), math.cos(phi)
+        n = A / math.sqrt(1 - E2 * sin_phi**2)
+        ox, oy, oz = self._origin_tuple
+        dx = n * cos_phi * math.cos(lam) - ox
+        dy = n * cos_phi * math.sin(lam) - oy
+        dz = n * (1 - E2) * sin_phi - oz
+        (r00, r01, r02), (r10, r11, r12), (r20, r21, r22) = self._rotation_rows
+        east = r00 * dx + r01 * dy + r02 * dz
+        north = r10 * dx + r11 * dy + r12 * dz
+        up = r20 * dx + r21 * dy + r22 * dz
+        chord = math.hypot(east, north)
+        if chord == 0:
+            return 0.0, 0.0
+        cos2 = (north / chord)**2
+        radius = self._m * self._n / (self._n * cos2 + self._m * (1 - cos2))
+        scale = radius * math.atan2(chord, radius + up) / chord
+        return north * scale, -east * scale
+
+    def unproject(self, xy: np.ndarray) -> np.ndarray:
+        """Map an Nx2 array of cartesian (x, y) in meters back to an Nx2 array of (lat, long) in degrees.
+
+        This is the inverse of ``project``; a round trip deviates less than 2 µm within 5 km of the reference.
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        north, west = xy[:, 0], xy[:, 1]
+        arc = np.hypot(north, west)
+        radius = self._radius(north, arc)
+        angle = arc / radius
+        scale = np.divide(radius * np.sin(angle), arc, out=np.ones_like(arc), where=arc > 0)
+        enu = np.column_stack((-west * scale, north * scale, radius * (np.cos(angle) - 1)))
+        return _geodetic(enu @ self._rotation + self._origin)
+
+    def _radius(self, north: np.ndarray, distance: np.ndarray) -> np.ndarray:
+        """Radius of curvature of the normal section in the direction of each point (Euler's formula)."""
+        cos2 = np.divide(north, distance, out=np.ones_like(north), where=distance > 0)**2
+        return self._m * self._n / (self._n * cos2 + self._m * (1 - cos2))
+
+
+def _ecef(lat_long: np.ndarray) -> np.ndarray:
+    """Convert an Nx2 array of (lat, long) in degrees on the ellipsoid surface to earth-centered coordinates."""
+    phi = np.deg2rad(lat_long[:, 0])
+    lam = np.deg2rad(lat_long[:, 1])
+    sin_phi = np.sin(phi)
+    cos_phi = np.cos(phi)
+    n = A / np.sqrt(1 - E2 * sin_phi**2)
+    return np.column_stack((n * cos_phi * np.cos(lam), n * cos_phi * np.sin(lam), n * (1 - E2) * sin_phi))
+
+
+def _geodetic(ecef: np.ndarray) -> np.ndarray:
+    """Convert an Nx3 array of earth-centered coordinates to (lat, long) in degrees, dropping the height."""
+    x, y, z = ecef[:, 0], ecef[:, 1], ecef[:, 2]
+    p = np.hypot(x, y)
+    phi = np.arctan2(z, p * (1 - E2))
+    for _ in range(3):  # NOTE: converges to sub-micrometer precision near the ellipsoid surface
+        sin_phi = np.sin(phi)
+        n = A / np.sqrt(1 - E2 * sin_phi**2)
+        height = p / np.cos(phi) - n
+        phi = np.arctan2(z, p * (1 - E2 * n / (n + height)))
+    return np.column_stack((np.rad2deg(phi), np.rad2deg(np.arctan2(y, x))))
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import binascii
+import logging
+import math
+import struct
+
+from .geo_point import GeoPoint
+from .gnss import GNSSRecord
+
+SYNC = b'$@'
+HEADER = struct.Struct('<2sHHH')  # sync, crc, id, length
+PVT_GEODETIC = 4007
+POS_COV_GEODETIC = 5906
+ATT_EULER = 5938
+ATT_COV_EULER = 5939
+RECEIVER_TIME = 5914
+BLOCKS = {
+    PVT_GEODETIC: struct.Struct('<IHBBdddfffff'),  # TOW, WNc, mode, error, lat, long, height, undulation, vn, ve, vu, cog
+    POS_COV_GEODETIC: struct.Struct('<IHBBfff'),  # TOW, WNc, mode, error, cov_latlat, cov_lonlon, cov_hgthgt
+    ATT_EULER: struct.Struct('<IHBBHHfff'),  # TOW, WNc, nr_sv, error, mode, reserved, heading, pitch, roll
+    ATT_COV_EULER: struct.Struct('<IHBBfff'),  # TOW, WNc, reserved, error, cov_headhead, cov_pitchpitch, cov_rollroll
+    RECEIVER_TIME: struct.Struct('<IHbbbbbbbB'),  # TOW, WNc, UTC year, month, day, hour, minute, second, delta_ls, sync
+}
+DO_NOT_USE = -2e10
+DO_NOT_USE_DELTA_LS = -128
+GPS_EPOCH = 315964800  # 1980-01-06 in unix time
+GPS_LEAP_SECONDS = 18  # NOTE: difference between GPS time and UTC since 2017, used until the receiver reports it
+MAX_BLOCK_LENGTH = 4096
+
+# PVT mode type -> (NMEA mode indicator, NMEA GGA quality)
+MODES = {
+    0: ('N', 0),
+    1: ('A', 1),
+    2: ('D', 2),
+    3: ('A', 1),
+    4: ('R', 4),
+    5: ('F', 5),
+    6: ('D', 2),
+    7: ('R', 4),
+    8: ('F', 5),
+    10: ('P', 2),
+}
+
+
+def gps_to_unix(tow: int, wnc: int, leap_seconds: int = GPS_LEAP_SECONDS) -> float:
+    """Convert the GPS time of week (in ms) and the week number to a unix timestamp in UTC."""
+    return GPS_EPOCH + wnc * 604800 + tow / 1000 - leap_seconds
+
+
+class SbfDecoder:
+    """Incrementally decodes Septentrio Binary Format (SBF) blocks into GNSS epochs.
+
+    PVTGeodetic (position, velocity and mode) is required; AttEuler (heading) as well as the covariance blocks
+    PosCovGeodetic and AttCovEuler are used if the receiver outputs them.
+    The leap seconds between GPS time and UTC are taken from ReceiverTime blocks (``GPS_LEAP_SECONDS`` until then).
+    An epoch is complete as soon as all block types of the previous epoch have been received for its time of week;
+    otherwise it is emitted when a block of the next epoch arrives.
+    This assumes that the receiver outputs all blocks at the same rate.
+    Bytes which do not belong to a valid block (e.g. interleaved NMEA sentences) are skipped.
+    """
+
+    def __init__(self) -> None:
+        self.log = logging.getLogger('field_friend.gnss')
+        self._buffer = bytearray()
+        self._tow: int | None = None
+        self._finished_tow: int | None = None
+        self._blocks: dict[int, tuple] = {}
+        self._expected: set[int] = {PVT_GEODETIC}
+        self.leap_seconds = GPS_LEAP_SECONDS
+
+    def feed(self, data: bytes) -> list[GNSSRecord]:
+        """Add received bytes and return the records of all epochs completed by them."""
+        self._buffer += data
+        records: list[GNSSRecord] = []
+        start = 0
+        while (start := self._buffer.find(SYNC, start)) >= 0:
+            if len(self._buffer) - start < HEADER.size:
+                break
+            _, crc, block_id, length = HEADER.unpack_from(self._buffer, start)
+            if length % 4 or not HEADER.size < length <= MAX_BLOCK_LENGTH:
+                start += 1
+                continue
+            if len(self._buffer) - start < length:
+                break
+            block = bytes(self._buffer[start:start + length])
+            if binascii.crc_hqx(block[4:], 0) != crc:
+                self.log.info(f'CRC error in SBF block {block_id & 0x1FFF}')
+                start += 1
+                continue
+            self._handle_block(block_id & 0x1FFF, block, records)
+            start += length
+        if start < 0:
+            start = len(self._buffer) - 1 if self._buffer.endswith(b'$') else len(self._buffer)
+        del self._buffer[:start]
+        if len(self._buffer) > 2 * MAX_BLOCK_LENGTH:
+            self._buffer.clear()
+        return records
+
+    def _handle_block(self, block_id: int, block: bytes, records: list[GNSSRecord]) -> None:
+        layout = BLOCKS.get(block_id)
+        if layout is None or len(block) < HEADER.size + layout.size:
+            return
+        values = layout.unpack_from(block, HEADER.size)
+        if block_id == RECEIVER_TIME:  # NOTE: usually sent at a lower rate, so it is not part of the epochs
+            if values[8] != DO_NOT_USE_DELTA_LS:
+                self.leap_seconds = values[8]
+            return
+        tow = values[0]
+        if tow == self._finished_tow:  # the block arrived after its epoch was emitted, so wait for it next time
+            self._expected.add(block_id)
+            return
+        if self._tow is not None and tow != self._tow:
+            self._finish_epoch(records)
+        self._tow = tow
+        self._blocks[block_id] = values
+        if self._blocks.keys() >= self._expected:
+            self._finish_epoch(records)
+
+    def _finish_epoch(self, records: list[GNSSRecord]) -> None:
+        blocks = self._blocks
+        self._blocks = {}
+        self._finished_tow = self._tow
+        self._tow = None
+        if PVT_GEODETIC not in blocks:
+            return
+        self._expected = set(blocks)
+        tow, wnc, mode, error, lat, long, height, undulation, vn, ve, _, _ = blocks[PVT_GEODETIC]
+        if error or DO_NOT_USE in {lat, long}:
+            self.log.debug(f'No PVT solution (error {error})')
+            return
+        mode_indicator, gps_qual = MODES.get(mode & 0x0F, ('N', 0))
+        latitude_std_dev = longitude_std_dev = heading = heading_std_dev = None
+        if POS_COV_GEODETIC in blocks:
+            _, _, _, error, cov_latlat, cov_lonlon, _ = blocks[POS_COV_GEODETIC]
+            if not error and DO_NOT_USE not in {cov_latlat, cov_lonlon}:
+                latitude_std_dev = math.sqrt(cov_latlat)
+                longitude_std_dev = math.sqrt(cov_lonlon)
+        if ATT_EULER in blocks:
+            _, _, _, error, attitude_mode, _, yaw, _, _ = blocks[ATT_EULER]
+            if not error and attitude_mode and yaw != DO_NOT_USE:
+                heading = yaw
+        if ATT_COV_EULER in blocks and heading is not None:
+            _, _, _, error, cov_headhead, _, _ = blocks[ATT_COV_EULER]
+            if not error and cov_headhead != DO_NOT_USE:
+                heading_std_dev = math.sqrt(cov_headhead)
+        record = GNSSRecord(timestamp=gps_to_unix(tow, wnc, self.leap_seconds),
+                            location=GeoPoint(lat=math.degrees(lat), long=math.degrees(long)),
+                            mode=mode_indicator,
+                            gps_qual=gps_qual,
+                            altitude=height - undulation if undulation != DO_NOT_USE else height,
+                            separation=undulation if undulation != DO_NOT_USE else 0.0,
+                            heading=heading,
+                            speed_kmh=math.hypot(vn, ve) * 3.6 if DO_NOT_USE not in {vn, ve} else 0.0,
+                            latitude_std_dev=latitude_std_dev,
+                            longitude_std_dev=longitude_std_dev,
+                            heading_std_dev=heading_std_dev)
+        records.append(record)
@@ -15,6 +15,7 @@ from .automations import (
     BatteryWatcher,
     FieldProvider,
     KpiProvider,
+    MotionStateEstimator,
     PathProvider,
     PlantLocator,
     PlantProvider,
@@ -91,12 +92,13 @@ class System(rosys.persistence.PersistentModule):
         self.gnss: GnssHardware | GnssSimulation
         if self.is_real:
             assert isinstance(self.field_friend, FieldFriendHardware)
-            self.gnss = GnssHardware(self.odometer, self.field_friend.ANTENNA_OFFSET)
+            self.gnss = GnssHardware(self.odometer, self.field_friend.ANTENNA_OFFSET, self.field_friend.GNSS_PROTOCOL)
         else:
             assert isinstance(self.field_friend.wheels, rosys.hardware.WheelsSimulation)
             self.gnss = GnssSimulation(self.odometer, self.field_friend.wheels)
         self.gnss.ROBOT_POSE_LOCATED.register(self.odometer.handle_detection)
         self.driver = rosys.driving.Driver(self.field_friend.wheels, self.odometer)
+        self.motion_state_estimator = MotionStateEstimator(self.field_friend.wheels, self.odometer)
         self.driver.parameters.linear_speed_limit = 0.3
         self.driver.parameters.angular_speed_limit = 0.2
         self.driver.parameters.can_drive_backwards = True
@@ -208,7 +210,7 @@ class System(rosys.persistence.PersistentModule):
             self.current_navigation = navigation
         lat = data.get('reference_lat', 0)
         long = data.get('reference_long', 0)
-        localization.reference = GeoPoint(lat=lat, long=long)
+        localization.reference.update(GeoPoint(lat=lat, long=long))
 
     @property
     def current_implement(self) -> Implement:
@@ -24,10 +24,10 @@ log = logging.getLogger('field_friend.testing')
 @pytest.fixture
 async def system(rosys_integration, request) -> AsyncGenerator[System, None]:
     System.version = getattr(request, 'param', 'rb34')
+    localization.reference.update(ROBOT_GEO_START_POSITION)
     s = System()
     assert isinstance(s.detector, rosys.vision.DetectorSimulation)
     s.detector.detection_delay = 0.1
-    localization.reference = ROBOT_GEO_START_POSITION
     helpers.odometer = s.odometer
     helpers.driver = s.driver
     helpers.automator = s.automator
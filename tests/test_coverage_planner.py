@@ -0,0 +1,104 @@
+import uuid
+
+import numpy as np
+import pytest
+import rosys
+from conftest import FIELD_FIRST_ROW_END, FIELD_FIRST_ROW_START
+from rosys.driving.driver import DriveParameters
+from rosys.geometry import Point, Pose
+
+from field_friend import System
+from field_friend.automations import Field
+from field_friend.automations.navigation.coverage_planner import CoveragePlanner
+
+
+def create_field(system: System, row_count: int, row_spacing: float) -> Field:
+    return system.field_provider.create_field(Field(id=str(uuid.uuid4()), name='Field',
+                                                    first_row_start=FIELD_FIRST_ROW_START,
+                                                    first_row_end=FIELD_FIRST_ROW_END,
+                                                    row_spacing=row_spacing, row_count=row_count))
+
+
+def test_rows_side_by_side_when_turning_on_the_spot(system: System):
+    field = create_field(system, row_count=6, row_spacing=0.45)
+    planner = CoveragePlanner(system.driver.parameters, working_speed=0.3, headland_width=2, row_spacing=0.45)
+    plan = planner.plan(field.rows, field.rows[0].points[0].cartesian())
+    assert plan.rows == field.rows
+    assert plan.working_time == pytest.approx(6 * 10 / 0.3, rel=1e-3)
+    assert plan.turning_time == pytest.approx(5 * float(planner.turn_time(0.45)))
+    assert plan.area == pytest.approx(6 * 10 * 0.45, rel=1e-3)
+    assert plan.throughput == pytest.approx(plan.area / 10_000 / (plan.total_time / 3600))
+
+    plan = planner.plan(field.rows, field.rows[3].points[0].cartesian())
+    assert plan.rows[0] == field.rows[3], 'the plan starts with the row closest to the robot'
+    assert sorted(row.name for row in plan.rows) == sorted(row.name for row in field.rows)
+
+
+def test_skipping_rows_with_large_turning_radius(system: System):
+    field = create_field(system, row_count=12, row_spacing=0.5)
+    parameters = DriveParameters(linear_speed_limit=0.3, angular_speed_limit=0.2,
+                                 minimum_turning_radius=1.0)
+    planner = CoveragePlanner(parameters, working_speed=0.3, headland_width=2, row_spacing=0.5)
+    assert planner.turn_time(0.5) > planner.turn_time(2.0), 'adjacent rows need a switch-back'
+
+    plan = planner.plan(field.rows)
+    assert plan.rows[0] == field.rows[0]
+    assert sorted(row.name for row in plan.rows) == sorted(row.name for row in field.rows)
+    sequential_time = 11 * float(planner.turn_time(0.5))
+    assert plan.turning_time < 0.75 * sequential_time
+    offsets = [field.rows.index(row) * 0.5 for row in plan.rows]
+    assert np.all(np.abs(np.diff(offsets)) >= 2 * parameters.minimum_turning_radius), 'no turn is narrower than 2 r'
+
+
+@pytest.mark.parametrize('distance', [0.5, 1.5, 2.5, 5.0])
+def test_transition_path(distance: float):
+    parameters = DriveParameters(linear_speed_limit=0.3, angular_speed_limit=0.2,
+                                 minimum_turning_radius=1.0)
+    planner = CoveragePlanner(parameters, working_speed=0.3, headland_width=2, row_spacing=0.5)
+    row_end = Pose(x=3, y=2, yaw=0.5)
+    target = row_end.transform(Point(x=0, y=-distance))
+    next_row_start = Pose(x=target.x, y=target.y, yaw=row_end.yaw + np.pi)
+    path = planner.transition_path(row_end, next_row_start)
+
+    pose = row_end
+    for segment in path:
+        spline = segment.spline
+        assert spline.start.distance(pose.point) == pytest.approx(0, abs=1e-6), 'the path is continuous'
+        yaw = spline.yaw(0) + (np.pi if segment.backward else 0)
+        assert rosys.helpers.angle(yaw, pose.yaw) == pytest.approx(0, abs=1e-3), 'the path is smooth'
+        t = np.linspace(0, 1, 50)
+        assert np.abs(spline.curvature(t)).max() <= 1.01 / parameters.minimum_turning_radius
+        assert all(row_end.relative_point(spline.pose(t_).point).x <= 2 + 1e-6 for t_ in t), 'stays in the headland'
+        end = spline.pose(1)
+        pose = Pose(x=end.x, y=end.y, yaw=end.yaw + (np.pi if segment.backward else 0))
+    assert pose.point.distance(next_row_start.point) == pytest.approx(0, abs=1e-6)
+    assert rosys.helpers.angle(pose.yaw, next_row_start.yaw) == pytest.approx(0, abs=1e-3)
+    assert any(segment.backward for segment in path) == (distance < 2 * parameters.minimum_turning_radius)
+
+
+@pytest.mark.parametrize('row_start', [
+    Pose(x=4, y=1, yaw=0.3),  # ahead
+    Pose(x=-3, y=0.5, yaw=0),  # behind
+    Pose(x=1, y=-0.3, yaw=-np.pi / 2),  # perpendicular
+    Pose(x=0.5, y=0, yaw=np.pi),  # on the same line in opposite direction
+])
+def test_transition_path_for_approaching_a_row(row_start: Pose):
+    parameters = DriveParameters(linear_speed_limit=0.3, angular_speed_limit=0.2,
+                                 minimum_turning_radius=1.0)
+    planner = CoveragePlanner(parameters, working_speed=0.3, headland_width=2, row_spacing=0.5)
+    robot = Pose(x=3, y=2, yaw=0.5)
+    target = robot.transform_pose(row_start)
+    path = planner.transition_path(robot, target)
+
+    pose = robot
+    for segment in path:
+        spline = segment.spline
+        assert spline.start.distance(pose.point) == pytest.approx(0, abs=1e-6), 'the path is continuous'
+        yaw = spline.yaw(0) + (np.pi if segment.backward else 0)
+        assert rosys.helpers.angle(yaw, pose.yaw) == pytest.approx(0, abs=1e-3), 'the path is smooth'
+        t = np.linspace(0, 1, 50)
+        assert np.abs(spline.curvature(t)).max() <= 1.01 / parameters.minimum_turning_radius
+        end = spline.pose(1)
+        pose = Pose(x=end.x, y=end.y, yaw=end.yaw + (np.pi if segment.backward else 0))
+    assert pose.point.distance(target.point) == pytest.approx(0, abs=1e-6)
+    assert rosys.helpers.angle(pose.yaw, target.yaw) == pytest.approx(0, abs=1e-3)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+import rosys
+from rosys.geometry import Pose
+
+from field_friend.automations import Plant, PlantProvider
+from field_friend.automations.navigation.crop_row_tracker import CropRowTracker
+
+
+def create_crop(x: float, y: float) -> Plant:
+    plant = Plant(type='maize', detection_time=rosys.time())
+    plant.positions.append(rosys.geometry.Point3d(x=x, y=y, z=0))
+    plant.confidences.append(0.9)
+    return plant
+
+
+def test_row_in_any_direction():
+    plants = PlantProvider()
+    tracker = CropRowTracker(plants)
+    for i in range(-4, 5):
+        plants.add_crop(create_crop(0.1, i / 10))
+    robot = Pose(x=0, y=0, yaw=-np.pi / 2)
+    estimate = tracker.update(robot)
+    assert estimate is not None, 'a row running north-south has no finite slope'
+    assert estimate.pose.yaw == pytest.approx(-np.pi / 2), 'the row points in driving direction'
+    assert estimate.pose.x == pytest.approx(0.1)
+    assert estimate.lateral_offset == pytest.approx(0.1), 'the row is on the left of the robot'
+    assert estimate.heading_error == pytest.approx(0)
+    assert estimate.inliers == 9
+    assert estimate.rms == pytest.approx(0, abs=1e-6)
+    assert estimate.confidence == pytest.approx(1.0)
+
+
+def test_rejecting_outliers():
+    plants = PlantProvider()
+    tracker = CropRowTracker(plants)
+    plants.add_crop(create_crop(0.2, 0.2))  # NOTE: the outlier comes first so the line has to be found by RANSAC
+    for i in range(5):
+        plants.add_crop(create_crop(i / 10, 0))
+    estimate = tracker.update(Pose())
+    assert estimate is not None
+    assert estimate.inliers == 5
+    assert estimate.outliers == 1
+    assert estimate.pose.y == pytest.approx(0)
+    assert estimate.pose.yaw == pytest.approx(0)
+    assert estimate.confidence == pytest.approx(5 / 6)
+
+    plants.add_crop(create_crop(0.5, -0.2))
+    estimate = tracker.update(Pose())
+    assert estimate is not None
+    assert estimate.outliers == 2, 'a new crop far from the row is rejected'
+    assert estimate.pose.y == pytest.approx(0)
+
+
+def test_incremental_window():
+    plants = PlantProvider()
+    tracker = CropRowTracker(plants)
+    for i in range(5):
+        plants.add_crop(create_crop(i / 10, 0.01 * i))
+    assert tracker.update(Pose()) is not None
+    assert tracker.update(Pose(x=1.35)) is None, 'crops behind the window are dropped'
+    plants.add_crop(create_crop(1.5, 0.15))
+    plants.add_crop(create_crop(1.6, 0.16))
+    estimate = tracker.update(Pose(x=1.35))
+    assert estimate is not None
+    assert estimate.inliers == 3
+    assert estimate.pose.yaw == pytest.approx(np.arctan(0.1))
+    plants.remove_crop(plants.crops[-1])
+    assert tracker.update(Pose(x=1.35)) is None, 'removed crops are dropped'
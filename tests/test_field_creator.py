@@ -1,3 +1,5 @@
+from dataclasses import replace
+
 import pytest
 from conftest import FIELD_FIRST_ROW_END, FIELD_FIRST_ROW_START
 from rosys.geometry import Point
@@ -33,7 +35,8 @@ def test_support_point_dialog(system: System, field: Field):
     row_index = 2
     dialog.row_name = row_index+1
     test_location = FIELD_FIRST_ROW_START.shifted(point=Point(x=0, y=-1.5))
-    system.gnss.current.location = test_location
+    assert system.gnss.current is not None
+    system.gnss.current = replace(system.gnss.current, location=test_location)
     dialog.next()
     dialog.next()
     assert system.field_provider.fields[0].row_support_points[0].cartesian(
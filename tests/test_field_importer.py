@@ -0,0 +1,109 @@
+import io
+
+import numpy as np
+import pytest
+from conftest import FIELD_FIRST_ROW_START
+from rosys.geometry import Point
+
+from field_friend import System
+from field_friend.automations.field_importer import FieldImporter
+
+
+def iso_points(points: list[tuple[float, float]]) -> str:
+    geo_points = [FIELD_FIRST_ROW_START.shifted(Point(x=x, y=y)) for x, y in points]
+    return ''.join(f'<PNT A="2" C="{p.lat}" D="{p.long}"/>' for p in geo_points)
+
+
+def kml_coordinates(points: list[tuple[float, float]]) -> str:
+    geo_points = [FIELD_FIRST_ROW_START.shifted(Point(x=x, y=y)) for x, y in points]
+    return ' '.join(f'{p.long},{p.lat},0' for p in geo_points)
+
+
+BOUNDARY = [(0, 0), (40, 0), (40, -10), (0, -10), (0, 0)]
+
+
+def row_coordinates(field) -> np.ndarray:
+    return np.array([row.cartesian_array() for row in field.rows]) - FIELD_FIRST_ROW_START.cartesian().tuple
+
+
+def test_importing_iso_xml(system: System):
+    taskdata = f'''<?xml version="1.0" encoding="UTF-8"?>
+<ISO11783_TaskData VersionMajor="4" VersionMinor="0">
+    <PFD A="PFD1" C="North">
+        <PLN A="1"><LSG A="1">{iso_points(BOUNDARY)}</LSG></PLN>
+        <GGP A="GGP1"><GPN A="GPN1" B="AB"><LSG A="5">{iso_points([(5, -0.25), (30, -0.25)])}</LSG></GPN></GGP>
+    </PFD>
+    <PFD A="PFD2" C="South">
+        <PLN A="1"><LSG A="1">{iso_points([(-20, 0), (-20, -30), (-30, -30), (-30, 0), (-20, 0)])}</LSG></PLN>
+    </PFD>
+</ISO11783_TaskData>'''
+    importer = FieldImporter(system.field_provider, row_spacing=0.5, outline_buffer_width=2)
+    fields = importer.create_fields(importer.read(io.BytesIO(taskdata.encode()), 'TASKDATA.XML'))
+    assert importer.progress == 1.0
+    assert [field.name for field in fields] == ['North', 'South']
+
+    north = row_coordinates(fields[0])
+    assert len(north) == 20, 'the rows follow the guidance line and fill the boundary'
+    assert north[0] == pytest.approx(np.array([[2, -0.25], [38, -0.25]]), abs=0.01)
+    assert north[-1] == pytest.approx(np.array([[2, -9.75], [38, -9.75]]), abs=0.01)
+
+    south = row_coordinates(fields[1])
+    assert len(south) == 20, 'without guidance line the rows run along the long side of the boundary'
+    assert np.abs(south[:, 1, 1] - south[:, 0, 1]) == pytest.approx(26, abs=0.01)
+
+    system.field_provider.add_fields(fields)
+    assert system.field_provider.fields == fields
+
+
+def test_importing_iso_xml_with_several_polygons(system: System):
+    taskdata = f'''<?xml version="1.0" encoding="UTF-8"?>
+<ISO11783_TaskData VersionMajor="4" VersionMinor="0">
+    <PFD A="PFD1" C="Twin">
+        <PLN A="1"><LSG A="1">{iso_points(BOUNDARY)}</LSG></PLN>
+        <PLN A="1"><LSG A="1">{iso_points([(0, -20), (40, -20), (40, -30), (0, -30), (0, -20)])}</LSG></PLN>
+        <GGP A="GGP1"><GPN A="GPN1" B="AB"><LSG A="5">{iso_points([(5, -20.25), (30, -20.25)])}</LSG></GPN></GGP>
+    </PFD>
+</ISO11783_TaskData>'''
+    importer = FieldImporter(system.field_provider, row_spacing=0.5, outline_buffer_width=2)
+    fields = importer.create_fields(importer.read(io.BytesIO(taskdata.encode()), 'TASKDATA.XML'))
+    assert [field.name for field in fields] == ['Twin 2', 'Twin 1'], 'every polygon becomes a field of its own'
+    assert len(fields[0].rows) == 20
+    assert row_coordinates(fields[0])[0] == pytest.approx(np.array([[2, -20.25], [38, -20.25]]), abs=0.01)
+    assert len(fields[1].rows) == 20
+    assert np.all(row_coordinates(fields[1])[:, :, 1] > -10), 'the second field stays inside its own polygon'
+
+
+def test_importing_kml(system: System):
+    kml = f'''<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2"><Document><Folder>
+    <Placemark><name>Field</name><Polygon><outerBoundaryIs><LinearRing>
+        <coordinates>{kml_coordinates(BOUNDARY)}</coordinates>
+    </LinearRing></outerBoundaryIs></Polygon></Placemark>
+    <Placemark><name>AB</name><LineString><coordinates>{kml_coordinates([(5, -1), (30, -1)])}</coordinates></LineString></Placemark>
+    <Placemark><name>Track</name><LineString><coordinates>{kml_coordinates([(100, 0), (120, 0)])}</coordinates></LineString></Placemark>
+</Folder></Document></kml>'''
+    importer = FieldImporter(system.field_provider, row_spacing=0.5, outline_buffer_width=2)
+    fields = importer.create_fields(importer.read(io.BytesIO(kml.encode()), 'fields.kml'))
+    assert [field.name for field in fields] == ['Field AB', 'Track']
+    assert len(fields[0].rows) == 21
+    assert row_coordinates(fields[0])[0] == pytest.approx(np.array([[2, 0], [38, 0]]), abs=0.01)
+    assert len(fields[1].rows) == 1, 'a guidance line without boundary becomes a single row'
+    assert row_coordinates(fields[1])[0] == pytest.approx(np.array([[100, 0], [120, 0]]), abs=0.01)
+
+
+async def test_import_file(system: System):
+    kml = f'''<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2"><Document>
+    <Placemark><name>Track</name><LineString><coordinates>{kml_coordinates([(100, 0), (120, 0)])}</coordinates></LineString></Placemark>
+</Document></kml>'''
+    importer = FieldImporter(system.field_provider)
+    fields = await importer.import_file(io.BytesIO(kml.encode()), 'fields.kml')
+    assert [field.name for field in fields] == ['Track']
+    assert system.field_provider.fields == fields
+    assert importer.progress == 1.0
+
+
+def test_unsupported_file(system: System):
+    importer = FieldImporter(system.field_provider)
+    with pytest.raises(ValueError):
+        list(importer.read(io.BytesIO(b''), 'field.txt'))
@@ -5,9 +5,10 @@ from pathlib import Path
 import pytest
 from conftest import FIELD_FIRST_ROW_END, FIELD_FIRST_ROW_START
 from rosys.geometry import Point
+from shapely.geometry import Polygon
 
-from field_friend import System
-from field_friend.automations import Field, RowSupportPoint
+from field_friend import System, localization
+from field_friend.automations import Field, FieldProvider, RowSupportPoint
 from field_friend.localization import GeoPoint
 
 
@@ -48,6 +49,21 @@ def test_field_outline(system: System, field: Field):
     assert_in_outline(field.first_row_end.shifted(Point(x=buffer, y=-buffer - row_offset)))
 
 
+def test_field_geometry_is_cached(system: System, field: Field):
+    field = system.field_provider.fields[0]
+    polygon = field.shapely_polygon()
+    outline = field.outline_cartesian_array()
+    assert field.shapely_polygon() is polygon
+    assert field.outline_cartesian_array() is outline
+    assert field.area() == pytest.approx(Polygon(outline).area)
+    assert field.bounds == pytest.approx((*outline.min(axis=0), *outline.max(axis=0)))
+    assert field.bed_extents().shape == (field.bed_count, 4)
+    localization.reference.update(FIELD_FIRST_ROW_START)
+    assert field.outline_cartesian_array() is not outline, 'the reference has changed'
+    assert field.outline_cartesian_array()[:, 0].min() == pytest.approx(-field.outline_buffer_width, abs=1e-6)
+    assert field.area() == pytest.approx(Polygon(outline).area, rel=1e-6)
+
+
 def test_field_rows(system: System, field: Field):
     field = system.field_provider.fields[0]
     for i, row in enumerate(field.rows):
@@ -121,6 +137,24 @@ def test_add_multiple_row_support_points(system: System, field: Field):
     assert actual_distance_end_point == pytest.approx(expected_distance, abs=1e-8)
 
 
+def test_only_affected_rows_are_regenerated(system: System, field: Field):
+    field_provider = system.field_provider
+    field = field_provider.fields[0]
+    rows = list(field.rows)
+    outline = field.outline
+    field_provider.update_field_parameters(field_id=field.id, name='Renamed', row_count=field.row_count,
+                                           row_spacing=field.row_spacing, outline_buffer_width=field.outline_buffer_width,
+                                           bed_count=field.bed_count, bed_spacing=field.bed_spacing)
+    assert all(new is old for new, old in zip(field.rows, rows, strict=True)), 'renaming must not regenerate rows'
+    assert field.outline is outline
+    point = FIELD_FIRST_ROW_START.shifted(Point(x=0, y=-2))
+    field_provider.add_row_support_point(field.id, RowSupportPoint.from_geopoint(point, 2))
+    assert field.rows[0] is rows[0]
+    assert field.rows[1] is rows[1]
+    assert all(new is not old for new, old in zip(field.rows[2:], rows[2:], strict=True))
+    assert not field.refresh(), 'nothing changed since the last refresh'
+
+
 def test_update_existing_row_support_point(system: System, field: Field):
     field_provider = system.field_provider
     field_id = field.id
@@ -249,3 +283,58 @@ def test_create_field_with_multiple_beds(system: System, field: Field):
         assert created_field.rows[row_index].points[0].long == pytest.approx(expected_start.long, abs=1e-8)
         assert created_field.rows[row_index].points[1].lat == pytest.approx(expected_end.lat, abs=1e-8)
         assert created_field.rows[row_index].points[1].long == pytest.approx(expected_end.long, abs=1e-8)
+
+
+def test_rows_of_selected_beds(system: System):
+    field_provider = system.field_provider
+    field = field_provider.create_field(Field(id=str(uuid.uuid4()), name='Multi-bed Field',
+                                              first_row_start=FIELD_FIRST_ROW_START, first_row_end=FIELD_FIRST_ROW_END,
+                                              row_count=3, bed_count=4))
+    assert field_provider.get_field(field.id) is field
+    assert field.bed_slices == [slice(0, 3), slice(3, 6), slice(6, 9), slice(9, 12)]
+    field_provider._only_specific_beds = True  # pylint: disable=protected-access
+    field_provider.selected_beds = [4, 2]
+    assert field_provider.get_rows_to_work_on() == field.rows[3:6] + field.rows[9:12]
+
+
+def test_row_index(system: System):
+    localization.reference.update(FIELD_FIRST_ROW_START)
+    field = system.field_provider.create_field(Field(id=str(uuid.uuid4()), name='Multi-bed Field',
+                                                     first_row_start=FIELD_FIRST_ROW_START,
+                                                     first_row_end=FIELD_FIRST_ROW_END,
+                                                     row_count=3, row_spacing=0.5, bed_count=2, bed_spacing=1.0))
+    # rows are at y = 0, -0.5, -1.0 (first bed) and y = -2.0, -2.5, -3.0 (second bed)
+    assert field.nearest_row(Point(x=5, y=-0.6)) is field.rows[1]
+    assert field.nearest_row(Point(x=12, y=-2.9)) is field.rows[5]
+    assert field.rows_within(Point(x=5, y=-0.6), 0.5) == field.rows[1:3]
+    assert field.bed_at(Point(x=5, y=-0.6)) == 0
+    assert field.bed_at(Point(x=5, y=-1.6)) is None
+    assert field.bed_at(Point(x=5, y=-2.3)) == 1
+
+
+def test_restoring_stored_geometry(system: System, field: Field, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    original = system.field_provider.fields[0]
+    system.field_provider.geometry_path = tmp_path / 'field_geometry.npz'
+    backup = json.dumps(system.field_provider.backup())
+    assert system.field_provider.geometry_path.exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError('geometry should not be regenerated')
+    with monkeypatch.context() as m:
+        m.setattr(Field, '_generate_rows', fail)
+        m.setattr(Field, '_generate_outline', fail)
+        provider = FieldProvider()
+        provider.geometry_path = system.field_provider.geometry_path
+        provider.restore(json.loads(backup))
+    restored = provider.fields[0]
+    assert restored.rows == original.rows
+    assert restored.outline == original.outline
+    assert restored.bed_slices == original.bed_slices
+
+    data = json.loads(backup)
+    data['fields'][field.id]['row_spacing'] = 0.6
+    provider = FieldProvider()
+    provider.geometry_path = system.field_provider.geometry_path
+    provider.restore(data)
+    rows = provider.fields[0].rows
+    assert rows[1].line_segment().point1.distance(rows[0].line_segment().point1) == pytest.approx(0.6, abs=1e-6)
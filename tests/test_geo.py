@@ -1,7 +1,11 @@
+import numpy as np
 import pytest
+from geographiclib.geodesic import Geodesic
 from rosys.geometry import Point
 
-from field_friend.localization import GeoPoint
+from field_friend import localization
+from field_friend.localization import GeoPoint, GeoPointCollection, Gnss, LocalProjection
+from field_friend.localization.geo_point import cartesian_array
 
 
 def test_shifting():
@@ -14,3 +18,53 @@ def test_shifting():
     assert x10.distance(x10y10) == pytest.approx(10)
     assert y10.distance(x10y10) == pytest.approx(10)
     assert x10y10.distance(origin) == pytest.approx(10 * 2 ** 0.5)
+
+
+def test_projection_matches_geodesic_within_reference_radius():
+    rng = np.random.default_rng(42)
+    for lat, long in [(0.0, 0.0), (51.98317071260942, 7.43411239981148), (70.0, -20.0)]:
+        projection = LocalProjection(lat, long)
+        expected = []
+        lat_long = []
+        for _ in range(200):
+            azimuth = rng.uniform(-180, 180)
+            distance = rng.uniform(0, Gnss.MAX_DISTANCE_TO_REFERENCE)
+            result = Geodesic.WGS84.Direct(lat, long, azimuth, distance)
+            lat_long.append((result['lat2'], result['lon2']))
+            expected.append((distance * np.cos(np.deg2rad(-azimuth)), distance * np.sin(np.deg2rad(-azimuth))))
+        cartesian = projection.project(np.array(lat_long))
+        assert np.abs(cartesian - np.array(expected)).max() < 1e-5
+        for (x, y), (point_lat, point_long) in zip(cartesian, lat_long, strict=True):
+            assert projection.project_point(point_lat, point_long) == pytest.approx((x, y), abs=1e-6)
+
+
+def test_shifting_many():
+    origin = GeoPoint(lat=51.98317071260942, long=7.43411239981148)
+    shifts = np.array([[10, 0], [0, 10], [10, 10], [-250.5, 1200.0]])
+    for point, shift in zip(origin.shifted_many(shifts), shifts, strict=True):
+        expected = origin.shifted(Point(x=shift[0], y=shift[1]))
+        assert point.distance(expected) == pytest.approx(0, abs=1e-4)
+
+
+def test_cartesian_round_trip():
+    localization.reference.update(GeoPoint(lat=51.98317071260942, long=7.43411239981148))
+    points = np.array([[0, 0], [3.5, -2.25], [-4000, 2500]])
+    geo_points = GeoPoint.from_cartesian_array(points)
+    assert np.abs(cartesian_array(geo_points) - points).max() < 1e-5
+    assert geo_points[0].distance(localization.reference) == pytest.approx(0, abs=1e-6)
+
+
+def test_collection_caches_cartesian_until_reference_changes():
+    localization.reference.update(GeoPoint(lat=51.98317071260942, long=7.43411239981148))
+    points = [localization.reference.shifted(Point(x=x, y=0.5 * x)) for x in range(5)]
+    collection = GeoPointCollection(id='c', name='c', points=points)
+    cartesian = collection.cartesian_array()
+    assert collection.cartesian_array() is cartesian
+    assert np.abs(cartesian - cartesian_array(points)).max() < 1e-6
+    assert collection.points_as_tuples == [p.tuple for p in points]
+    with pytest.raises(ValueError):
+        collection.lat_long[0, 0] = 0
+
+    localization.reference.update(points[-1])
+    assert collection.cartesian_array() is not cartesian
+    assert np.abs(collection.cartesian_array()[-1]).max() < 1e-9
@@ -1,16 +1,14 @@
+from types import SimpleNamespace
 
-
-from copy import deepcopy
-
+import numpy as np
 import pytest
 import rosys
 from conftest import ROBOT_GEO_START_POSITION
 from rosys.testing import assert_point, forward
 
 from field_friend import localization
-from field_friend.automations.implements import Recorder
-from field_friend.automations.navigation import StraightLineNavigation
 from field_friend.localization import GeoPoint, GnssSimulation
+from field_friend.localization.pose_history import PoseHistory
 from field_friend.system import System
 
 
@@ -22,7 +20,7 @@ def test_distance_calculation():
 
 def test_shifted_calculation():
     point = GeoPoint(lat=51.983159, long=7.434212)
-    localization.reference = deepcopy(point)
+    localization.reference.update(point)
     shifted = point.shifted(rosys.geometry.Point(x=6, y=6))
     # coordinates should be x pointing north, y pointing west (verified with https://www.meridianoutpost.com/resources/etools/calculators/calculator-latitude-longitude-distance.php?)
     assert shifted.lat == pytest.approx(51.983212924295)
@@ -30,6 +28,20 @@ def test_shifted_calculation():
     assert_point(shifted.cartesian(), rosys.geometry.Point(x=6, y=6))
 
 
+def test_pose_history_interpolates_odometry():
+    odometer = SimpleNamespace(history=[rosys.geometry.Pose(x=i * 0.1, yaw=np.pi - 0.05 + i * 0.02, time=i * 0.02)
+                                        for i in range(10)])
+    history = PoseHistory(odometer, capacity=4)  # type: ignore
+    history.sync()
+    assert len(history) == 4
+    assert history.get(0.13).x == pytest.approx(0.65)
+    assert history.get(0.13).yaw == pytest.approx(np.pi - 0.05 + 0.13)
+    assert history.get(0.0).x == pytest.approx(0.6), 'older poses have been replaced'
+    odometer.history.append(rosys.geometry.Pose(x=1.0, time=0.2))
+    history.sync()
+    assert history.get(1.0).x == pytest.approx(1.0)
+
+
 async def test_driving(gnss_driving: System):
     assert gnss_driving.odometer.prediction.point.x == 0
     assert gnss_driving.odometer.prediction.point.y == 0
@@ -39,6 +51,21 @@ async def test_driving(gnss_driving: System):
     assert_point(gnss_driving.odometer.prediction.point, rosys.geometry.Point(x=2.0, y=0))
 
 
+async def test_reference_update_keeps_robot_location(gnss_driving: System):
+    await forward(x=2.0)
+    location = localization.reference.shifted(gnss_driving.odometer.prediction.point)
+    version = localization.reference.version
+    localization.reference.update(ROBOT_GEO_START_POSITION.shifted(rosys.geometry.Point(x=100, y=-50)))
+    assert localization.reference.version == version + 1
+    assert_point(gnss_driving.odometer.prediction.point, location.cartesian())
+    await forward(2)
+    assert localization.reference.shifted(gnss_driving.odometer.prediction.point).distance(location) > 0.3
+    record = gnss_driving.gnss.current
+    assert record is not None
+    odometry = localization.reference.shifted(gnss_driving.odometer.get_pose(record.timestamp).point)
+    assert record.location.distance(odometry) < 0.01, 'GNSS and odometry agree in the new frame'
+
+
 async def test_connection_lost(gnss_driving: System, gnss: GnssSimulation):
     await forward(x=2.0)
     gnss.mode = 'NNNN'
@@ -90,16 +117,29 @@ async def test_record_is_none(gnss_driving: System, gnss: GnssSimulation):
     assert_point(gnss_driving.odometer.prediction.point, rosys.geometry.Point(x=2, y=0))
 
 
-async def test_only_update_when_standing(gnss_driving: System, gnss: GnssSimulation):
+async def test_update_while_driving(gnss_driving: System, gnss: GnssSimulation):
     # pylint: disable=protected-access
-    assert isinstance(gnss_driving.current_navigation, StraightLineNavigation)
-    gnss_driving.current_navigation.length = 10.0
-    assert isinstance(gnss_driving.current_navigation.implement, Recorder)
-    assert gnss._last_gnss_pose.x == pytest.approx(gnss._last_odometer_pose.x)
-    gnss_driving.automator.start()
-    await forward(until=lambda: gnss_driving.automator.is_running)
-    await forward(x=5.0)
-    assert gnss._last_gnss_pose.x != pytest.approx(gnss._last_odometer_pose.x)
-    await forward(until=lambda: gnss_driving.automator.is_stopped)
+    await forward(x=1.0)
+    poses: list[rosys.geometry.Pose] = []
+    gnss.ROBOT_POSE_LOCATED.register(poses.append)
+    await forward(1.0)
+    assert len(poses) >= 9, 'every RTK record should be fused while driving'
+    assert gnss._last_gnss_pose.distance(gnss_driving.odometer.prediction) < 0.05
+    assert gnss.pose_filter.position_std_dev < 0.02
+
+
+async def test_filter_corrects_odometry_drift(gnss_driving: System, gnss: GnssSimulation):
+    await forward(x=1.0)
+    drifted = rosys.geometry.Pose(x=gnss_driving.odometer.prediction.x, y=gnss_driving.odometer.prediction.y + 0.03,
+                                  yaw=gnss_driving.odometer.prediction.yaw + np.deg2rad(2), time=rosys.time())
+    gnss_driving.odometer.handle_detection(drifted)
     await forward(2.0)
-    assert gnss._last_gnss_pose.x == pytest.approx(gnss._last_odometer_pose.x)
+    assert gnss.wheels.pose.distance(gnss_driving.odometer.prediction) < 0.01
+    assert gnss_driving.odometer.prediction.yaw == pytest.approx(gnss.wheels.pose.yaw, abs=np.deg2rad(0.5))
+
+
+async def test_position_is_only_emitted_for_new_records(system: System, gnss: GnssSimulation):
+    positions: list[GeoPoint] = []
+    gnss.ROBOT_GNSS_POSITION_CHANGED.register(positions.append)
+    await forward(1.0)
+    assert 9 <= len(positions) <= 11, 'the simulation creates a record every 100 ms'
@@ -0,0 +1,70 @@
+import os
+import pty
+import tty
+
+import serial
+
+from field_friend.localization.gnss import GNSSRecord
+from field_friend.localization.gnss_reader import GnssReader
+from field_friend.localization.nmea import NmeaDecoder
+
+EPOCH = (b'$GPGGA,101514.00,5158.98954,N,00726.05272,E,4,24,0.6,52.123,M,47.251,M,1.0,0000*75\r\n'
+         b'$GNGNS,101514.00,5158.98954,N,00726.05272,E,RRRR,24,0.6,52.123,47.251,1.0,0000,V*3E\r\n'
+         b'$GPHDT,123.45,T*04\r\n')
+
+
+class FailingDecoder(NmeaDecoder):
+    def __init__(self) -> None:
+        super().__init__()
+        self.failures = 1
+
+    def feed(self, data: bytes) -> list[GNSSRecord]:
+        if self.failures:
+            self.failures -= 1
+            raise ValueError('broken data')
+        return super().feed(data)
+
+
+async def test_reader_delivers_epochs_from_serial_port():
+    controller, device = pty.openpty()
+    tty.setraw(device)
+    ser = serial.Serial(os.ttyname(device), timeout=0.05)
+    reader = GnssReader(ser, NmeaDecoder())
+    reader.start()
+    try:
+        assert await reader.next_record(timeout=0.1) is None
+        os.write(controller, EPOCH[:100])
+        os.write(controller, EPOCH[100:])
+        record = await reader.next_record(timeout=1.0)
+        assert record is not None
+        assert record.heading == 123.45
+        assert reader.latency['handoff'].count == 1
+    finally:
+        reader.stop()
+        ser.close()
+        os.close(controller)
+        os.close(device)
+
+
+async def test_reader_survives_decoder_errors():
+    controller, device = pty.openpty()
+    tty.setraw(device)
+    ser = serial.Serial(os.ttyname(device), timeout=0.05)
+    decoder = FailingDecoder()
+    reader = GnssReader(ser, decoder)
+    reader.start()
+    try:
+        os.write(controller, b'garbage\r\n')
+        assert await reader.next_record(timeout=0.3) is None
+        assert decoder.failures == 0
+        assert reader.is_running
+        assert reader.error is None
+        os.write(controller, EPOCH)
+        record = await reader.next_record(timeout=1.0)
+        assert record is not None, 'the reader keeps decoding after an error'
+        assert record.heading == 123.45
+    finally:
+        reader.stop()
+        ser.close()
+        os.close(controller)
+        os.close(device)
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+from rosys.testing import forward
+
+from field_friend.localization import GnssReplay
+from field_friend.localization.gnss_recorder import GnssRecorder, read_recording
+from field_friend.localization.nmea import checksum
+from field_friend.system import System
+
+RECORDING_START = 1731406638.0  # 2024-11-12 10:17:18 UTC
+
+
+def nmea_epoch(index: int) -> bytes:
+    seconds = 18 + index / 10
+    time_of_day = f'1017{int(seconds):02d}.{round(seconds % 1 * 100):02d}'
+    sentences = (f'GPGGA,{time_of_day},5158.98954,N,00726.05272,E,4,24,0.6,52.123,M,47.251,M,1.0,0000',
+                 f'GNGNS,{time_of_day},5158.98954,N,00726.{5272 + index:05d},E,RRRR,24,0.6,52.123,47.251,1.0,0000,V',
+                 'GPHDT,123.45,T')
+    return b''.join(b'$%s*%02X\r\n' % (s.encode(), checksum(s.encode())) for s in sentences)
+
+
+def record(path: Path, epochs: int) -> None:
+    recorder = GnssRecorder('nmea', path=path, max_file_duration=1.0)
+    for i in range(epochs):
+        data = nmea_epoch(i)
+        recorder.write(data[:50], RECORDING_START + i / 10 + 0.02)
+        recorder.write(data[50:], RECORDING_START + i / 10 + 0.05)
+    recorder.close()
+
+
+def test_recorder_rolls_files(tmp_path: Path):
+    record(tmp_path, 20)
+    files = sorted(tmp_path.glob('*.nmea.gz'))
+    assert [f.name for f in files] == ['20241112_101718.nmea.gz', '20241112_101719.nmea.gz']
+    chunks = list(read_recording(files))
+    assert len(chunks) == 40
+    assert b''.join(data for _, data in chunks) == b''.join(nmea_epoch(i) for i in range(20))
+
+
+def test_recorder_ignores_writes_after_closing(tmp_path: Path):
+    recorder = GnssRecorder('nmea', path=tmp_path)
+    recorder.write(nmea_epoch(0), RECORDING_START)
+    recorder.close()
+    recorder.write(nmea_epoch(1), RECORDING_START + 1)
+    files = list(tmp_path.glob('*.nmea.gz'))
+    assert len(files) == 1
+    assert [data for _, data in read_recording(files)] == [nmea_epoch(0)]
+
+
+async def test_replaying_a_recording(system: System, tmp_path: Path):
+    record(tmp_path, 20)
+    replay = GnssReplay(system.odometer, list(tmp_path.glob('*.nmea.gz')), speed=2.0)
+    records = []
+    replay.ROBOT_GNSS_POSITION_CHANGED.register(lambda _: records.append(replay.current))
+    await forward(2.0)
+    assert replay.finished
+    assert len(records) == 20
+    assert records[0].location.long < records[-1].location.long
+    assert records[-1].timestamp - records[0].timestamp == pytest.approx(1.9 / 2.0, abs=1e-6)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from rosys.geometry import Pose
+from rosys.testing import forward
+
+from field_friend import System
+from field_friend.automations.navigation.line_follower import LineFollower
+
+
+async def test_following_a_line_with_offset(system: System):
+    follower = LineFollower(system.driver, system.odometer)
+    line = Pose(x=0, y=0.2, yaw=np.deg2rad(5))
+
+    async def follow():
+        await follower.follow(line, distance=3.0, linear_speed_limit=0.3, angular_speed_limit=0.5, timeout=20)
+    system.automator.start(follow())
+    await forward(until=lambda: system.automator.is_running)
+    await forward(until=lambda: system.automator.is_stopped)
+    assert system.odometer.prediction.point.distance(line.point) == pytest.approx(3.0, abs=0.1)
+    assert line.relative_point(system.odometer.prediction.point).y == pytest.approx(0, abs=0.01), 'robot is on the line'
+    assert system.odometer.prediction.yaw == pytest.approx(line.yaw, abs=np.deg2rad(1))
+    assert follower.timing.ticks > 3.0 / 0.3 / follower.period * 0.9
+    assert follower.timing.overruns == 0
+
+
+async def test_following_a_line_until_condition(system: System):
+    follower = LineFollower(system.driver, system.odometer)
+
+    async def follow():
+        await follower.follow(Pose(), until=lambda: system.odometer.prediction.x > 1.0,
+                              linear_speed_limit=0.2, angular_speed_limit=0.5, stop_at_end=False)
+    system.automator.start(follow())
+    await forward(until=lambda: system.automator.is_running)
+    await forward(until=lambda: system.automator.is_stopped)
+    assert system.odometer.prediction.x == pytest.approx(1.0, abs=0.02)
+    assert system.field_friend.wheels.linear_target_speed == pytest.approx(0.2), 'the robot keeps moving'
@@ -0,0 +1,45 @@
+import pytest
+from rosys.testing import forward
+
+from field_friend import System
+from field_friend.automations import MotionState
+
+
+async def test_stopping_and_settling(system: System):
+    estimator = system.motion_state_estimator
+    await forward(1)
+    assert estimator.is_settled
+    stops: list = []
+    estimator.STOPPED.register(stops.append)
+
+    await system.field_friend.wheels.drive(0.2, 0)
+    await forward(1)
+    assert estimator.state == MotionState.MOVING
+    assert not estimator.is_stopped
+
+    await system.field_friend.wheels.stop()
+    await forward(0.1)
+    assert estimator.state == MotionState.STOPPED
+    assert len(stops) == 1
+    assert stops[0].x == pytest.approx(system.odometer.prediction.x, abs=0.01)
+
+    await forward(estimator.settling_time)
+    assert estimator.is_settled
+    assert estimator.stop_pose == stops[0]
+
+
+def test_persisting_thresholds(system: System):
+    estimator = system.motion_state_estimator
+    estimator.linear_threshold = 0.01
+    estimator.angular_threshold = 0.02
+    estimator.settling_time = 0.5
+    data = estimator.backup()
+    estimator.restore({})
+    assert estimator.settling_time == 0.5, 'missing entries keep the current values'
+    estimator.linear_threshold = estimator.LINEAR_THRESHOLD
+    estimator.angular_threshold = estimator.ANGULAR_THRESHOLD
+    estimator.settling_time = estimator.SETTLING_TIME
+    estimator.restore(data)
+    assert estimator.linear_threshold == 0.01
+    assert estimator.angular_threshold == 0.02
+    assert estimator.settling_time == 0.5
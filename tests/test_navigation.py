@@ -6,7 +6,7 @@ import rosys
 from conftest import ROBOT_GEO_START_POSITION
 from rosys.testing import forward
 
-from field_friend import System
+from field_friend import System, localization
 from field_friend.automations import Field
 from field_friend.automations.implements import Implement, Recorder
 from field_friend.automations.navigation import StraightLineNavigation
@@ -35,7 +35,6 @@ async def test_straight_line_with_high_angles(system: System):
     await system.driver.wheels.stop()
     assert isinstance(system.current_navigation, StraightLineNavigation)
     system.current_navigation.length = 1.0
-    system.gnss.observed_poses.clear()
     system.automator.start()
     await forward(until=lambda: system.automator.is_running)
     await forward(until=lambda: system.automator.is_stopped)
@@ -243,8 +242,8 @@ async def test_follow_crops_outlier_last(system: System, detector: rosys.vision.
     await forward(until=lambda: not system.automator.is_running, timeout=300)
     assert not system.automator.is_running, 'automation should stop if no crops are detected anymore'
     assert system.odometer.prediction.point.x == pytest.approx(2.6, abs=0.1)
-    assert 0 >= system.odometer.prediction.point.y >= -0.25
-    assert 0 >= system.odometer.prediction.yaw_deg >= -45
+    assert system.odometer.prediction.point.y == pytest.approx(0, abs=0.05), 'the outlier is rejected'
+    assert system.odometer.prediction.yaw_deg == pytest.approx(0, abs=2)
 
 
 async def test_follow_crops_with_slippage(system: System, detector: rosys.vision.DetectorSimulation):
@@ -261,7 +260,9 @@ async def test_follow_crops_with_slippage(system: System, detector: rosys.vision
     system.automator.start()
     await forward(until=lambda: system.automator.is_running)
     await forward(until=lambda: system.automator.is_stopped)
-    assert system.odometer.prediction.yaw_deg == pytest.approx(16.5, abs=0.2)
+    assert system.odometer.prediction.yaw_deg == pytest.approx(17.8, abs=0.5)
+    assert system.odometer.prediction.yaw_deg == pytest.approx(system.field_friend.wheels.pose.yaw_deg, abs=1.5), \
+        'the filter corrects the heading drift caused by slippage'
 
 
 async def test_approach_first_row(system: System, field: Field):
@@ -286,6 +287,22 @@ async def test_approach_first_row(system: System, field: Field):
     assert system.field_navigation.automation_watcher.field_watch_active
 
 
+async def test_field_navigation_requires_located_robot(system: System, gnss: GnssSimulation, field: Field):
+    async def empty():
+        return None
+    gnss._create_new_record = empty  # type: ignore
+    await forward(1)
+    system.gnss.pose_filter.reset()
+    system.automation_watcher.gnss_watch_active = False
+    system.field_navigation.field_id = field.id
+    system.current_navigation = system.field_navigation
+    start = system.odometer.prediction.point
+    system.automator.start()
+    await forward(until=lambda: system.automator.is_running)
+    await forward(until=lambda: system.automator.is_stopped)
+    assert system.odometer.prediction.point.distance(start) < 0.01
+
+
 async def test_approach_first_row_from_other_side(system: System, field: Field):
     # pylint: disable=protected-access
     assert system.gnss.current
@@ -369,6 +386,34 @@ async def test_complete_row(system: System, field: Field):
     assert system.field_navigation.automation_watcher.field_watch_active
 
 
+async def test_reference_update_while_following_row(system: System, field: Field):
+    # pylint: disable=protected-access
+    system.field_navigation.field_id = field.id
+    system.current_navigation = system.field_navigation
+    system.automator.start()
+    await forward(until=lambda: system.field_navigation._state == FieldNavigationState.FOLLOW_ROW)
+    await forward(2)
+    localization.reference.update(ROBOT_GEO_START_POSITION.shifted(rosys.geometry.Point(x=30, y=-20)))
+    end_point = field.rows[0].points[1].cartesian()
+    assert system.field_navigation.end_point is not None
+    assert system.field_navigation.end_point.distance(end_point) < 0.001, 'the end point is converted into the new frame'
+    assert system.automator.is_running
+    await forward(until=lambda: system.field_navigation._state == FieldNavigationState.CHANGE_ROW)
+    assert system.odometer.prediction.point.x == pytest.approx(end_point.x, abs=0.05)
+    assert system.odometer.prediction.point.y == pytest.approx(end_point.y, abs=0.05)
+
+
+async def test_reference_update_while_approaching_row(system: System, field: Field):
+    # pylint: disable=protected-access
+    system.field_navigation.field_id = field.id
+    system.current_navigation = system.field_navigation
+    system.automator.start()
+    await forward(until=lambda: system.field_navigation._driving_transition)
+    localization.reference.update(ROBOT_GEO_START_POSITION.shifted(rosys.geometry.Point(x=30, y=-20)))
+    await forward(1)
+    assert system.automator.is_stopped, 'the transition path is not valid in the new frame'
+
+
 @pytest.mark.skip('TODO: rework in a later PR')
 async def test_resuming_field_navigation_after_automation_stop(system: System, field: Field):
     # pylint: disable=protected-access
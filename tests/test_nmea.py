@@ -0,0 +1,107 @@
+import functools
+import operator
+
+import pynmea2
+import pytest
+
+from field_friend.localization.nmea import NmeaDecoder, checksum, checksum_valid, utc_timestamp
+
+EPOCH_1 = (b'$GPGGA,101514.00,5158.98954,N,00726.05272,E,4,24,0.6,52.123,M,47.251,M,1.0,0000*75\r\n'
+           b'$GNGNS,101514.00,5158.98954,N,00726.05272,E,RRRR,24,0.6,52.123,47.251,1.0,0000,V*3E\r\n'
+           b'$GPHDT,123.45,T*04\r\n')
+EPOCH_2 = (b'$GPGGA,101514.10,5158.98960,N,00726.05280,E,4,24,0.6,52.125,M,47.251,M,1.0,0000*78\r\n'
+           b'$GNGNS,101514.10,5158.98960,N,00726.05280,E,RRRR,24,0.6,52.125,47.251,1.0,0000,V*33\r\n'
+           b'$GPHDT,123.50,T*00\r\n')
+EPOCH_WITHOUT_HEADING = (b'$GNGNS,101514.20,5158.98970,N,00726.05290,E,FFFF,24,0.6,52.125,47.251,1.0,0000,V*30\r\n'
+                         b'$GPGGA,101514.20,5158.98970,N,00726.05290,E,5,24,0.6,52.125,M,47.251,M,1.0,0000*7A\r\n'
+                         b'$GPHDT,,T*1B\r\n')
+NEXT_EPOCH_START = b'$GPGGA,101514.30,5158.98980,N,00726.05300,E,5,24,0.6,52.125,M,47.251,M,1.0,0000*7C\r\n'
+
+
+def test_epoch_is_emitted_with_its_last_sentence():
+    decoder = NmeaDecoder()
+    last_sentence_start = EPOCH_1.rindex(b'$')
+    assert decoder.feed(EPOCH_1[:last_sentence_start + 5]) == []
+    records = decoder.feed(EPOCH_1[last_sentence_start + 5:])
+    assert len(records) == 1
+    record = records[0]
+    assert record.location.lat == pytest.approx(51.983159)
+    assert record.location.long == pytest.approx(7.434212)
+    assert record.mode == 'RRRR'
+    assert record.gps_qual == 4
+    assert record.altitude == pytest.approx(52.123)
+    assert record.heading == pytest.approx(123.45)
+
+
+def test_byte_wise_feeding():
+    decoder = NmeaDecoder()
+    records = [record for byte in EPOCH_1 + EPOCH_2 for record in decoder.feed(bytes([byte]))]
+    assert [record.heading for record in records] == pytest.approx([123.45, 123.50])
+    assert records[1].timestamp - records[0].timestamp == pytest.approx(0.1)
+
+
+def test_incomplete_epoch_is_emitted_when_next_epoch_starts():
+    decoder = NmeaDecoder()
+    assert decoder.feed(EPOCH_WITHOUT_HEADING) == []
+    records = decoder.feed(NEXT_EPOCH_START)
+    assert len(records) == 1
+    assert records[0].mode == 'FFFF'
+    assert records[0].heading is None
+
+
+def test_corrupted_sentence_is_skipped():
+    decoder = NmeaDecoder()
+    corrupted = EPOCH_1.replace(b'123.45', b'124.45')
+    assert decoder.feed(b'\x00garbage\r\n' + corrupted) == []
+    records = decoder.feed(EPOCH_2)
+    assert [record.heading for record in records] == [None, 123.50]
+
+
+def test_checksum():
+    for sentence in (EPOCH_1 + EPOCH_2 + EPOCH_WITHOUT_HEADING).split():
+        assert checksum_valid(sentence)
+        assert checksum(sentence[1:-3]) == functools.reduce(operator.xor, sentence[1:-3], 0)
+    assert checksum(bytes(range(200))) == functools.reduce(operator.xor, range(200), 0)
+    assert not checksum_valid(b'$GPHDT,124.45,T*04')
+    assert not checksum_valid(b'$GPHDT,123.45,T')
+    assert not checksum_valid(b'$GPHDT,123.45,T*ZZ')
+
+
+def test_fast_path_matches_pynmea2():
+    record = NmeaDecoder().feed(EPOCH_1)[0]
+    gga, gns, hdt = (pynmea2.parse(line.decode()) for line in EPOCH_1.split())
+    assert record.location.lat == gns.latitude
+    assert record.location.long == gns.longitude
+    assert record.gps_qual == gga.gps_qual
+    assert record.altitude == gga.altitude
+    assert record.separation == float(gga.geo_sep)
+    assert record.heading == float(hdt.heading)
+    assert record.timestamp % 86400 == pytest.approx(10 * 3600 + 15 * 60 + 14)
+
+
+def test_southern_and_western_hemisphere():
+    sentence = b'GNGNS,101514.00,3354.12000,S,01825.50000,W,RRRR,24,0.6,52.123,47.251,1.0,0000,V'
+    gga, _, hdt = EPOCH_1.split()
+    stream = b'\r\n'.join((gga, b'$%s*%02X' % (sentence, checksum(sentence)), hdt, b''))
+    record = NmeaDecoder().feed(stream)[0]
+    assert record.location.lat == pytest.approx(-(33 + 54.12 / 60))
+    assert record.location.long == pytest.approx(-(18 + 25.5 / 60))
+
+
+def test_utc_timestamp_around_midnight():
+    midnight = 1_700_000_000 - 1_700_000_000 % 86400
+    assert utc_timestamp(3600.0, now=midnight + 3600.5) == midnight + 3600
+    assert utc_timestamp(86399.5, now=midnight + 0.2) == midnight - 0.5
+
+
+@pytest.mark.parametrize('sentence', [
+    b'GPHDT,abc,T',
+    b'GPGGA,101514.00,5158.98954,N,00726.05272,E,4,24,0.6,52.123,M,4x.9,M,1.0,0000',
+    b'GPGGA,101514.00,5158.98954,N,00726.05272,E,x,24,0.6,52.123,M,47.251,M,1.0,0000',
+    b'GNGNS,101514.00,51x8.98954,N,00726.05272,E,RRRR,24,0.6,52.123,47.251,1.0,0000,V',
+])
+def test_malformed_fields_are_skipped(sentence: bytes):
+    decoder = NmeaDecoder()
+    assert decoder.feed(b'$%s*%02X\r\n' % (sentence, checksum(sentence))) == []
+    records = decoder.feed(EPOCH_2)
+    assert [record.heading for record in records] == [123.50]
@@ -0,0 +1,87 @@
+import binascii
+import os
+import pty
+import struct
+import tty
+from pathlib import Path
+
+import pytest
+import serial
+
+from field_friend.localization.gnss_reader import GnssReader
+from field_friend.localization.sbf import BLOCKS, HEADER, RECEIVER_TIME, SYNC, SbfDecoder, gps_to_unix
+
+# three epochs of PVTGeodetic, PosCovGeodetic, AttEuler and AttCovEuler blocks at 10 Hz,
+# each followed by an NMEA sentence, with a corrupted copy of the second PVTGeodetic block
+SBF_EPOCHS = (Path(__file__).parent / 'sbf_epochs.bin').read_bytes()
+
+
+def sbf_block(block_id: int, *values) -> bytes:
+    body = BLOCKS[block_id].pack(*values)
+    body += bytes(-(HEADER.size + len(body)) % 4)
+    length = HEADER.size + len(body)
+    crc = binascii.crc_hqx(struct.pack('<HH', block_id, length) + body, 0)
+    return HEADER.pack(SYNC, crc, block_id, length) + body
+
+
+def test_decoding_epochs():
+    records = SbfDecoder().feed(SBF_EPOCHS)
+    assert len(records) == 3
+    assert records[0].heading is None, 'the first epoch is emitted before the decoder knows which blocks to expect'
+    record = records[1]
+    assert record.timestamp == gps_to_unix(123456800, 2340)
+    assert record.location.lat == pytest.approx(51.983160)
+    assert record.location.long == pytest.approx(7.434212)
+    assert record.mode == 'R'
+    assert record.gps_qual == 4
+    assert record.altitude == pytest.approx(100.0 - 47.25)
+    assert record.separation == pytest.approx(47.25)
+    assert record.speed_kmh == pytest.approx(0.5 * 3.6)
+    assert record.heading == pytest.approx(124.45)
+    assert record.latitude_std_dev == pytest.approx(0.01)
+    assert record.longitude_std_dev == pytest.approx(0.02)
+    assert record.heading_std_dev == pytest.approx(0.5)
+    assert records[2].mode == 'F'
+    assert records[2].gps_qual == 5
+    assert records[2].timestamp - records[1].timestamp == pytest.approx(0.1, abs=1e-6)
+
+
+def test_byte_wise_feeding():
+    decoder = SbfDecoder()
+    records = [record for byte in SBF_EPOCHS for record in decoder.feed(bytes([byte]))]
+    assert [record.heading for record in records] == pytest.approx([None, 124.45, 125.45])
+
+
+def test_gps_time():
+    # 2024-11-12 10:17:18 UTC is GPS week 2340, day 2, 10:17:36 GPS time
+    assert gps_to_unix((2 * 86400 + 10 * 3600 + 17 * 60 + 36) * 1000, 2340) == 1731406638
+
+
+def test_leap_seconds_from_receiver_time():
+    decoder = SbfDecoder()
+    decoder.feed(sbf_block(RECEIVER_TIME, 123456700, 2340, 24, 11, 12, 10, 17, 18, -128, 0))
+    assert decoder.leap_seconds == 18, 'the default is kept until the receiver knows the leap seconds'
+    decoder.feed(sbf_block(RECEIVER_TIME, 123456700, 2340, 24, 11, 12, 10, 17, 18, 19, 2))
+    records = decoder.feed(SBF_EPOCHS)
+    assert records[1].timestamp == gps_to_unix(123456800, 2340, leap_seconds=19)
+
+
+async def test_reader_with_sbf_stream():
+    controller, device = pty.openpty()
+    tty.setraw(device)
+    ser = serial.Serial(os.ttyname(device), timeout=0.05)
+    reader = GnssReader(ser, SbfDecoder())
+    reader.start()
+    try:
+        os.write(controller, SBF_EPOCHS)
+        headings = []
+        while (record := await reader.next_record(timeout=1.0)) is not None:
+            headings.append(record.heading)
+            if len(headings) == 3:
+                break
+        assert headings == pytest.approx([None, 124.45, 125.45])
+    finally:
+        reader.stop()
+        ser.close()
+        os.close(controller)
+        os.close(device)
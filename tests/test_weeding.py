@@ -19,6 +19,42 @@ async def test_working_with_weeding_screw(system: System, detector: rosys.vision
     assert detector.simulated_objects[0].category_name == 'maize'
 
 
+async def test_continuous_weeding_with_weeding_screw(system: System, detector: rosys.vision.DetectorSimulation):
+    for x, y in [(0.2, 0.05), (0.4, -0.03), (0.6, 0.02)]:
+        detector.simulated_objects.append(rosys.vision.SimulatedObject(category_name='weed',
+                                                                       position=rosys.geometry.Point3d(x=x, y=y, z=0)))
+    system.current_implement = system.implements['Weed Screw']
+    system.current_navigation = system.straight_line_navigation
+    system.current_navigation.continuous = True
+    system.automator.start()
+    await forward(until=lambda: system.current_implement.creep_speed > 0)
+    assert system.current_implement.creep_speed <= system.field_friend.DRILL_RADIUS / WeedingScrew.PUNCH_DURATION
+    await forward(30)
+    assert len(detector.simulated_objects) == 0
+
+
+async def test_prepositioning_for_following_weed(system: System, detector: rosys.vision.DetectorSimulation):
+    for x, y in [(0.2, 0.05), (0.35, -0.03)]:
+        detector.simulated_objects.append(rosys.vision.SimulatedObject(category_name='weed',
+                                                                       position=rosys.geometry.Point3d(x=x, y=y, z=0)))
+    screw = system.implements['Weed Screw']
+    assert isinstance(screw, WeedingScrew)
+    system.current_implement = screw
+    system.current_navigation = system.straight_line_navigation
+    system.current_navigation.continuous = True
+    targets_after_punch: list[float | None] = []
+    stop_workflow = screw.stop_workflow
+
+    async def record_target() -> None:
+        targets_after_punch.append(screw._y_positioning_target)  # pylint: disable=protected-access
+        await stop_workflow()
+    screw.stop_workflow = record_target  # type: ignore[method-assign]
+    system.automator.start()
+    await forward(until=lambda: len(detector.simulated_objects) < 2)
+    assert targets_after_punch[-1] == pytest.approx(-0.03, abs=0.01), \
+        'the y axis heads for the following weed as soon as the first punch is done'
+
+
 async def test_keep_crops_safe(system: System, detector: rosys.vision.DetectorSimulation):
     detector.simulated_objects.append(rosys.vision.SimulatedObject(category_name='maize',
                                                                    position=rosys.geometry.Point3d(x=0.2, y=0.0, z=0)))